@@ -0,0 +1,249 @@
+import random
+from random_factors import draw_factor_batch
+from strength import TeamStrength
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional; only this engine needs it
+    np = None
+
+# Chance that a weather timeout actually happens when it is due
+TIMEOUT_CHANCE = {"Cloudy": 0.05, "Sunny": 0.20, "Rainy": 0.10}
+
+# Boost levels kept in the per-match attack/defense arrays (strategic timeouts give at most +2)
+MAX_BOOST = 3
+
+class BatchResult:
+    def __init__(self, team1_name, team2_name, n):
+        self.team1_name = team1_name
+        self.team2_name = team2_name
+        self.n = n
+        self.team1_score = np.zeros(n, dtype=np.int64)
+        self.team2_score = np.zeros(n, dtype=np.int64)
+        self.snitch = np.zeros(n, dtype=np.int8)  # 0 = not caught, 1 = team1, 2 = team2
+        self.time = np.zeros(n, dtype=np.int64)
+        self.team1_attacks = np.zeros(n, dtype=np.int64)
+        self.team2_attacks = np.zeros(n, dtype=np.int64)
+        self.team1_goals = np.zeros(n, dtype=np.int64)
+        self.team2_goals = np.zeros(n, dtype=np.int64)
+        self.team1_penalties = np.zeros(n, dtype=np.int64)
+        self.team2_penalties = np.zeros(n, dtype=np.int64)
+        self.team1_penalties_scored = np.zeros(n, dtype=np.int64)
+        self.team2_penalties_scored = np.zeros(n, dtype=np.int64)
+        self.factors = None  # the FactorBatch the matches were played with
+
+    def __len__(self):
+        return self.n
+
+    # Same shape as simulate_match results: (team1_score, team2_score, snitch_catcher, time)
+    def __iter__(self):
+        names = (None, self.team1_name, self.team2_name)
+        for s1, s2, catcher, time in zip(self.team1_score.tolist(), self.team2_score.tolist(), self.snitch.tolist(), self.time.tolist()):
+            yield s1, s2, names[catcher], time
+
+def _require_numpy():
+    if np is None:
+        raise ImportError("The batch engine requires numpy (pip install numpy).")
+
+# Roll factors for every match and flatten them into per-match arrays
+def _prepare(team1, team2, n, rng = random):
+    roles1 = [p.role for p in team1.players]
+    roles2 = [p.role for p in team2.players]
+    base = [p.skill for p in team1.players + team2.players]
+    split = len(team1.players)
+
+    attack1 = np.empty((n, MAX_BOOST + 1))
+    attack2 = np.empty((n, MAX_BOOST + 1))
+    defense1 = np.empty((n, MAX_BOOST + 1))
+    defense2 = np.empty((n, MAX_BOOST + 1))
+    chaser1 = np.empty(n, dtype=np.int64)
+    chaser2 = np.empty(n, dtype=np.int64)
+    keeper1 = np.empty(n, dtype=np.int64)
+    keeper2 = np.empty(n, dtype=np.int64)
+    seeker1 = np.empty(n, dtype=np.int64)
+    seeker2 = np.empty(n, dtype=np.int64)
+    break_every = np.zeros(n, dtype=np.int64)
+    break_length = np.zeros(n, dtype=np.int64)
+    break_chance = np.zeros(n)
+
+    factors = draw_factor_batch(n, roles1, roles2, rng)
+    for i in range(n):
+        skills = [max(1, min(10, b + d)) for b, d in zip(base, factors.deltas[i])]
+        strength1 = TeamStrength(roles1, skills[:split])
+        strength2 = TeamStrength(roles2, skills[split:])
+        attack1[i] = strength1.attack[:MAX_BOOST + 1]
+        attack2[i] = strength2.attack[:MAX_BOOST + 1]
+        defense1[i] = strength1.defense[:MAX_BOOST + 1]
+        defense2[i] = strength2.defense[:MAX_BOOST + 1]
+        chaser1[i] = strength1.chaser_skill
+        chaser2[i] = strength2.chaser_skill
+        keeper1[i] = strength1.keeper_skill
+        keeper2[i] = strength2.keeper_skill
+        seeker1[i] = strength1.seeker_skill
+        seeker2[i] = strength2.seeker_skill
+        if factors.breaks[i] is not None:
+            break_every[i], break_length[i] = factors.breaks[i]
+            break_chance[i] = TIMEOUT_CHANCE[factors.weather_type(i)]
+
+    bias = np.array(factors.bias, dtype=np.int8)
+    min_step, max_step = np.array([factors.time_step_range(i) for i in range(n)], dtype=np.int64).T
+
+    return {
+        "attack": (attack1, attack2), "defense": (defense1, defense2),
+        "chaser": (chaser1, chaser2), "keeper": (keeper1, keeper2),
+        "seeker1": seeker1, "seeker2": seeker2, "bias": bias,
+        "min_step": min_step, "max_step": max_step,
+        "break_every": break_every, "break_length": break_length, "break_chance": break_chance,
+        "factors": factors,
+    }
+
+# Plays n independent matches between the same two teams in lockstep.
+# Every array holds one entry per match; finished matches are masked out.
+# rng draws the factors (and the numpy seed unless one is given); the matches run on numpy's generator.
+def simulate_batch(team1, team2, n, time_limit = None, seed = None, rng = random):
+    _require_numpy()
+    if seed is None:
+        seed = rng.getrandbits(64)
+    gen = np.random.default_rng(seed)
+    m = _prepare(team1, team2, n, rng)
+    out = BatchResult(team1.name, team2.name, n)
+    out.factors = m["factors"]
+
+    rows = np.arange(n)
+    attack1, attack2 = m["attack"]
+    defense1, defense2 = m["defense"]
+    chaser1, chaser2 = m["chaser"]
+    keeper1, keeper2 = m["keeper"]
+    seeker1 = m["seeker1"]
+    total_seeker = m["seeker1"] + m["seeker2"]
+    snitch_p = total_seeker * 0.001
+    bias = m["bias"]
+    break_every = m["break_every"]
+    break_length = m["break_length"]
+    break_chance = m["break_chance"]
+
+    time = out.time
+    score1 = out.team1_score
+    score2 = out.team2_score
+    attack_counter = np.zeros(n, dtype=np.int64)
+    next_penalty = gen.integers(1, 11, n)
+    next_strategic = gen.integers(10, 21, n)
+    timeout_count = np.zeros(n, dtype=np.int64)
+    # Boost windows never overlap between timeouts, so one (value, last attack) pair per team is enough
+    boost1_value = np.zeros(n, dtype=np.int64)
+    boost1_end = np.zeros(n, dtype=np.int64)
+    boost2_value = np.zeros(n, dtype=np.int64)
+    boost2_end = np.zeros(n, dtype=np.int64)
+
+    active = rows
+    while active.size:
+        a = active
+        k = a.size
+
+        # Advance time
+        time[a] += gen.integers(m["min_step"][a], m["max_step"][a] + 1)
+        if time_limit:
+            over = time[a] > time_limit
+            if over.any():
+                time[a[over]] = time_limit
+                a = a[~over]
+                k = a.size
+
+        # Snitch
+        caught = gen.random(k) < snitch_p[a]
+        if caught.any():
+            c = a[caught]
+            team1_caught = gen.integers(1, total_seeker[c] + 1) <= seeker1[c]
+            score1[c[team1_caught]] += 150
+            score2[c[~team1_caught]] += 150
+            out.snitch[c] = np.where(team1_caught, 1, 2)
+            a = a[~caught]
+            k = a.size
+        active = a
+        if not k:
+            break
+
+        # Weather timeouts
+        ac = attack_counter[a]
+        due = (break_every[a] > 0) & (ac > 0)
+        due &= ac % np.maximum(break_every[a], 1) == 0
+        if time_limit:
+            due &= time[a] + break_length[a] < time_limit
+        due &= gen.random(k) < break_chance[a]
+        time[a[due]] += break_length[a[due]]
+
+        # Attacking team (True = team1), referee bias may steal the attack
+        team1_attacks = gen.random(k) < 0.5
+        steal = gen.random(k) < 0.20
+        team1_attacks = np.where((bias[a] == 1) & steal, True, team1_attacks)
+        team1_attacks = np.where((bias[a] == 2) & steal, False, team1_attacks)
+        attack_counter[a] += 1
+        ac = attack_counter[a]
+        out.team1_attacks[a] += team1_attacks
+        out.team2_attacks[a] += ~team1_attacks
+
+        # Boosts from strategic timeouts
+        b1 = np.where(ac <= boost1_end[a], boost1_value[a], 0)
+        b2 = np.where(ac <= boost2_end[a], boost2_value[a], 0)
+        diff = np.where(
+            team1_attacks,
+            attack1[a, b1] - defense2[a, b2],
+            attack2[a, b2] - defense1[a, b1],
+        )
+        goal = diff > gen.integers(-25, 36, k)
+        goal1 = goal & team1_attacks
+        goal2 = goal & ~team1_attacks
+        score1[a] += 10 * goal1
+        score2[a] += 10 * goal2
+        out.team1_goals[a] += goal1
+        out.team2_goals[a] += goal2
+
+        # Strategic timeouts (not played in time-limited matches)
+        if not time_limit:
+            check = ac == next_strategic[a]
+            if check.any():
+                t = a[check]
+                called = gen.random(t.size) < 0.20
+                behind_roll = gen.random(t.size) < 0.75
+                coin = gen.random(t.size) < 0.5
+                s1, s2 = score1[t], score2[t]
+                # Team 1 behind but not calling falls through to team 2, as in simulate_match
+                team1_calls = np.where(s1 < s2, behind_roll, np.where(s1 == s2, coin, False))
+                c = t[called]
+                calls = team1_calls[called]
+                duration_call = gen.integers(5, 11, c.size)
+                duration_other = gen.integers(5, 11, c.size)
+                timeout_count[c] += 1
+                acc = attack_counter[c]
+                boost1_value[c] = np.where(calls, 2, 1)
+                boost2_value[c] = np.where(calls, 1, 2)
+                boost1_end[c] = acc + np.where(calls, duration_call, duration_other)
+                boost2_end[c] = acc + np.where(calls, duration_other, duration_call)
+                # Clamp the exponent first: 2 ** 60 and up overflows int64 in long low-skill matches
+                max_skip = np.minimum(600, 15 * 2 ** np.minimum(timeout_count[c] - 1, 6))
+                time[c] += gen.integers(5, max_skip + 1)
+                next_strategic[t] += gen.integers(10, 21, t.size)
+
+        # Penalties
+        check = ac == next_penalty[a]
+        if check.any():
+            t = a[check]
+            b1c, b2c = b1[check], b2[check]
+            awarded = gen.random(t.size) < 0.20
+            side_roll = gen.random(t.size)
+            tb = bias[t]
+            to_team1 = np.where(tb == 1, side_roll < 0.75, np.where(tb == 2, side_roll >= 0.75, side_roll < 0.5))
+            chaser = np.where(to_team1, np.minimum(10, chaser1[t] + b1c), np.minimum(10, chaser2[t] + b2c))
+            keeper = np.where(to_team1, np.minimum(10, keeper2[t] + b2c), np.minimum(10, keeper1[t] + b1c))
+            scored = gen.integers(1, chaser + keeper + 1) <= chaser
+            p1 = awarded & to_team1
+            p2 = awarded & ~to_team1
+            out.team1_penalties[t] += p1
+            out.team2_penalties[t] += p2
+            out.team1_penalties_scored[t] += p1 & scored
+            out.team2_penalties_scored[t] += p2 & scored
+            score1[t] += 10 * (p1 & scored)
+            score2[t] += 10 * (p2 & scored)
+            next_penalty[t] += gen.integers(1, 11, t.size)
+
+    return out
@@ -0,0 +1,191 @@
+import argparse
+import json
+import platform
+import random
+import time
+import tracemalloc
+from models import create_random_team
+from random_factors import apply_all_factors, draw_factor_batch
+from simulation import simulate_match
+from tournaments import TournamentRunner, pick_random_teams_by_continent
+
+# Benchmark harness: times the hot paths, reports throughput, latency percentiles and peak
+# allocations, and can save the numbers as a baseline or compare against one.
+#
+#   python benchmark.py                           # run everything and print a table
+#   python benchmark.py --save baseline.json      # ... and store the results
+#   python benchmark.py --compare baseline.json   # flag cases whose median got slower (exit code 1)
+
+BASELINE_VERSION = 1
+SEED = 1234
+
+def _teams(n):
+    return [create_random_team(f"Team {i}") for i in range(n)]
+
+def _runner_case(num_teams, engine = "scalar"):
+    def run():
+        TournamentRunner(engine=engine).run(num_teams)
+    return run
+
+# name -> (setup() returning the function to time, matches played per call, iterations)
+def build_cases(scale = 1.0):
+    def n(count):
+        return max(1, int(count * scale))
+
+    # Silent matches skip highlights, as tournaments and Monte Carlo runs do; "simulate_match_events"
+    # times the same match with its event log
+    def match(time_limit = None, engine = "scalar", record_events = False):
+        def setup():
+            team1, team2 = _teams(2)
+            return lambda: simulate_match(team1, team2, time_limit, quiet=True, record_events=record_events, engine=engine)
+        return setup
+
+    # What simulate_match draws per match
+    def factor_batch():
+        team1, team2 = _teams(2)
+        roles1 = [p.role for p in team1.players]
+        roles2 = [p.role for p in team2.players]
+        return lambda: draw_factor_batch(1, roles1, roles2)
+
+    # The older per-player dict path, kept for callers of apply_all_factors
+    def factors():
+        team1, team2 = _teams(2)
+        return lambda: apply_all_factors(team1, team2)
+
+    def group_stage():
+        teams = {t.name: t for t in _teams(4)}
+        runner = TournamentRunner()
+        return lambda: runner.run_group(list(teams), teams)
+
+    return {
+        "simulate_match": (match(), 1, n(2000)),
+        "simulate_match_240": (match(240), 1, n(2000)),
+        "simulate_match_skip": (match(engine="skip"), 1, n(2000)),
+        "simulate_match_events": (match(record_events=True), 1, n(2000)),
+        "draw_factor_batch": (factor_batch, 0, n(5000)),
+        "apply_all_factors": (factors, 0, n(5000)),
+        "create_random_team": (lambda: (lambda: create_random_team("Team")), 0, n(5000)),
+        "pick_random_teams_64": (lambda: (lambda: pick_random_teams_by_continent(64)), 0, n(500)),
+        "group_stage": (group_stage, 6, n(300)),
+        "tournament_16": (lambda: _runner_case(16), 31, n(40)),
+        "tournament_64": (lambda: _runner_case(64), 127, n(10)),
+        "tournament_256_skip": (lambda: _runner_case(256, "skip"), 511, n(5)),
+    }
+
+def _percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    k = min(len(sorted_values) - 1, max(0, round(q * (len(sorted_values) - 1))))
+    return sorted_values[k]
+
+def run_case(setup, matches_per_call, iterations):
+    random.seed(SEED)
+    fn = setup()
+    fn()  # warm-up (imports, caches)
+
+    durations = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        durations.append(time.perf_counter() - start)
+    durations.sort()
+    total = sum(durations)
+
+    # Allocations are measured on a separate, shorter pass: tracemalloc slows everything down
+    random.seed(SEED)
+    tracemalloc.start()
+    for _ in range(max(1, iterations // 10)):
+        fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    stats = {
+        "iterations": iterations,
+        "ops_per_sec": iterations / total if total else 0.0,
+        "p50_ms": _percentile(durations, 0.50) * 1000,
+        "p90_ms": _percentile(durations, 0.90) * 1000,
+        "p99_ms": _percentile(durations, 0.99) * 1000,
+        "peak_kib": peak / 1024,
+    }
+    if matches_per_call:
+        stats["matches_per_sec"] = matches_per_call * stats["ops_per_sec"]
+    return stats
+
+def run_benchmarks(selected = None, scale = 1.0):
+    results = {}
+    for name, (setup, matches_per_call, iterations) in build_cases(scale).items():
+        if selected and name not in selected:
+            continue
+        results[name] = run_case(setup, matches_per_call, iterations)
+    return results
+
+def print_results(results, baseline = None, threshold = 0.10):
+    regressions = []
+    print("{:<22} {:>12} {:>12} {:>9} {:>9} {:>9} {:>10} {:>9}".format(
+        "Case", "ops/sec", "matches/sec", "p50 ms", "p90 ms", "p99 ms", "peak KiB", "vs base"))
+    for name, r in results.items():
+        change = ""
+        if baseline and name in baseline:
+            # Medians are far less noisy than means on a busy machine
+            ratio = baseline[name]["p50_ms"] / r["p50_ms"] if r["p50_ms"] else 1.0
+            change = f"{ratio - 1:+.1%}"
+            if ratio < 1 - threshold:
+                change += " !"
+                regressions.append((name, ratio))
+        matches = f"{r['matches_per_sec']:.0f}" if "matches_per_sec" in r else "-"
+        print("{:<22} {:>12.1f} {:>12} {:>9.3f} {:>9.3f} {:>9.3f} {:>10.1f} {:>9}".format(
+            name, r["ops_per_sec"], matches, r["p50_ms"], r["p90_ms"], r["p99_ms"], r["peak_kib"], change))
+    return regressions
+
+def save_baseline(results, filename):
+    data = {
+        "version": BASELINE_VERSION,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "results": results,
+    }
+    with open(filename, "w") as f:
+        json.dump(data, f, indent=2)
+
+def load_baseline(filename):
+    with open(filename, "r") as f:
+        data = json.load(f)
+    if data.get("version") != BASELINE_VERSION:
+        raise ValueError(f"{filename} was written by another version of the benchmark harness.")
+    return data["results"]
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(description="Benchmark the Quidditch simulation.")
+    parser.add_argument("cases", nargs="*", help="cases to run (default: all)")
+    parser.add_argument("--list", action="store_true", help="list the cases and exit")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply every iteration count (e.g. 0.1 for a quick run)")
+    parser.add_argument("--save", metavar="FILE", help="save the results as a baseline")
+    parser.add_argument("--compare", metavar="FILE", help="compare against a saved baseline")
+    parser.add_argument("--threshold", type=float, default=0.10, help="slowdown that counts as a regression (default 0.10)")
+    args = parser.parse_args(argv)
+
+    cases = build_cases(args.scale)
+    if args.list:
+        for name in cases:
+            print(name)
+        return 0
+    unknown = [c for c in args.cases if c not in cases]
+    if unknown:
+        parser.error(f"unknown case(s): {', '.join(unknown)}")
+
+    baseline = load_baseline(args.compare) if args.compare else None
+    results = run_benchmarks(args.cases, args.scale)
+    regressions = print_results(results, baseline, args.threshold)
+    if args.save:
+        save_baseline(results, args.save)
+        print(f"\nBaseline saved to {args.save}")
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {args.threshold:.0%}:")
+        for name, ratio in regressions:
+            print(f"  {name}: {ratio - 1:+.1%} (median speed)")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
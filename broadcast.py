@@ -0,0 +1,324 @@
+import argparse
+import asyncio
+import itertools
+import json
+import random
+from urllib.parse import urlsplit, parse_qs
+from events import FULL_TIME, VERBOSITY, expand, wanted
+from models import create_random_team
+from seeding import make_rng
+from simulation import simulate_match
+from team_io import RosterError, team_from_record
+
+# Live match broadcasts over HTTP with Server-Sent Events (standard library only).
+#
+#   POST /matches                 start a match; optional JSON body {"team1": {...}, "team2": {...},
+#                                 "time_limit": 240} with teams in the Team.to_dict format
+#   GET  /matches                 the matches on air
+#   GET  /matches/<id>/events     subscribe: one SSE "data:" line of JSON per event, ending with
+#                                 "full_time"; ?verbosity=key only sends goals, penalties and the Snitch.
+#                                 If the simulation fails the stream ends with an "event: error" instead.
+#
+# The match itself is simulated in an executor, so the event loop never blocks on it. Its events
+# are then released at `pace` seconds per simulated minute, each one encoded once and handed to
+# every subscriber's bounded queue. A subscriber whose queue is full (or whose socket stops taking
+# data for send_timeout seconds) is dropped rather than allowed to hold up the others.
+
+# Raised by start_match when max_simulating matches are already being simulated (HTTP 429)
+class TooManyMatches(Exception):
+    pass
+
+class Subscriber:
+    def __init__(self, buffer, verbosity = "full"):
+        self.queue = asyncio.Queue(buffer)
+        self.verbosity = verbosity
+        self.dropped = False
+
+    # None tells the writer to stop; a dropped subscriber loses whatever was still queued
+    def close(self, dropped = False):
+        if dropped:
+            self.dropped = True
+            while not self.queue.empty():
+                self.queue.get_nowait()
+        self.queue.put_nowait(None)
+
+class MatchChannel:
+    def __init__(self, match_id, team1, team2):
+        self.id = match_id
+        self.team1 = team1
+        self.team2 = team2
+        self.status = "simulating"  # -> "live" -> "finished", or "failed"
+        self.minute = 0
+        self.subscribers = set()
+        self.dropped = 0
+        self.delivered = 0
+
+    def subscribe(self, buffer, verbosity = "full"):
+        sub = Subscriber(buffer, verbosity)
+        self.subscribers.add(sub)
+        return sub
+
+    def unsubscribe(self, sub):
+        self.subscribers.discard(sub)
+
+    def publish(self, kind, payload):
+        slow = []
+        for sub in self.subscribers:
+            if kind != FULL_TIME and not wanted(kind, sub.verbosity):
+                continue
+            try:
+                sub.queue.put_nowait(payload)
+                self.delivered += 1
+            except asyncio.QueueFull:
+                slow.append(sub)
+        for sub in slow:
+            self.drop(sub)
+
+    def drop(self, sub):
+        self.subscribers.discard(sub)
+        self.dropped += 1
+        sub.close(dropped=True)
+
+    # payload, if given, is a last message for every subscriber (e.g. an error event)
+    def finish(self, status = "finished", payload = None):
+        self.status = status
+        needed = 1 if payload is None else 2
+        for sub in list(self.subscribers):
+            if sub.queue.maxsize - sub.queue.qsize() < needed:
+                self.drop(sub)
+                continue
+            if payload is not None:
+                sub.queue.put_nowait(payload)
+            sub.close()
+        self.subscribers.clear()
+
+    def summary(self):
+        return {
+            "id": self.id, "team1": self.team1.name, "team2": self.team2.name,
+            "status": self.status, "minute": self.minute,
+            "subscribers": len(self.subscribers), "dropped": self.dropped,
+        }
+
+def event_json(record, names):
+    if record[1] == FULL_TIME:
+        r = record[2]
+        data = {
+            "kind": "full_time", "time": record[0],
+            "team1": r.team1_name, "team2": r.team2_name,
+            "score1": r.team1_score, "score2": r.team2_score,
+            "snitch_catcher": r.snitch_catcher,
+        }
+    else:
+        event = expand(record, names)
+        data = dict(event._asdict(), kind=event.kind, text=event.describe())
+    return data
+
+def sse_bytes(data):
+    return b"data: " + json.dumps(data, separators=(",", ":")).encode() + b"\n\n"
+
+class BroadcastServer:
+    # pace: real seconds per simulated minute (0 sends events as fast as subscribers take them).
+    # executor: None for the loop's default thread pool, or e.g. a ProcessPoolExecutor.
+    # max_simulating: matches that may wait for or run in the executor at once.
+    def __init__(self, pace = 0.05, buffer = 256, send_timeout = 5.0, executor = None, seed = None, keep_finished = 100, max_simulating = 32):
+        self.pace = pace
+        self.max_simulating = max_simulating
+        self.buffer = buffer
+        self.send_timeout = send_timeout
+        self.executor = executor
+        self.seed = seed
+        self.keep_finished = keep_finished
+        self.channels = {}
+        self._ids = itertools.count(1)
+        self._tasks = set()
+        self._server = None
+
+    # --- Matches ---
+
+    # A missing team is drawn at random; with a seed it comes from the match's own "teams" stream
+    def start_match(self, team1 = None, team2 = None, time_limit = None):
+        simulating = sum(1 for c in self.channels.values() if c.status == "simulating")
+        if simulating >= self.max_simulating:
+            raise TooManyMatches(f"{simulating} matches are already being simulated")
+        match_id = next(self._ids)
+        if team1 is None or team2 is None:
+            rng = random if self.seed is None else make_rng(self.seed, "teams", match_id)
+            if team1 is None:
+                team1 = create_random_team("Home", rng)
+            if team2 is None:
+                team2 = create_random_team("Away", rng)
+        channel = self.channels[match_id] = MatchChannel(match_id, team1, team2)
+        task = asyncio.get_running_loop().create_task(self._run_match(channel, time_limit))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return channel
+
+    async def _run_match(self, channel, time_limit):
+        loop = asyncio.get_running_loop()
+        rng = random.Random() if self.seed is None else make_rng(self.seed, "broadcast", channel.id)
+        status, last = "finished", None
+        try:
+            result = await loop.run_in_executor(
+                self.executor, simulate_match, channel.team1, channel.team2, time_limit, True, True, "scalar", rng)
+            channel.status = "live"
+            names = (result.team1_name, result.team2_name)
+            start = loop.time()
+            for record in result.event_log + [(result.time, FULL_TIME, result)]:
+                if self.pace:
+                    delay = start + record[0] * self.pace - loop.time()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                channel.minute = record[0]
+                channel.publish(record[1], sse_bytes(event_json(record, names)))
+        except Exception as e:
+            status, last = "failed", b"event: error\n" + sse_bytes({"error": f"{type(e).__name__}: {e}"})
+        finally:
+            channel.finish(status, last)
+            self._forget_finished()
+
+    def _forget_finished(self):
+        finished = [c.id for c in self.channels.values() if c.status in ("finished", "failed")]
+        for match_id in finished[:max(0, len(finished) - self.keep_finished)]:
+            del self.channels[match_id]
+
+    # --- HTTP ---
+
+    async def start(self, host = "127.0.0.1", port = 8765, backlog = 1024):
+        self._server = await asyncio.start_server(self._handle, host, port, backlog=backlog)
+        return self._server
+
+    async def serve_forever(self, host = "127.0.0.1", port = 8765):
+        server = await self.start(host, port)
+        async with server:
+            await server.serve_forever()
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        for task in list(self._tasks):
+            task.cancel()
+
+    async def _handle(self, reader, writer):
+        try:
+            try:
+                method, target, body = await read_request(reader)
+            except BAD_REQUEST:
+                await respond(writer, 400, {"error": "bad request"})
+                return
+            url = urlsplit(target)
+            parts = [p for p in url.path.split("/") if p]
+            if parts == ["matches"] and method == "GET":
+                await respond(writer, 200, [c.summary() for c in self.channels.values()])
+            elif parts == ["matches"] and method == "POST":
+                await self._post_match(writer, body)
+            elif len(parts) == 3 and parts[0] == "matches" and parts[2] == "events" and method == "GET":
+                await self._stream(writer, parts[1], parse_qs(url.query))
+            else:
+                await respond(writer, 404, {"error": "not found"})
+        except (ConnectionError, asyncio.TimeoutError):
+            pass
+        finally:
+            writer.close()
+
+    async def _post_match(self, writer, body):
+        try:
+            data = json.loads(body or b"{}")
+            if not isinstance(data, dict):
+                raise RosterError("expected a JSON object")
+            team1 = team_from_record(data["team1"]) if "team1" in data else None
+            team2 = team_from_record(data["team2"]) if "team2" in data else None
+            time_limit = data.get("time_limit")
+            if time_limit is not None and (not isinstance(time_limit, int) or isinstance(time_limit, bool) or time_limit < 1):
+                raise RosterError("time_limit must be a positive whole number of minutes")
+        except (json.JSONDecodeError, RosterError) as e:
+            await respond(writer, 400, {"error": str(e)})
+            return
+        try:
+            channel = self.start_match(team1, team2, time_limit)
+        except TooManyMatches as e:
+            await respond(writer, 429, {"error": f"{e}; try again later"})
+            return
+        await respond(writer, 201, channel.summary())
+
+    async def _stream(self, writer, match_id, query):
+        channel = self.channels.get(int(match_id)) if match_id.isdigit() else None
+        if channel is None:
+            await respond(writer, 404, {"error": f"no match {match_id}"})
+            return
+        if channel.status in ("finished", "failed"):
+            await respond(writer, 410, {"error": f"match {match_id} has {channel.status}"})
+            return
+        verbosity = query.get("verbosity", ["full"])[0]
+        if verbosity not in VERBOSITY:
+            await respond(writer, 400, {"error": f"verbosity must be one of {', '.join(VERBOSITY)}"})
+            return
+
+        sub = channel.subscribe(self.buffer, verbosity)
+        try:
+            writer.write(
+                b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\n"
+                b"Cache-Control: no-cache\r\nConnection: close\r\n\r\n"
+            )
+            while True:
+                payload = await sub.queue.get()
+                if payload is None:
+                    break
+                writer.write(payload)
+                await asyncio.wait_for(writer.drain(), self.send_timeout)
+            if sub.dropped:
+                writer.write(b"event: dropped\ndata: {}\n\n")
+        except asyncio.TimeoutError:
+            channel.drop(sub)
+        finally:
+            channel.unsubscribe(sub)
+
+# Minimal HTTP/1.1 handling shared with job_service.py: one request per connection.
+# read_request raises one of BAD_REQUEST for anything that should get a 400.
+MAX_BODY = 16 * 1024 * 1024
+BAD_REQUEST = (ValueError, asyncio.IncompleteReadError, asyncio.LimitOverrunError)
+
+async def read_request(reader):
+    head = await reader.readuntil(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    method, target, _ = lines[0].split(" ", 2)
+    headers = {}
+    for line in lines[1:]:
+        if line:
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+    length = int(headers.get("content-length") or 0)
+    if not 0 <= length <= MAX_BODY:
+        raise ValueError(f"bad Content-Length {length}")
+    body = await reader.readexactly(length) if length else b""
+    return method.upper(), target, body
+
+async def respond(writer, status, data):
+    reasons = {200: "OK", 201: "Created", 202: "Accepted", 400: "Bad Request", 404: "Not Found",
+               409: "Conflict", 410: "Gone", 429: "Too Many Requests", 500: "Internal Server Error"}
+    body = json.dumps(data).encode()
+    writer.write(
+        f"HTTP/1.1 {status} {reasons.get(status, '')}\r\nContent-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body
+    )
+    await writer.drain()
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(description="Broadcast simulated Quidditch matches live over HTTP/SSE.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--pace", type=float, default=0.05, help="seconds per simulated minute (default: 0.05)")
+    parser.add_argument("--buffer", type=int, default=256, help="queued events per subscriber before it is dropped (default: 256)")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args(argv)
+
+    server = BroadcastServer(args.pace, args.buffer, seed=args.seed)
+    print(f"Broadcasting on http://{args.host}:{args.port}/matches (POST /matches to kick off a match)")
+    try:
+        asyncio.run(server.serve_forever(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
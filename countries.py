@@ -0,0 +1,79 @@
+import csv
+import json
+import os
+import random
+from collections import defaultdict
+from sampling import weighted_sample
+
+# Snapshots are plain JSON: {"version": ..., "countries": {continent: [...]}, "populations": {...}}.
+# Bumped whenever that layout changes.
+SNAPSHOT_VERSION = 1
+SNAPSHOT_SUFFIX = ".idx"
+
+# Load countries by continent
+def load_countries_by_continent(filename):
+    countries_by_continent = defaultdict(list)
+    populations_by_continent = defaultdict(list)
+    with open(filename, encoding='utf-8') as f:
+        reader = csv.DictReader(f)
+        for row in reader:
+            country = row['Country/Territory']
+            continent = row['Continent']
+            try:
+                pop = int(row['2022 Population'].replace(',', ''))
+            except:
+                continue
+            countries_by_continent[continent].append(country)
+            populations_by_continent[continent].append(pop)
+    return countries_by_continent, populations_by_continent
+
+class CountryIndex:
+    def __init__(self, countries_by_continent, populations_by_continent):
+        self.countries = {c: list(names) for c, names in countries_by_continent.items()}
+        self.populations = {c: list(pops) for c, pops in populations_by_continent.items()}
+
+    def continents(self):
+        return list(self.countries)
+
+    # Population-weighted sample of distinct countries
+    def sample(self, continent, k, rng = random):
+        countries = self.countries.get(continent, [])
+        return weighted_sample(countries, self.populations.get(continent, []), min(k, len(countries)), rng)
+
+_CACHE = {}  # absolute csv path -> (csv mtime, CountryIndex)
+
+def snapshot_path(filename):
+    return filename + SNAPSHOT_SUFFIX
+
+# A missing, stale, unreadable or other-version snapshot just means falling back to the csv
+def _read_snapshot(path, csv_mtime):
+    try:
+        if os.path.getmtime(path) < csv_mtime:
+            return None
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):  # ValueError covers bad JSON and bad UTF-8
+        return None
+    if not isinstance(data, dict) or data.get("version") != SNAPSHOT_VERSION:
+        return None
+    return CountryIndex(data["countries"], data["populations"])
+
+# Writes a precompiled copy of the csv next to it; load_country_index picks it up while it is fresh
+def build_snapshot(filename = "world_population.csv"):
+    countries, populations = load_countries_by_continent(filename)
+    with open(snapshot_path(filename), "w", encoding="utf-8") as f:
+        json.dump({"version": SNAPSHOT_VERSION, "countries": countries, "populations": populations}, f, separators=(",", ":"))
+    return CountryIndex(countries, populations)
+
+# Parsed once per process (and re-read only if the csv changes)
+def load_country_index(filename = "world_population.csv"):
+    key = os.path.abspath(filename)
+    mtime = os.path.getmtime(filename)
+    cached = _CACHE.get(key)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    index = _read_snapshot(snapshot_path(filename), mtime)
+    if index is None:
+        index = CountryIndex(*load_countries_by_continent(filename))
+    _CACHE[key] = (mtime, index)
+    return index
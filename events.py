@@ -0,0 +1,120 @@
+# Match events. The engine records them as compact tuples (see below) and they are only turned
+# into the typed records here, or rendered as text, when someone asks. In the typed records teams
+# are referred to by name, scores are (team1, team2) after the event, and describe() gives the
+# highlight line.
+from collections import namedtuple
+from instrumentation import STATS, now
+
+# Compact records: (time, kind, team index, score1, score2, *extra). The team index is 0 or 1
+# (None for weather breaks); extra holds the few kind-specific fields listed in expand().
+GOAL, SAVE, PENALTY, WEATHER_BREAK, STRATEGIC_TIMEOUT, REFEREE_STEAL, SNITCH, FULL_TIME = range(8)
+
+# How much of a match to show: nothing, only what changes the score, or every event
+VERBOSITY = ("none", "key", "full")
+KEY_EVENTS = frozenset((GOAL, PENALTY, SNITCH))
+
+def wanted(kind, verbosity = "full"):
+    if verbosity == "full":
+        return True
+    if verbosity == "key":
+        return kind in KEY_EVENTS
+    if verbosity == "none":
+        return False
+    raise ValueError(f"Unknown verbosity '{verbosity}'. Choose one of: {', '.join(VERBOSITY)}.")
+
+class Goal(namedtuple("Goal", "time team score1 score2")):
+    __slots__ = ()
+    kind = "goal"
+
+    def describe(self):
+        return f"{self.time}': {self.team} scores a goal! ({self.score1}-{self.score2})"
+
+class Save(namedtuple("Save", "time team")):
+    __slots__ = ()
+    kind = "save"
+
+    def describe(self):
+        return f"{self.time}': {self.team} makes a big save!"
+
+class Penalty(namedtuple("Penalty", "time team chaser keeper scored score1 score2")):
+    __slots__ = ()
+    kind = "penalty"
+
+    def describe(self):
+        outcome = f"GOAL! ({self.score1}-{self.score2})" if self.scored else f"SAVED by {self.keeper}!"
+        return f"{self.time}': Penalty for {self.team}! {self.chaser} vs {self.keeper}: {outcome}"
+
+WEATHER_BREAK_NAMES = {"Cloudy": "Fan interference timeout", "Sunny": "Water break", "Rainy": "Lightning risk timeout"}
+
+class WeatherBreak(namedtuple("WeatherBreak", "time condition length")):
+    __slots__ = ()
+    kind = "timeout"
+
+    def describe(self):
+        return f"{self.time}': {WEATHER_BREAK_NAMES[self.condition]} for {self.length} min ({self.condition})."
+
+class StrategicTimeout(namedtuple("StrategicTimeout", "time team other team_attacks other_attacks minutes")):
+    __slots__ = ()
+    kind = "strategic_timeout"
+
+    def describe(self):
+        return (
+            f"{self.time}': Strategic timeout! {self.team} calls it. "
+            f"Boosts: {self.team} (+2 for {self.team_attacks} attacks), "
+            f"{self.other} (+1 for {self.other_attacks} attacks). "
+            f"Play resumed after {self.minutes} min."
+        )
+
+class RefereeSteal(namedtuple("RefereeSteal", "time team")):
+    __slots__ = ()
+    kind = "referee_steal"
+
+    def describe(self):
+        return f"{self.time}': Referee bias! {self.team} steals the attack."
+
+class SnitchCaught(namedtuple("SnitchCaught", "time team")):
+    __slots__ = ()
+    kind = "snitch"
+
+    def describe(self):
+        return f"{self.time}': {self.team}'s Seeker catches the Snitch! (+150 points)"
+
+# Always the last event; carries the finished MatchResult
+class FullTime(namedtuple("FullTime", "time result")):
+    __slots__ = ()
+    kind = "full_time"
+
+    def describe(self):
+        r = self.result
+        return f"{self.time}': Full time. {r.team1_name} {r.team1_score} - {r.team2_score} {r.team2_name}"
+
+# Compact record -> typed event; names is (team1 name, team2 name)
+def expand(record, names):
+    time, kind, team, score1, score2 = record[:5]
+    if kind == GOAL:
+        return Goal(time, names[team], score1, score2)
+    if kind == SAVE:
+        return Save(time, names[team])
+    if kind == PENALTY:
+        scored, chaser, keeper = record[5:]
+        return Penalty(time, names[team], chaser, keeper, scored, score1, score2)
+    if kind == WEATHER_BREAK:
+        condition, length = record[5:]
+        return WeatherBreak(time, condition, length)
+    if kind == STRATEGIC_TIMEOUT:
+        team_attacks, other_attacks, minutes = record[5:]
+        return StrategicTimeout(time, names[team], names[1 - team], team_attacks, other_attacks, minutes)
+    if kind == REFEREE_STEAL:
+        return RefereeSteal(time, names[team])
+    if kind == SNITCH:
+        return SnitchCaught(time, names[team])
+    raise ValueError(f"Unknown event kind {kind}.")
+
+def render(records, names, verbosity = "full"):
+    if not STATS.enabled:
+        return [expand(r, names).describe() for r in records if wanted(r[1], verbosity)]
+    start = now()
+    lines = [expand(r, names).describe() for r in records if wanted(r[1], verbosity)]
+    STATS.count("events_formatted", len(lines))
+    STATS.add_time("rendering", now() - start)
+    return lines
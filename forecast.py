@@ -0,0 +1,132 @@
+import os
+import random
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from models import create_random_team
+from tournaments import TournamentRunner, make_groups, pick_team_names
+from seeding import derive_seed, make_rng
+from matchup_cache import MatchupCache
+
+# Tournaments per task sent to a worker process
+CHUNK_SIZE = 50
+
+class Forecast:
+    def __init__(self, team_names, fifa_style):
+        self.team_names = list(team_names)
+        self.fifa_style = fifa_style
+        self.runs = 0
+        self.group_wins = Counter()
+        self.reached = {}  # round title -> Counter of teams that played in it
+        self.round_order = []
+        self.champions = Counter()
+
+    def add(self, result):
+        self.runs += 1
+        for group in result.groups:
+            self.group_wins[group.ranking[0]] += 1
+        for knockout_round in result.rounds:
+            if knockout_round.title not in self.reached:
+                self.reached[knockout_round.title] = Counter()
+                self.round_order.append(knockout_round.title)
+            for t1, t2 in knockout_round.pairs:
+                self.reached[knockout_round.title][t1] += 1
+                if t2 is not None:
+                    self.reached[knockout_round.title][t2] += 1
+        self.champions[result.champion] += 1
+
+    def merge(self, other):
+        self.runs += other.runs
+        self.group_wins.update(other.group_wins)
+        for title in other.round_order:
+            if title not in self.reached:
+                self.reached[title] = Counter()
+                self.round_order.append(title)
+            self.reached[title].update(other.reached[title])
+        self.champions.update(other.champions)
+        return self
+
+    def _share(self, count):
+        return count / self.runs if self.runs else 0.0
+
+    def group_win_prob(self, team):
+        return self._share(self.group_wins[team])
+
+    def reach_prob(self, team, round_title):
+        return self._share(self.reached.get(round_title, Counter())[team])
+
+    def win_prob(self, team):
+        return self._share(self.champions[team])
+
+    # One row per team, favourites first: (team, group win, [reach each round], cup win)
+    def table(self):
+        rows = [
+            (team, self.group_win_prob(team), [self.reach_prob(team, r) for r in self.round_order], self.win_prob(team))
+            for team in self.team_names
+        ]
+        return sorted(rows, key=lambda row: (-row[3], -row[1], row[0]))
+
+# Plays tournaments start .. start+n-1. With a root seed each one runs on its own seeded
+# runner, numbered across all chunks, so without a cache the split into chunks doesn't change
+# the results. cache_samples > 0 shares one MatchupCache between the tournaments of the chunk;
+# which meetings are simulated and which are drawn then depends on the chunk boundaries, so a
+# seeded forecast is only reproducible for the same chunk_size (the number of workers still
+# doesn't matter).
+def _run_batch(teams_dict, groups, fifa_style, start, n, seed, engine = "scalar", cache_samples = None):
+    forecast = Forecast(teams_dict, fifa_style)
+    cache = None
+    if cache_samples:
+        cache = MatchupCache(samples=cache_samples)
+    runner = TournamentRunner(engine=engine, cache=cache)
+    for k in range(start, start + n):
+        if seed is not None:
+            runner = TournamentRunner(engine=engine, seed=derive_seed(seed, "tournament", k), cache=cache)
+        forecast.add(runner.run(fifa_style=fifa_style, teams_dict=teams_dict, groups=groups))
+    return forecast
+
+def draw_teams(num_teams, rng = random):
+    team_names = pick_team_names(num_teams, rng=rng)
+    rng.shuffle(team_names)
+    return {name: create_random_team(name, rng) for name in team_names}
+
+# Plays the same tournament (same teams, same group draw) `runs` times across a process pool.
+# A seed makes the forecast reproducible, with or without workers. cache_samples=k plays each
+# matchup k times per chunk and draws later meetings from those outcomes (see matchup_cache.py);
+# with a cache, seeded results also depend on chunk_size.
+def forecast_tournament(teams_dict = None, num_teams = None, fifa_style = True, runs = 1000, workers = None, groups = None, chunk_size = CHUNK_SIZE, engine = "scalar", group_size = 4, seed = None, cache_samples = None):
+    if runs < 1:
+        raise ValueError("Number of runs must be positive.")
+    if teams_dict is None:
+        if num_teams is None:
+            raise ValueError("Pass either teams_dict or num_teams.")
+        teams_dict = draw_teams(num_teams, random if seed is None else make_rng(seed, "teams"))
+    if groups is None:
+        groups = make_groups(list(teams_dict), group_size)
+
+    workers = workers or os.cpu_count() or 1
+    sizes = [chunk_size] * (runs // chunk_size) + ([runs % chunk_size] if runs % chunk_size else [])
+    starts = [k * chunk_size for k in range(len(sizes))]
+    forecast = Forecast(teams_dict, fifa_style)
+
+    if workers == 1 or len(sizes) == 1:
+        for start, size in zip(starts, sizes):
+            forecast.merge(_run_batch(teams_dict, groups, fifa_style, start, size, seed, engine, cache_samples))
+        return forecast
+
+    # Worker processes must not all replay the parent's random state
+    if seed is None:
+        seed = random.getrandbits(64)
+    with ProcessPoolExecutor(max_workers=min(workers, len(sizes))) as pool:
+        futures = [pool.submit(_run_batch, teams_dict, groups, fifa_style, start, size, seed, engine, cache_samples) for start, size in zip(starts, sizes)]
+        for future in futures:
+            forecast.merge(future.result())
+    return forecast
+
+def print_forecast(forecast, top = None):
+    style = "FIFA" if forecast.fifa_style else "Cannon"
+    print(f"\n=== WORLD CUP FORECAST ({style} style, {forecast.runs} simulated tournaments) ===")
+    header = ["Team", "Group win"] + forecast.round_order + ["Champion"]
+    print("{:<24}".format(header[0]) + "".join("{:>15}".format(h) for h in header[1:]))
+    rows = forecast.table()
+    for team, group_win, reached, cup in rows[:top] if top else rows:
+        cells = [group_win] + reached + [cup]
+        print("{:<24}".format(team) + "".join("{:>15}".format(f"{c:.1%}") for c in cells))
@@ -0,0 +1,65 @@
+import json
+import os
+import time
+from collections import Counter
+
+# Counters and phase timings for the match engine, aggregated over every match played in
+# this process. Switched off by default: the engine then only checks STATS.enabled once per
+# match (plus a few integer increments on rare branches). Turn it on with enable() or by
+# setting QUIDDITCH_INSTRUMENT=1 in the environment.
+#
+# Counters:  matches, loop_iterations, attacks, boost_window_scans, penalty_checks,
+#            timeout_checks, factor_draws, events_formatted
+# Phases:    factors, deepcopy, main_loop, skip_loop, rendering
+
+class Instrumentation:
+    def __init__(self):
+        self.enabled = False
+        self.counters = Counter()
+        self.phase_seconds = Counter()
+        self.phase_calls = Counter()
+
+    def reset(self):
+        self.counters.clear()
+        self.phase_seconds.clear()
+        self.phase_calls.clear()
+
+    def count(self, name, n = 1):
+        self.counters[name] += n
+
+    def add_time(self, phase, seconds):
+        self.phase_seconds[phase] += seconds
+        self.phase_calls[phase] += 1
+
+    def snapshot(self):
+        matches = self.counters["matches"]
+        return {
+            "counters": dict(self.counters),
+            "per_match": {k: v / matches for k, v in self.counters.items() if k != "matches"} if matches else {},
+            "phases": {
+                phase: {
+                    "calls": self.phase_calls[phase],
+                    "total_ms": seconds * 1000,
+                    "mean_us": seconds * 1e6 / self.phase_calls[phase],
+                }
+                for phase, seconds in self.phase_seconds.items()
+            },
+        }
+
+    def dump(self, filename):
+        with open(filename, "w") as f:
+            json.dump(self.snapshot(), f, indent=2)
+
+STATS = Instrumentation()
+STATS.enabled = os.environ.get("QUIDDITCH_INSTRUMENT", "") not in ("", "0")
+
+def enable(reset = True):
+    if reset:
+        STATS.reset()
+    STATS.enabled = True
+
+def disable():
+    STATS.enabled = False
+
+# perf_counter, re-exported so callers only import this module
+now = time.perf_counter
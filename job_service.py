@@ -0,0 +1,479 @@
+import argparse
+import asyncio
+import itertools
+import json
+import multiprocessing
+import os
+import random
+import time
+import traceback
+from broadcast import BAD_REQUEST, read_request, respond, sse_bytes
+from events import VERBOSITY
+from montecarlo import ENGINES as MONTE_CARLO_ENGINES, simulate_many
+from seeding import make_rng
+from simulation import ENGINES, simulate_match
+from team_io import RosterError, team_from_record
+from tournaments import TournamentObserver, TournamentRunner
+
+# Simulation jobs behind a local HTTP/JSON service (standard library only).
+#
+#   POST   /jobs                {"kind": "match" | "head_to_head" | "tournament", ...} -> 202 {"id": ...}
+#                               429 when the queue is full; see JOB_PARAMS for each kind's fields
+#   GET    /jobs                every known job (without results)
+#   GET    /jobs/<id>           status, latest progress and, once done, the result
+#   GET    /jobs/<id>/events    SSE stream of status and progress updates, ending with the result
+#   DELETE /jobs/<id>           cancel a queued or running job
+#
+# Jobs wait in a bounded queue for one of `workers` long-lived worker processes (one per CPU by
+# default). A job that runs past its timeout, or is cancelled while running, has its worker
+# process killed and replaced, so a stuck simulation never holds a slot for good.
+
+JOB_KINDS = ("match", "head_to_head", "tournament")
+FINISHED = ("done", "failed", "cancelled", "timed_out")
+WORKER_DIED = "worker process died"
+
+# kind -> {field: default}; teams are given in the Team.to_dict format
+JOB_PARAMS = {
+    "match": {"team1": None, "team2": None, "time_limit": None, "engine": "scalar", "verbosity": "full", "seed": None},
+    "head_to_head": {"team1": None, "team2": None, "runs": 1000, "time_limit": None, "engine": "scalar", "seed": None},
+    "tournament": {"num_teams": None, "teams": None, "fifa_style": True, "group_size": 4, "engine": "scalar", "seed": None},
+}
+
+class JobError(ValueError):
+    pass
+
+class QueueFull(Exception):
+    pass
+
+def validate_job(data):
+    if not isinstance(data, dict):
+        raise JobError("expected a JSON object")
+    kind = data.get("kind")
+    if kind not in JOB_KINDS:
+        raise JobError(f"kind must be one of {', '.join(JOB_KINDS)}")
+    unknown = set(data) - set(JOB_PARAMS[kind]) - {"kind", "timeout"}
+    if unknown:
+        raise JobError(f"unknown field(s) for a {kind} job: {', '.join(sorted(unknown))}")
+    params = dict(JOB_PARAMS[kind], **{k: v for k, v in data.items() if k not in ("kind", "timeout")})
+
+    def whole(name, minimum = 1):
+        value = params[name]
+        if value is not None and (not isinstance(value, int) or isinstance(value, bool) or value < minimum):
+            raise JobError(f"{name} must be a whole number of at least {minimum}")
+
+    try:
+        if kind == "tournament":
+            whole("num_teams", 2)
+            whole("group_size", 2)
+            if params["teams"] is not None:
+                if not isinstance(params["teams"], list):
+                    raise JobError("teams must be a list of teams")
+                names = [team_from_record(t).name for t in params["teams"]]
+                if len(set(names)) != len(names):
+                    raise JobError("team names must be unique")
+            elif params["num_teams"] is None:
+                raise JobError("a tournament needs num_teams or teams")
+        else:
+            for name in ("team1", "team2"):
+                if params[name] is None:
+                    raise JobError(f"a {kind} job needs {name}")
+                team_from_record(params[name])
+            whole("time_limit")
+        if kind == "head_to_head":
+            whole("runs")
+            if params["engine"] not in MONTE_CARLO_ENGINES:
+                raise JobError(f"engine must be one of {', '.join(MONTE_CARLO_ENGINES)}")
+        elif params["engine"] not in ENGINES:
+            raise JobError(f"engine must be one of {', '.join(ENGINES)}")
+        if kind == "match" and params["verbosity"] not in VERBOSITY:
+            raise JobError(f"verbosity must be one of {', '.join(VERBOSITY)}")
+    except RosterError as e:
+        raise JobError(str(e)) from None
+    whole("seed", 0)
+
+    timeout = data.get("timeout")
+    if timeout is not None and (not isinstance(timeout, (int, float)) or isinstance(timeout, bool) or timeout <= 0):
+        raise JobError("timeout must be a positive number of seconds")
+    return kind, params, timeout
+
+# --- Running jobs (inside the worker processes) ---
+
+def _match_json(result):
+    return {
+        "team1": result.team1_name, "team2": result.team2_name,
+        "score1": result.team1_score, "score2": result.team2_score,
+        "snitch_catcher": result.snitch_catcher, "time": result.time,
+        "attacks": [result.team1_attacks, result.team2_attacks],
+        "goals": [result.team1_goals, result.team2_goals],
+        "saves": [result.team1_saves, result.team2_saves],
+        "penalties": result.penalty_stats,
+        "factors": result.applied_factors,
+    }
+
+def _head_to_head_json(summary):
+    return {
+        "team1": summary.team1_name, "team2": summary.team2_name, "matches": summary.matches,
+        "team1_win": summary.team1_win_prob, "draw": summary.draw_prob, "team2_win": summary.team2_win_prob,
+        "team1_snitch": summary.snitch_share(summary.team1_name),
+        "team2_snitch": summary.snitch_share(summary.team2_name),
+        "mean_time": summary.mean_time(),
+        "mean_score": [summary.mean_score(summary.team1_name), summary.mean_score(summary.team2_name)],
+        "top_scorelines": [[s1, s2, count] for (s1, s2), count in summary.scorelines.most_common(10)],
+    }
+
+def _record_json(record):
+    return {"team1": record.team1, "team2": record.team2, "score1": record.team1_score,
+            "score2": record.team2_score, "winner": record.winner}
+
+def _tournament_json(result):
+    return {
+        "champion": result.champion,
+        "groups": [{"index": g.index, "table": [[name, stats] for name, stats in g.table]} for g in result.groups],
+        "rounds": [{"title": r.title, "matches": [_record_json(m) for m in r.matches]} for r in result.rounds],
+    }
+
+class _ProgressObserver(TournamentObserver):
+    def __init__(self, send):
+        self.send = send
+        self.played = 0
+
+    def on_match_end(self, stage, record):
+        self.played += 1
+        self.send({"matches_played": self.played, "stage": stage})
+
+    def on_champion(self, champion):
+        self.send({"matches_played": self.played, "champion": champion})
+
+def run_job(kind, params, send_progress):
+    seed = params["seed"]
+    if kind == "match":
+        rng = random.Random() if seed is None else make_rng(seed, "match")
+        team1, team2 = team_from_record(params["team1"]), team_from_record(params["team2"])
+        result = simulate_match(team1, team2, params["time_limit"], quiet=True, engine=params["engine"], rng=rng)
+        data = _match_json(result)
+        data["highlights"] = result.highlights(params["verbosity"]) if result.event_log is not None else []
+        return data
+    if kind == "head_to_head":
+        team1, team2 = team_from_record(params["team1"]), team_from_record(params["team2"])
+        runs = params["runs"]
+        summary = simulate_many(
+            team1, team2, runs, workers=1, time_limit=params["time_limit"], engine=params["engine"], seed=seed,
+            on_chunk=lambda s: send_progress({"matches": s.matches, "of": runs, "team1_win": s.team1_win_prob}),
+        )
+        return _head_to_head_json(summary)
+    teams_dict = None
+    if params["teams"] is not None:
+        teams_dict = {t.name: t for t in map(team_from_record, params["teams"])}
+    num_teams = len(teams_dict) if teams_dict else params["num_teams"]
+    observer = _ProgressObserver(send_progress)
+    result = TournamentRunner([observer], params["engine"], seed).run(
+        num_teams, params["fifa_style"], teams_dict, group_size=params["group_size"])
+    return _tournament_json(result)
+
+def _worker_main(conn):
+    def send_progress(data):
+        conn.send(("progress", data))
+
+    while True:
+        try:
+            message = conn.recv()
+        except EOFError:
+            return
+        if message is None:
+            return
+        kind, params = message
+        try:
+            conn.send(("done", run_job(kind, params, send_progress)))
+        except Exception as e:
+            conn.send(("failed", f"{type(e).__name__}: {e}", traceback.format_exc()))
+
+# --- The service (event loop side) ---
+
+class Job:
+    def __init__(self, job_id, kind, params, timeout):
+        self.id = job_id
+        self.kind = kind
+        self.params = params
+        self.timeout = timeout
+        self.status = "queued"
+        self.progress = None
+        self.result = None
+        self.error = None
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self.updates = []  # (event name, data), replayed to every stream
+        self.changed = asyncio.Event()
+        self.cancel_requested = False
+
+    def update(self, name, data):
+        self.updates.append((name, data))
+        self.changed.set()
+        self.changed = asyncio.Event()
+
+    def set_status(self, status, error = None):
+        self.status = status
+        self.error = error
+        if status == "running":
+            self.started = time.time()
+        if status in FINISHED:
+            self.finished = time.time()
+        self.update("status", self.summary(result = status == "done"))
+
+    def summary(self, result = True):
+        data = {
+            "id": self.id, "kind": self.kind, "status": self.status,
+            "created": self.created, "started": self.started, "finished": self.finished,
+            "progress": self.progress,
+        }
+        if self.error is not None:
+            data["error"] = self.error
+        if result and self.status == "done":
+            data["result"] = self.result
+        return data
+
+class _Worker:
+    def __init__(self, context):
+        self.context = context
+        self.start()
+
+    def start(self):
+        self.conn, child_conn = self.context.Pipe()
+        self.process = self.context.Process(target=_worker_main, args=(child_conn,), daemon=True)
+        self.process.start()
+        child_conn.close()
+
+    def restart(self):
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+        self.start()
+
+    def stop(self):
+        try:
+            self.conn.send(None)
+        except (BrokenPipeError, OSError):
+            pass
+        self.process.join(1)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+
+class JobService:
+    # workers: worker processes (default: one per CPU). queue_size: jobs waiting beyond the
+    # running ones before submit() refuses more. timeout: default seconds a job may run.
+    def __init__(self, workers = None, queue_size = 64, timeout = 300.0, keep_finished = 1000):
+        self.workers = workers or os.cpu_count() or 1
+        self.timeout = timeout
+        self.keep_finished = keep_finished
+        self.queue = asyncio.Queue(queue_size)
+        self.jobs = {}
+        self._ids = itertools.count(1)
+        self._running = {}  # job id -> asyncio task waiting on its worker
+        self._tasks = []
+        self._pool = []
+        self._server = None
+
+    async def start(self, host = "127.0.0.1", port = 8766):
+        context = multiprocessing.get_context("spawn")
+        loop = asyncio.get_running_loop()
+        self._pool = await loop.run_in_executor(None, lambda: [_Worker(context) for _ in range(self.workers)])
+        self._tasks = [loop.create_task(self._work(worker)) for worker in self._pool]
+        self._server = await asyncio.start_server(self._handle, host, port)
+        return self._server
+
+    async def serve_forever(self, host = "127.0.0.1", port = 8766):
+        server = await self.start(host, port)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            await self.close()
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        for worker in self._pool:
+            worker.stop()
+        self._pool = []
+
+    def submit(self, kind, params, timeout = None):
+        job = Job(next(self._ids), kind, params, timeout or self.timeout)
+        try:
+            self.queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise QueueFull(f"{self.queue.qsize()} jobs are already waiting") from None
+        self.jobs[job.id] = job
+        job.set_status("queued")
+        self._forget_finished()
+        return job
+
+    def cancel(self, job):
+        if job.status in FINISHED:
+            return False
+        job.cancel_requested = True
+        task = self._running.get(job.id)
+        if task is not None:
+            task.cancel()
+        else:
+            # Still queued: the worker loop skips it when it comes up
+            job.set_status("cancelled")
+        return True
+
+    def _forget_finished(self):
+        finished = [job_id for job_id, job in self.jobs.items() if job.status in FINISHED]
+        for job_id in finished[:max(0, len(finished) - self.keep_finished)]:
+            del self.jobs[job_id]
+
+    async def _work(self, worker):
+        while True:
+            job = await self.queue.get()
+            if job.cancel_requested:
+                continue
+            job.set_status("running")
+            task = asyncio.ensure_future(self._run_on(worker, job))
+            self._running[job.id] = task
+            try:
+                status, payload = await asyncio.wait_for(task, job.timeout)
+            except asyncio.TimeoutError:
+                status, payload = "timed_out", f"job ran for more than {job.timeout:g} seconds"
+            except asyncio.CancelledError:
+                if not job.cancel_requested:
+                    raise  # the service is shutting down
+                status, payload = "cancelled", None
+            except Exception:
+                status, payload = "failed", WORKER_DIED
+            finally:
+                self._running.pop(job.id, None)
+            if status in ("timed_out", "cancelled") or payload == WORKER_DIED:
+                try:
+                    await asyncio.get_running_loop().run_in_executor(None, worker.restart)
+                except Exception as e:
+                    job.set_status("failed", f"{WORKER_DIED} and could not be restarted: {e}")
+                    continue
+            if status == "done":
+                job.result = payload
+                job.set_status("done")
+            else:
+                job.set_status(status, payload)
+
+    # Sends the job to the worker and relays its messages until it finishes. A dead worker is
+    # reported as ("failed", WORKER_DIED); _work restarts it.
+    async def _run_on(self, worker, job):
+        loop = asyncio.get_running_loop()
+        messages = asyncio.Queue()
+        fd = worker.conn.fileno()
+
+        def readable():
+            try:
+                while worker.conn.poll():
+                    messages.put_nowait(worker.conn.recv())
+            except (EOFError, OSError):
+                loop.remove_reader(fd)
+                messages.put_nowait(("failed", WORKER_DIED, None))
+
+        try:
+            worker.conn.send((job.kind, job.params))
+        except (OSError, EOFError):
+            return "failed", WORKER_DIED
+        loop.add_reader(fd, readable)
+        try:
+            while True:
+                message = await messages.get()
+                if message[0] == "progress":
+                    job.progress = message[1]
+                    job.update("progress", message[1])
+                    continue
+                return message[0], message[1]
+        finally:
+            loop.remove_reader(fd)
+
+    # --- HTTP ---
+
+    async def _handle(self, reader, writer):
+        try:
+            try:
+                method, target, body = await read_request(reader)
+            except BAD_REQUEST:
+                await respond(writer, 400, {"error": "bad request"})
+                return
+            parts = [p for p in target.split("?", 1)[0].split("/") if p]
+            job = None
+            if len(parts) >= 2 and parts[0] == "jobs":
+                job = self.jobs.get(int(parts[1])) if parts[1].isdigit() else None
+                if job is None:
+                    await respond(writer, 404, {"error": f"no job {parts[1]}"})
+                    return
+
+            if parts == ["jobs"] and method == "POST":
+                await self._post_job(writer, body)
+            elif parts == ["jobs"] and method == "GET":
+                await respond(writer, 200, [j.summary(result=False) for j in self.jobs.values()])
+            elif len(parts) == 2 and method == "GET":
+                await respond(writer, 200, job.summary())
+            elif len(parts) == 2 and method == "DELETE":
+                if self.cancel(job):
+                    await respond(writer, 202, job.summary())
+                else:
+                    await respond(writer, 409, {"error": f"job {job.id} has already {job.status.replace('_', ' ')}"})
+            elif len(parts) == 3 and parts[2] == "events" and method == "GET":
+                await self._stream(writer, job)
+            else:
+                await respond(writer, 404, {"error": "not found"})
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _post_job(self, writer, body):
+        try:
+            kind, params, timeout = validate_job(json.loads(body or b"{}"))
+        except (json.JSONDecodeError, JobError) as e:
+            await respond(writer, 400, {"error": str(e)})
+            return
+        try:
+            job = self.submit(kind, params, timeout)
+        except QueueFull as e:
+            await respond(writer, 429, {"error": f"queue full: {e}; try again later"})
+            return
+        await respond(writer, 202, job.summary())
+
+    async def _stream(self, writer, job):
+        writer.write(
+            b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\n"
+            b"Cache-Control: no-cache\r\nConnection: close\r\n\r\n"
+        )
+        sent = 0
+        while True:
+            changed = job.changed
+            for name, data in job.updates[sent:]:
+                writer.write(f"event: {name}\n".encode() + sse_bytes(data))
+            sent = len(job.updates)
+            await writer.drain()
+            if job.status in FINISHED:
+                return
+            await changed.wait()
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(description="Run Quidditch simulations as jobs behind a local HTTP/JSON service.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--workers", type=int, help="worker processes (default: one per CPU)")
+    parser.add_argument("--queue", type=int, default=64, help="jobs that may wait before new ones get a 429 (default: 64)")
+    parser.add_argument("--timeout", type=float, default=300.0, help="default seconds a job may run (default: 300)")
+    args = parser.parse_args(argv)
+
+    service = JobService(args.workers, args.queue, args.timeout)
+    print(f"Job service on http://{args.host}:{args.port}/jobs with {service.workers} worker(s)")
+    try:
+        asyncio.run(service.serve_forever(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,36 +1,74 @@
+import argparse
+import os
 import random
 import json
 from models import Player, Team, create_random_team
 from simulation import simulate_match
 from tournaments import tournament_4_teams, run_tournament
+from forecast import forecast_tournament, print_forecast
+from team_store import TeamStore, TeamOverlay
+from team_io import TeamReader, is_team_stream, write_teams
+from profiling import add_profile_arguments, profile_from_args
 
 def save_teams(teams):
-    filename = input("Enter filename to save teams (e.g., teams.json): ").strip()
+    filename = input("Enter filename to save teams (e.g., teams.json, teams.ndjson or teams.db): ").strip()
     if not filename:
         print("Invalid filename.")
         return
+    if filename.endswith(".db"):
+        # SQLite store: adds the teams (replacing same-named ones) and keeps the rest
+        with TeamStore(filename) as store:
+            store.save_many(teams.values())
+        print(f"Teams saved to {filename}")
+        return
+    if is_team_stream(filename):
+        write_teams(filename, teams.values())
+        print(f"Teams saved to {filename}")
+        return
     data = [team.to_dict() for team in teams.values()]
     with open(filename, "w") as f:
         json.dump(data, f, indent=2)
     print(f"Teams saved to {filename}")
 
-def load_teams():
-    filename = input("Enter filename to load teams from (e.g., teams.json): ").strip()
+# Adds the teams from a file to `teams` (a TeamOverlay); same-named teams are replaced
+def load_teams(teams):
+    filename = input("Enter filename to load teams from (e.g., teams.json, teams.ndjson or teams.db): ").strip()
     if not filename:
         print("Invalid filename.")
-        return {}
-    try:
-        with open(filename, "r") as f:
-            data = json.load(f)
-        teams = {}
+        return
+    if filename.endswith(".db"):
+        if not os.path.exists(filename):
+            print(f"No file named {filename} found.")
+            return
+        # Kept open: each stored team is only read when it is first used
+        store = TeamStore(filename)
+        teams.add_store(store)
+        print(f"Loaded {len(store)} teams from {filename}")
+        return
+    if is_team_stream(filename):
+        # Partial rosters are fine in the CLI; bad lines are skipped and reported
+        reader = TeamReader(filename, require_complete=False, errors="skip")
+        try:
+            loaded = {team.name: team for team in reader}
+        except FileNotFoundError:
+            print(f"No file named {filename} found.")
+            return
+        for line_number, message in reader.errors:
+            print(f"{filename}:{line_number}: skipped ({message})")
+    else:
+        try:
+            with open(filename, "r") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            print(f"No file named {filename} found.")
+            return
+        loaded = {}
         for team_data in data:
             team = Team.from_dict(team_data)
-            teams[team.name] = team
-        print(f"Loaded {len(teams)} teams from {filename}")
-        return teams
-    except FileNotFoundError:
-        print(f"No file named {filename} found.")
-        return {}
+            loaded[team.name] = team
+    for name, team in loaded.items():
+        teams[name] = team
+    print(f"Loaded {len(loaded)} teams from {filename}")
 
 def print_menu():
     print("\n=== Quidditch Simulation CLI ===")
@@ -43,10 +81,11 @@ def print_menu():
     print("7. Load teams from file")
     print("8. Simulate a match")
     print("9. Play a tournament")
+    print("10. Forecast a World Cup (many simulated tournaments)")
     print("0. Exit")
 
 def main():
-    teams = {}
+    teams = TeamOverlay()
 
     while True:
         print_menu()
@@ -131,7 +170,7 @@ def main():
             save_teams(teams)
 
         elif choice == "7":
-            teams = load_teams()
+            load_teams(teams)
 
         elif choice == "8":
             if len(teams) < 2:
@@ -157,12 +196,12 @@ def main():
 
         elif choice == "9":
             try:
-                number_of_teams = int(input("How many teams do you want to simulate? (4/16/32/64): ").strip())
+                number_of_teams = int(input("How many teams do you want to simulate? (4 for the Hogwarts cup, 8 or more for a World Cup): ").strip())
             except ValueError:
-                print("Please enter a valid number (4, 16, 32, or 64).")
+                print("Please enter a valid number (4, or 8 and up).")
                 continue
-            if number_of_teams not in [4, 16, 32, 64]:
-                print("Invalid number of teams. Please enter 4, 16, 32, or 64.")
+            if number_of_teams != 4 and number_of_teams < 8:
+                print("Invalid number of teams. Please enter 4, or 8 and up.")
                 continue
             if number_of_teams == 4:
                 tournament_4_teams()
@@ -176,7 +215,25 @@ def main():
                     print("Invalid input. Please enter 'fifa' or 'cannon'.")
                     continue
 
+        elif choice == "10":
+            try:
+                number_of_teams = int(input("How many teams? (8 or more, e.g. 32): ").strip())
+                runs = int(input("How many tournaments to simulate? (e.g., 1000): ").strip())
+            except ValueError:
+                print("Please enter a valid number.")
+                continue
+            if number_of_teams < 8 or runs < 1:
+                print("Invalid input. Please enter at least 8 teams and a positive number of runs.")
+                continue
+            style = input("Group stage in FIFA style or Cannon style? (fifa/cannon): ").strip().lower()
+            if style not in ("fifa", "cannon"):
+                print("Invalid input. Please enter 'fifa' or 'cannon'.")
+                continue
+            forecast = forecast_tournament(num_teams=number_of_teams, fifa_style=(style == "fifa"), runs=runs)
+            print_forecast(forecast)
+
         elif choice == "0":
+            teams.close()
             print("Goodbye!")
             break
 
@@ -184,4 +241,11 @@ def main():
             print("Invalid option.")
 
 if __name__ == "__main__":
-    main()
+    # python main.py --profile sample --workload tournament --teams 64
+    parser = argparse.ArgumentParser(description="Quidditch team manager and simulator.")
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    if args.profile:
+        profile_from_args(args)
+    else:
+        main()
@@ -0,0 +1,110 @@
+import json
+import os
+import random
+from collections import OrderedDict
+from simulation import MatchResult, simulate_match
+
+# Saved caches are plain JSON: {"version": ..., "samples": ..., "entries": [[key, outcomes], ...]}.
+# Bumped whenever that layout changes.
+CACHE_VERSION = 1
+
+def matchup_key(team1, team2, time_limit = None, engine = "scalar"):
+    return (team1.fingerprint(), team2.fingerprint(), time_limit, engine)
+
+# JSON turns tuples into lists; saved keys must be hashable and equal to matchup_key()
+def _as_tuple(value):
+    return tuple(_as_tuple(v) for v in value) if isinstance(value, list) else value
+
+# Bounded LRU cache of head-to-head outcome distributions. The first `samples` meetings of
+# two fingerprints (with the same time limit and engine) are simulated as usual and their
+# outcomes kept; every later meeting draws one of those outcomes instead of playing the match.
+# So the cache never simulates more than playing every match would, and pays off for
+# matchups that repeat many times, e.g. group games across the runs of a forecast.
+# Sides are not interchangeable (strategic timeouts favour team1), so (A, B) and (B, A) are
+# separate entries.
+class MatchupCache:
+    def __init__(self, max_entries = 4096, samples = 256):
+        self.max_entries = max_entries
+        self.samples = samples
+        self.entries = OrderedDict()  # key -> list of outcome tuples (see _outcome)
+        self.hits = 0    # meetings drawn from the cache
+        self.misses = 0  # meetings simulated
+
+    def __len__(self):
+        return len(self.entries)
+
+    @staticmethod
+    def _outcome(result):
+        names = (result.team1_name, result.team2_name)
+        side = names.index(result.snitch_catcher) + 1 if result.snitch_catcher is not None else 0
+        p1 = result.penalty_stats[names[0]]
+        p2 = result.penalty_stats[names[1]]
+        return (
+            result.team1_score, result.team2_score, side, result.time,
+            result.team1_attacks, result.team2_attacks, result.team1_goals, result.team2_goals,
+            result.team1_saves, result.team2_saves,
+            p1["awarded"], p1["scored"], p2["awarded"], p2["scored"],
+        )
+
+    # Outcomes collected so far for this matchup (up to `samples`), or None
+    def distribution(self, team1, team2, time_limit = None, engine = "scalar"):
+        return self.entries.get(matchup_key(team1, team2, time_limit, engine))
+
+    # Plays the match while the matchup has fewer than `samples` outcomes, otherwise returns a
+    # MatchResult drawn from them (without highlights or factor descriptions)
+    def play(self, team1, team2, time_limit = None, engine = "scalar", rng = random):
+        key = matchup_key(team1, team2, time_limit, engine)
+        outcomes = self.entries.get(key)
+        if outcomes is None:
+            outcomes = self.entries[key] = []
+            if len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        else:
+            self.entries.move_to_end(key)
+
+        if len(outcomes) < self.samples:
+            self.misses += 1
+            result = simulate_match(team1, team2, time_limit, quiet=True, record_events=False, engine=engine, rng=rng)
+            outcomes.append(self._outcome(result))
+            return result
+
+        self.hits += 1
+        (s1, s2, side, time, a1, a2, g1, g2, sv1, sv2, pa1, ps1, pa2, ps2) = outcomes[rng.randrange(len(outcomes))]
+        result = MatchResult(team1.name, team2.name)
+        result.team1_score = s1
+        result.team2_score = s2
+        result.snitch_catcher = (None, team1.name, team2.name)[side]
+        result.time = time
+        result.team1_attacks = a1
+        result.team2_attacks = a2
+        result.team1_goals = g1
+        result.team2_goals = g2
+        result.team1_saves = sv1
+        result.team2_saves = sv2
+        result.penalty_stats = {
+            team1.name: {"awarded": pa1, "scored": ps1},
+            team2.name: {"awarded": pa2, "scored": ps2},
+        }
+        return result
+
+    def save(self, path):
+        data = {"version": CACHE_VERSION, "samples": self.samples, "entries": list(self.entries.items())}
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+
+    # Starts empty if the file is missing, unreadable or from another version
+    @classmethod
+    def load(cls, path, max_entries = 4096, samples = 256):
+        cache = cls(max_entries, samples)
+        if not os.path.exists(path):
+            return cache
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):  # ValueError covers bad JSON and bad UTF-8
+            return cache
+        if not isinstance(data, dict) or data.get("version") != CACHE_VERSION or data.get("samples") != samples:
+            return cache
+        for key, outcomes in data["entries"][-max_entries:]:
+            cache.entries[_as_tuple(key)] = [tuple(o) for o in outcomes]
+        return cache
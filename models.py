@@ -7,7 +7,12 @@ ROLE_LIMITS = {
     "Seeker": 1
 }
 
+# Fixed 7-slot order of a full roster (Chasers, Beaters, Keeper, Seeker), e.g. for factor batches
+ROLE_SLOTS = [role for role, count in ROLE_LIMITS.items() for _ in range(count)]
+
 class Player:
+    __slots__ = ("name", "role", "skill")
+
     def __init__(self, name, role, skill):
         self.name = name
         self.role = role
@@ -28,6 +33,8 @@ class Player:
         return cls(data["name"], data["role"], data["skill"])
 
 class Team:
+    __slots__ = ("name", "players")
+
     def __init__(self, name):
         self.name = name
         self.players = []
@@ -52,6 +59,11 @@ class Team:
         players_str = "\n  ".join(str(p) for p in self.players)
         return f"Team: {self.name}\n  {players_str}"
 
+    # Match outcomes only depend on the skills in each role, not on names or player order,
+    # so teams with the same fingerprint play exactly alike
+    def fingerprint(self):
+        return tuple((role, tuple(sorted(p.skill for p in self.players if p.role == role))) for role in ROLE_LIMITS)
+
     def missing_roles(self):
         return {
             role: ROLE_LIMITS[role] - self.count_role(role)
@@ -72,15 +84,15 @@ class Team:
             team.add_player(Player.from_dict(player_data))
         return team
 
-def create_random_player(role, idx):
+def create_random_player(role, idx, rng = random):
     name = f"{role} {idx}" 
-    skill = random.randint(1, 10)
+    skill = rng.randint(1, 10)
     return Player(name, role, skill)
 
-def create_random_team(team_name):
+def create_random_team(team_name, rng = random):
     team = Team(team_name)
     for role, count in ROLE_LIMITS.items():
         for i in range(1, count + 1):
-            player = create_random_player(role, i)
+            player = create_random_player(role, i, rng)
             team.add_player(player)
     return team
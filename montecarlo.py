@@ -0,0 +1,151 @@
+import os
+import random
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from simulation import simulate_match
+from batch_engine import simulate_batch
+from seeding import make_rng
+
+# Matches per task sent to a worker process
+CHUNK_SIZE = 500
+
+ENGINES = ("scalar", "skip", "batch")
+
+class HeadToHead:
+    def __init__(self, team1_name, team2_name):
+        self.team1_name = team1_name
+        self.team2_name = team2_name
+        self.matches = 0
+        self.team1_wins = 0
+        self.team2_wins = 0
+        self.draws = 0
+        self.team1_scores = Counter()
+        self.team2_scores = Counter()
+        self.scorelines = Counter()  # (team1_score, team2_score) -> count
+        self.times = Counter()
+        self.snitch_catches = Counter()  # team name (or None if time ran out) -> count
+
+    def add(self, team1_score, team2_score, snitch_catcher, time):
+        self.matches += 1
+        if team1_score > team2_score:
+            self.team1_wins += 1
+        elif team2_score > team1_score:
+            self.team2_wins += 1
+        else:
+            self.draws += 1
+        self.team1_scores[team1_score] += 1
+        self.team2_scores[team2_score] += 1
+        self.scorelines[(team1_score, team2_score)] += 1
+        self.times[time] += 1
+        self.snitch_catches[snitch_catcher] += 1
+
+    def merge(self, other):
+        self.matches += other.matches
+        self.team1_wins += other.team1_wins
+        self.team2_wins += other.team2_wins
+        self.draws += other.draws
+        self.team1_scores.update(other.team1_scores)
+        self.team2_scores.update(other.team2_scores)
+        self.scorelines.update(other.scorelines)
+        self.times.update(other.times)
+        self.snitch_catches.update(other.snitch_catches)
+        return self
+
+    def _share(self, count):
+        return count / self.matches if self.matches else 0.0
+
+    @property
+    def team1_win_prob(self):
+        return self._share(self.team1_wins)
+
+    @property
+    def team2_win_prob(self):
+        return self._share(self.team2_wins)
+
+    @property
+    def draw_prob(self):
+        return self._share(self.draws)
+
+    def snitch_share(self, team_name):
+        return self._share(self.snitch_catches[team_name])
+
+    def mean_time(self):
+        return self._share(sum(t * c for t, c in self.times.items()))
+
+    def mean_score(self, team_name):
+        scores = self.team1_scores if team_name == self.team1_name else self.team2_scores
+        return self._share(sum(s * c for s, c in scores.items()))
+
+    def __repr__(self):
+        return (
+            f"HeadToHead({self.team1_name} vs {self.team2_name}, {self.matches} matches: "
+            f"{self.team1_win_prob:.3f} / {self.draw_prob:.3f} / {self.team2_win_prob:.3f})"
+        )
+
+def _run_chunk(team1, team2, n, time_limit, rng, engine = "scalar"):
+    summary = HeadToHead(team1.name, team2.name)
+    if engine == "batch":
+        for result in simulate_batch(team1, team2, n, time_limit, rng=rng):
+            summary.add(*result)
+        return summary
+    for _ in range(n):
+        result = simulate_match(team1, team2, time_limit, quiet=True, record_events=False, engine=engine, rng=rng)
+        summary.add(*result)
+    return summary
+
+def _chunk_sizes(n, chunk_size):
+    sizes = [chunk_size] * (n // chunk_size)
+    if n % chunk_size:
+        sizes.append(n % chunk_size)
+    return sizes
+
+# engine="skip" uses simulate_match's event-skipping engine, "batch" the numpy lockstep engine (see batch_engine.py).
+# Every chunk runs on its own stream derived from seed, so a seed and chunk_size give the same
+# summary whatever the number of workers. Without a seed a single process uses the random module.
+# on_chunk(summary) is called with the running summary after each chunk is merged.
+def simulate_many(team1, team2, n, workers = None, time_limit = None, chunk_size = CHUNK_SIZE, engine = "scalar", seed = None, on_chunk = None):
+    if n < 1:
+        raise ValueError("Number of matches must be positive.")
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine '{engine}'. Choose one of: {', '.join(ENGINES)}.")
+    workers = workers or os.cpu_count() or 1
+    sizes = _chunk_sizes(n, chunk_size)
+    summary = HeadToHead(team1.name, team2.name)
+
+    serial = workers == 1 or len(sizes) == 1
+    if seed is None and serial:
+        rngs = [random] * len(sizes)
+    else:
+        # Worker processes must not all replay the parent's random state
+        if seed is None:
+            seed = random.getrandbits(64)
+        rngs = [make_rng(seed, "chunk", k) for k in range(len(sizes))]
+
+    if serial:
+        for size, rng in zip(sizes, rngs):
+            summary.merge(_run_chunk(team1, team2, size, time_limit, rng, engine))
+            if on_chunk:
+                on_chunk(summary)
+        return summary
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(sizes))) as pool:
+        futures = [pool.submit(_run_chunk, team1, team2, size, time_limit, rng, engine) for size, rng in zip(sizes, rngs)]
+        for future in futures:
+            summary.merge(future.result())
+            if on_chunk:
+                on_chunk(summary)
+    return summary
+
+def print_head_to_head(summary):
+    print(f"\n=== {summary.team1_name} vs {summary.team2_name}: {summary.matches} simulated matches ===")
+    print(f"{summary.team1_name} wins: {summary.team1_win_prob:.1%}")
+    print(f"Draws: {summary.draw_prob:.1%}")
+    print(f"{summary.team2_name} wins: {summary.team2_win_prob:.1%}")
+    print(f"Snitch caught by {summary.team1_name}: {summary.snitch_share(summary.team1_name):.1%}, "
+          f"by {summary.team2_name}: {summary.snitch_share(summary.team2_name):.1%}, "
+          f"not caught: {summary.snitch_share(None):.1%}")
+    print(f"Average score: {summary.mean_score(summary.team1_name):.1f} - {summary.mean_score(summary.team2_name):.1f}")
+    print(f"Average match time: {summary.mean_time():.1f} minutes")
+    print("Most common scorelines:")
+    for (s1, s2), count in summary.scorelines.most_common(5):
+        print(f"  {s1}-{s2}: {count / summary.matches:.1%}")
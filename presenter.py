@@ -0,0 +1,33 @@
+# Console rendering of match results, kept apart from the simulation itself
+
+# verbosity: "none" (no highlights), "key" (goals, penalties, Snitch) or "full"
+def print_match_report(result, verbosity = "full"):
+    team1, team2 = result.team1_name, result.team2_name
+
+    # Print factors in the result section:
+    print("\n--- Random Factors Applied ---")
+    for f in result.applied_factors:
+        print(f)
+
+    # Output results
+    print("\n--- Match Result ---")
+    print(f"{team1}: {result.team1_score} - {team2}: {result.team2_score}")
+    if result.snitch_catcher:
+        print(f"Snitch caught by: {result.snitch_catcher}")
+    else:
+        print("Snitch was not caught (time ran out).")
+    print(f"Total match time: {result.time} minutes")
+
+    print("\n--- Match Statistics ---")
+    print(f"{team1}: {result.team1_attacks} attacks, {result.team1_goals} goals, {result.team2_saves} misses")
+    print(f"{team2}: {result.team2_attacks} attacks, {result.team2_goals} goals, {result.team1_saves} misses")
+
+    print("\n--- Penalty Statistics ---")
+    print(f"{team1}: {result.penalty_stats[team1]['awarded']} awarded, {result.penalty_stats[team1]['scored']} scored")
+    print(f"{team2}: {result.penalty_stats[team2]['awarded']} awarded, {result.penalty_stats[team2]['scored']} scored")
+
+    highlights = result.highlights(verbosity)
+    if highlights is not None and verbosity != "none":
+        print("\n--- Match Highlights ---")
+        for h in highlights:
+            print(h)
@@ -0,0 +1,192 @@
+import cProfile
+import os
+import pstats
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from models import create_random_team
+from simulation import simulate_match, ENGINES
+from tournaments import TournamentRunner
+from seeding import derive_seed
+
+# Profiling mode shared by main.py and tournaments.py (--profile). Runs a workload under
+# cProfile ("cprofile", exact call counts, slower) or a sampling profiler ("sample", reads the
+# main thread's stack every few milliseconds, barely slows it down), then writes:
+#   <output>.prof       cProfile stats (cprofile mode only; open with pstats or snakeviz)
+#   <output>.collapsed  one "frame;frame;frame count" line per stack, for flamegraph.pl/speedscope
+# and prints the hottest functions of the engine modules.
+
+PROFILE_MODES = ("cprofile", "sample")
+HOT_MODULES = ("simulation.py", "random_factors.py", "tournaments.py")
+WORKLOADS = ("matches", "tournament")
+
+def _label(filename, name):
+    return f"{os.path.basename(filename)}:{name}".replace(";", ":")
+
+class SamplingProfiler:
+    # Samples the stack of the thread that calls start(); interval is in seconds
+    def __init__(self, interval = 0.002):
+        self.interval = interval
+        self.stacks = Counter()  # tuple of frame labels, outermost first -> samples
+        self._thread = None
+        self._stop = threading.Event()
+
+    def start(self):
+        self._target = threading.get_ident()
+        # The sampler needs the GIL on time, so hand it over more often than the default 5 ms
+        self._switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(min(self._switch_interval, self.interval / 4))
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        sys.setswitchinterval(self._switch_interval)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._target)
+            stack = []
+            while frame is not None:
+                stack.append(_label(frame.f_code.co_filename, frame.f_code.co_name))
+                frame = frame.f_back
+            if stack:
+                self.stacks[tuple(reversed(stack))] += 1
+
+    def hot_functions(self, modules = HOT_MODULES):
+        total = sum(self.stacks.values())
+        own, inclusive = Counter(), Counter()
+        for stack, count in self.stacks.items():
+            own[stack[-1]] += count
+            for label in set(stack):
+                inclusive[label] += count
+        rows = [(label, own[label], inclusive[label]) for label in inclusive
+                if label.split(":", 1)[0] in modules]
+        rows.sort(key=lambda row: (row[1], row[2]), reverse=True)
+        return rows, total
+
+# cProfile only records caller -> callee edges, so full stacks are rebuilt by splitting each
+# function's own time over its callers in proportion to the time spent under each of them.
+# Stacks worth less than min_weight seconds are dropped to keep the expansion small.
+def collapsed_from_stats(stats, max_depth = 40, min_weight = 1e-5):
+    raw = stats.stats
+    lines = Counter()
+
+    def label(func):
+        filename, _, name = func
+        return _label(filename, name) if filename != "~" else name
+
+    def walk(func, stack, weight, seen):
+        callers = raw[func][4]
+        shares = [(caller, entry[3]) for caller, entry in callers.items() if caller in raw and caller not in seen]
+        total = sum(ct for _, ct in shares)
+        if not shares or total <= 0 or len(stack) >= max_depth:
+            lines[";".join(reversed(stack))] += weight
+            return
+        for caller, ct in shares:
+            part = weight * ct / total
+            if part >= min_weight:
+                walk(caller, stack + [label(caller)], part, seen | {caller})
+
+    for func, (_, _, own_time, _, _) in raw.items():
+        if own_time >= min_weight:
+            walk(func, [label(func)], own_time, {func})
+    # Weights in microseconds, as collapsed-stack tools expect integer counts
+    return Counter({stack: int(seconds * 1e6) for stack, seconds in lines.items() if seconds * 1e6 >= 1})
+
+def write_collapsed(stacks, filename):
+    with open(filename, "w") as f:
+        for stack, count in sorted(stacks.items()):
+            f.write(f"{';'.join(stack) if isinstance(stack, tuple) else stack} {count}\n")
+
+def print_hot_cprofile(stats, top = 15, modules = HOT_MODULES):
+    rows = [(func, entry) for func, entry in stats.stats.items() if os.path.basename(func[0]) in modules]
+    rows.sort(key=lambda row: row[1][2], reverse=True)
+    print(f"\nTop {min(top, len(rows))} functions in {', '.join(modules)} (by own time):")
+    print("{:>10} {:>10} {:>10}  {}".format("calls", "own s", "total s", "function"))
+    for (filename, line, name), (_, ncalls, own_time, total_time, _) in rows[:top]:
+        print("{:>10} {:>10.3f} {:>10.3f}  {}:{}({})".format(ncalls, own_time, total_time, os.path.basename(filename), line, name))
+
+def print_hot_samples(profiler, top = 15, modules = HOT_MODULES):
+    rows, total = profiler.hot_functions(modules)
+    print(f"\nTop {min(top, len(rows))} functions in {', '.join(modules)} ({total} samples, by own samples):")
+    print("{:>8} {:>8}  {}".format("own %", "total %", "function"))
+    for label, own, inclusive in rows[:top]:
+        print("{:>8.1f} {:>8.1f}  {}".format(100 * own / total, 100 * inclusive / total, label))
+
+# Runs fn() under the chosen profiler, writes the output files and prints the hot functions.
+# Returns whatever fn returned.
+def profile_call(fn, mode = "cprofile", output = "profile", top = 15, interval = 0.002):
+    if mode not in PROFILE_MODES:
+        raise ValueError(f"Unknown profiling mode '{mode}'. Choose one of: {', '.join(PROFILE_MODES)}.")
+    start = time.perf_counter()
+    if mode == "cprofile":
+        profiler = cProfile.Profile()
+        result = profiler.runcall(fn)
+        elapsed = time.perf_counter() - start
+        profiler.dump_stats(output + ".prof")
+        stats = pstats.Stats(profiler)
+        write_collapsed(collapsed_from_stats(stats), output + ".collapsed")
+        print(f"\nProfiled for {elapsed:.2f}s. Wrote {output}.prof and {output}.collapsed")
+        print_hot_cprofile(stats, top)
+    else:
+        profiler = SamplingProfiler(interval)
+        profiler.start()
+        try:
+            result = fn()
+        finally:
+            profiler.stop()
+        elapsed = time.perf_counter() - start
+        write_collapsed(profiler.stacks, output + ".collapsed")
+        print(f"\nProfiled for {elapsed:.2f}s. Wrote {output}.collapsed")
+        print_hot_samples(profiler, top)
+    return result
+
+# --- Workloads ---
+
+# Like the Monte Carlo and forecast paths, no event log unless record_events is set
+def matches_workload(n, engine = "scalar", seed = None, record_events = False):
+    rng = random.Random(seed)
+    team1, team2 = create_random_team("Team 1", rng), create_random_team("Team 2", rng)
+    def run():
+        for _ in range(n):
+            simulate_match(team1, team2, quiet=True, record_events=record_events, engine=engine, rng=rng)
+    return run
+
+# A silent tournament (printing would swamp the profile)
+def tournament_workload(num_teams, fifa_style = True, group_size = 4, seed = None, engine = "scalar", repeat = 1, workers = None):
+    def run():
+        for k in range(repeat):
+            runner = TournamentRunner(engine=engine, seed=None if seed is None else derive_seed(seed, "tournament", k), workers=workers)
+            runner.run(num_teams, fifa_style, group_size=group_size)
+    return run
+
+# --profile and its options; with_workload also adds the workload choice (--workload, -n, --teams, ...)
+def add_profile_arguments(parser, with_workload = True):
+    group = parser.add_argument_group("profiling")
+    group.add_argument("--profile", choices=PROFILE_MODES, help="run a workload under a profiler instead of starting normally")
+    if with_workload:
+        group.add_argument("--workload", choices=WORKLOADS, default="matches", help="what to profile (default: matches)")
+        group.add_argument("-n", type=int, help="matches to play (default: 2000) or tournaments to run (default: 1)")
+        group.add_argument("--teams", type=int, default=32, help="tournament size (default: 32)")
+        group.add_argument("--engine", choices=ENGINES, default="scalar", help="match engine (default: scalar)")
+        group.add_argument("--seed", type=int, help="seed the workload")
+        group.add_argument("--record-events", action="store_true", help="also build each match's event log (matches workload)")
+    group.add_argument("--profile-output", default="profile", metavar="PREFIX", help="output file prefix (default: profile)")
+    group.add_argument("--profile-top", type=int, default=15, metavar="N", help="hot functions to print (default: 15)")
+    group.add_argument("--profile-interval", type=float, default=0.002, metavar="SECONDS", help="sampling interval (default: 0.002)")
+    return group
+
+def build_workload(args):
+    if args.workload == "matches":
+        return matches_workload(args.n or 2000, args.engine, args.seed, args.record_events)
+    return tournament_workload(args.teams, seed=args.seed, engine=args.engine, repeat=args.n or 1)
+
+def profile_from_args(args, workload = None):
+    if workload is None:
+        workload = build_workload(args)
+    return profile_call(workload, args.profile, args.profile_output, args.profile_top, args.profile_interval)
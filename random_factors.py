@@ -1,4 +1,7 @@
 import random
+from instrumentation import STATS, now
+from models import ROLE_SLOTS
+from sampling import AliasTable, weighted_sample, streak_table
 
 # --- Weather ---
 WEATHER_OPTIONS = [
@@ -9,16 +12,24 @@ WEATHER_OPTIONS = [
     {"type": "Foggy",  "prob": 0.1, "delta": -1},
 ]
 
-def apply_weather(team1, team2):
-    r = random.random()
-    cumulative = 0
-    for w in WEATHER_OPTIONS:
-        cumulative += w["prob"]
-        if r < cumulative:
-            weather = w
-            break
-    else:
-        raise ValueError("No weather option found.")
+# Draws an index into WEATHER_OPTIONS
+WEATHER_INDEX_TABLE = AliasTable(range(len(WEATHER_OPTIONS)), [w["prob"] for w in WEATHER_OPTIONS])
+
+# Injury settings: weight per role, severity odds, and how many players get hurt
+INJURY_ROLE_WEIGHTS = {"Chaser": 4, "Beater": 3, "Keeper": 2, "Seeker": 1}
+SEVERITY_TABLE = AliasTable([-1, -2, -3], [0.5, 0.3, 0.2])
+# Each extra injury happens with 75% chance (up to 14), each faulty broom with 50%
+INJURY_COUNT_TABLE = streak_table(0.75, 14)
+BROOM_COUNT_TABLE = streak_table(0.5, 14)
+
+# Maps each player to their team's name, for descriptions
+def _team_names(team1, team2):
+    names = {id(p): team1.name for p in team1.players}
+    names.update((id(p), team2.name) for p in team2.players)
+    return names
+
+def apply_weather(team1, team2, rng = random):
+    weather = WEATHER_OPTIONS[WEATHER_INDEX_TABLE.draw(rng)]
     # Everyone gets the same delta
     result = {}
     for p in team1.players + team2.players:
@@ -27,8 +38,8 @@ def apply_weather(team1, team2):
     return result, desc, weather['type']
 
 # --- Crowd Support ---
-def apply_crowd_support(team, team_name):
-    got_support = random.random() < 0.25
+def apply_crowd_support(team, team_name, rng = random):
+    got_support = rng.random() < 0.25
     result = {}
     desc = f"{team_name} did not receive extra crowd support"
     if got_support:
@@ -38,88 +49,69 @@ def apply_crowd_support(team, team_name):
     return result, desc
 
 # --- Faulty Brooms ---
-def apply_faulty_brooms(team1, team2):
-    num_players = 0
-    while num_players < 14 and random.random() < 0.5:
-        num_players += 1
+def apply_faulty_brooms(team1, team2, rng = random):
+    all_players = team1.players + team2.players
+    num_players = min(BROOM_COUNT_TABLE.draw(rng), len(all_players))
     result = {}
     desc = "No players received faulty brooms."
     if num_players:
-        all_players = team1.players + team2.players
-        selected_players = random.sample(all_players, num_players)
+        # Every player is equally likely, so a plain uniform sample is enough here
+        selected_players = rng.sample(all_players, num_players)
         for p in selected_players:
             result[id(p)] = -2
+        team_of = _team_names(team1, team2)
         desc = (
             f"{num_players} player(s) received faulty brooms (skill -2): "
-            + ", ".join(f"{p.name} ({team1.name if p in team1.players else team2.name}, {p.role})" for p in selected_players)
+            + ", ".join(f"{p.name} ({team_of[id(p)]}, {p.role})" for p in selected_players)
         )
     return result, desc
 
-def apply_referee_bias(team1, team2):
-    activated = random.random() < 0.10  # 10% chance of bias
+def apply_referee_bias(team1, team2, rng = random):
+    activated = rng.random() < 0.10  # 10% chance of bias
     if not activated:
         return None, "No referee bias in this match."
-    favored = random.choice([team1, team2])
+    favored = rng.choice([team1, team2])
     desc = f"Referee bias: {favored.name} has a 20% chance to steal the attack each time step."
     return favored.name, desc
 
-def apply_injuries(team1, team2):
+def apply_injuries(team1, team2, rng = random):
     # Decide how many injuries (75% for each)
-    num_injuries = 0
-    while num_injuries < 14 and random.random() < 0.75:
-        num_injuries += 1
+    num_injuries = INJURY_COUNT_TABLE.draw(rng)
 
     if num_injuries == 0:
         return {}, "No injuries occurred this match."
 
-    # Weight per role
-    role_weights = {"Chaser": 4, "Beater": 3, "Keeper": 2, "Seeker": 1}
+    # Weighted by role, each player injured at most once
     all_players = team1.players + team2.players
+    injured = weighted_sample(all_players, [INJURY_ROLE_WEIGHTS[p.role] for p in all_players], num_injuries, rng)
+    team_of = _team_names(team1, team2)
 
-    # Severity settings
-    severities = [-1, -2, -3]
-    severity_weights = [0.5, 0.3, 0.2]
-
-    already_injured = set()
     result = {}
     descs = []
-
-    for _ in range(num_injuries):
-        # Build weighted pool of non-injured players
-        weighted_players = []
-        for p in all_players:
-            if id(p) not in already_injured:
-                weighted_players.extend([p] * role_weights[p.role])
-        if not weighted_players:
-            break  # All players injured, stop early
-
-        player = random.choice(weighted_players)
-        already_injured.add(id(player))
-        severity = random.choices(severities, weights=severity_weights, k=1)[0]
+    for player in injured:
+        severity = SEVERITY_TABLE.draw(rng)
         result[id(player)] = severity
-        descs.append(
-            f"{player.name} ({team1.name if player in team1.players else team2.name}, {player.role}) injured: {severity}"
-        )
+        descs.append(f"{player.name} ({team_of[id(player)]}, {player.role}) injured: {severity}")
 
-    return result, f"{num_injuries} player(s) injured: {', '.join(descs)}"
+    return result, f"{len(injured)} player(s) injured: {', '.join(descs)}"
 
-def apply_bludger_calmness():
+def apply_bludger_calmness(rng = random):
     # 10% chance for Bludger Calmness
-    if random.random() < 0.10:
+    if rng.random() < 0.10:
         desc = "Bludger Calmness: The bludgers are calmer than usual! Time steps reduced to 1-3 minutes."
         return (1, 3), desc
     else:
         return (1, 5), "No Bludger Calmness: Normal match pace."
     
-def apply_coach_strategy(team1, team2):
+def apply_coach_strategy(team1, team2, rng = random):
     result = {}
     descs = []
 
     for team, other_team in [(team1, team2), (team2, team1)]:
-        if random.random() < 0.25:
-            own_or_opp = random.choice(['own', 'opp'])
+        if rng.random() < 0.25:
+            own_or_opp = rng.choice(['own', 'opp'])
             if own_or_opp == 'own':
-                boost = random.choices([1, 2], weights=[0.7, 0.3], k=1)[0]
+                boost = rng.choices([1, 2], weights=[0.7, 0.3], k=1)[0]
                 for p in team.players:
                     if p.role != "Seeker":
                         result.setdefault(id(p), 0)
@@ -128,7 +120,7 @@ def apply_coach_strategy(team1, team2):
                     f"{team.name} coach's offensive strategy: All non-Seeker players gain +{boost}"
                 )
             else:
-                penalty = random.choices([-1, -2], weights=[0.7, 0.3], k=1)[0]
+                penalty = rng.choices([-1, -2], weights=[0.7, 0.3], k=1)[0]
                 for p in other_team.players:
                     if p.role != "Seeker":
                         result.setdefault(id(p), 0)
@@ -140,22 +132,22 @@ def apply_coach_strategy(team1, team2):
             descs.append(f"{team.name} coach's strategy: No special effect")
     return result, "; ".join(descs)
 
-def apply_weather_timeouts(weather_type, team1, team2):
+def apply_weather_timeouts(weather_type, team1, team2, rng = random):
     # Returns a dict: {'timeouts': [...], 'skill_debuffs': {...}, 'desc': [...]}
     desc = []
     out = {'timeouts': [], 'skill_debuffs': {}, 'desc': desc}
-    per_attacks = random.randint(10, 100)
+    per_attacks = rng.randint(10, 100)
 
     if weather_type == "Cloudy":
-        t_len = random.randint(10, 30)
+        t_len = rng.randint(10, 30)
         out['timeouts'].append({'per_attacks': per_attacks, 'length': t_len, 'condition': "Cloudy"})
         desc.append(f"Fan interference timeout: {t_len} minutes every {per_attacks} attacks (Cloudy)")
     elif weather_type == "Sunny":
-        t_len = random.randint(5, 15)
+        t_len = rng.randint(5, 15)
         out['timeouts'].append({'per_attacks': per_attacks, 'length': t_len, 'condition': "Sunny"})
         desc.append(f"Water break: {t_len} minutes after every {per_attacks} attacks (Sunny)")
     elif weather_type == "Rainy":
-        t_len = random.randint(5, 60)
+        t_len = rng.randint(5, 60)
         out['timeouts'].append({'per_attacks': per_attacks, 'length': t_len, 'condition': "Rainy"})
         desc.append(f"Lightning risk timeout: {t_len} minutes every {per_attacks} attacks (Rainy)")
     elif weather_type == "Windy":
@@ -173,26 +165,27 @@ def apply_weather_timeouts(weather_type, team1, team2):
     return out
 
 # --- Apply all factors and return {player_id: [deltas]} and list of descriptions ---
-def apply_all_factors(team1, team2):
+def apply_all_factors(team1, team2, rng = random):
+    start = now() if STATS.enabled else None
     player_deltas = {id(p): [] for p in team1.players + team2.players}
     descriptions = []
 
     # Weather
-    weather_result, weather_desc, weather_type = apply_weather(team1, team2)
+    weather_result, weather_desc, weather_type = apply_weather(team1, team2, rng)
     descriptions.append(weather_desc)
     for pid, delta in weather_result.items():
         player_deltas[pid].append(delta)
 
     # Weather-linked effects (timeouts or debuffs)
-    weather_effects = apply_weather_timeouts(weather_type, team1, team2)
+    weather_effects = apply_weather_timeouts(weather_type, team1, team2, rng)
     descriptions.extend(weather_effects['desc'])
     # Skill debuffs from weather effects:
     for pid, delta in weather_effects['skill_debuffs'].items():
         player_deltas[pid].append(delta)
 
     # Crowd Support (both teams independently)
-    crowd1_result, crowd1_desc = apply_crowd_support(team1, team1.name)
-    crowd2_result, crowd2_desc = apply_crowd_support(team2, team2.name)
+    crowd1_result, crowd1_desc = apply_crowd_support(team1, team1.name, rng)
+    crowd2_result, crowd2_desc = apply_crowd_support(team2, team2.name, rng)
     descriptions.append(crowd1_desc)
     descriptions.append(crowd2_desc)
     for pid, delta in crowd1_result.items():
@@ -201,29 +194,209 @@ def apply_all_factors(team1, team2):
         player_deltas[pid].append(delta)
 
     # Referee bias
-    ref_bias, ref_bias_desc = apply_referee_bias(team1, team2)
+    ref_bias, ref_bias_desc = apply_referee_bias(team1, team2, rng)
     descriptions.append(ref_bias_desc)
 
     # Faulty Brooms
-    broom_result, broom_desc = apply_faulty_brooms(team1, team2)
+    broom_result, broom_desc = apply_faulty_brooms(team1, team2, rng)
     descriptions.append(broom_desc)
     for pid, delta in broom_result.items():
         player_deltas[pid].append(delta)
 
     # Injuries
-    injuries_result, injuries_desc = apply_injuries(team1, team2)
+    injuries_result, injuries_desc = apply_injuries(team1, team2, rng)
     descriptions.append(injuries_desc)
     for pid, delta in injuries_result.items():
         player_deltas[pid].append(delta)
 
     # Bludger calmness
-    time_range, bludger_desc = apply_bludger_calmness()
+    time_range, bludger_desc = apply_bludger_calmness(rng)
     descriptions.append(bludger_desc)
 
     # Coach game-plan
-    coach_result, coach_desc = apply_coach_strategy(team1, team2)
+    coach_result, coach_desc = apply_coach_strategy(team1, team2, rng)
     descriptions.append(coach_desc)
     for pid, delta in coach_result.items():
         player_deltas[pid].append(delta)
 
+    if start is not None:
+        STATS.count("factor_draws")
+        STATS.add_time("factors", now() - start)
     return player_deltas, descriptions, ref_bias, time_range, weather_effects['timeouts']
+
+# --- Batch factor generation ---
+# Factors only depend on player roles, so they can be drawn for many matches at once against
+# fixed player slots (team1's players followed by team2's). Each match gets a list of summed
+# skill deltas per slot plus compact factor codes; descriptions are only built on request.
+
+WEATHER_TIMEOUT_LENGTHS = {"Cloudy": (10, 30), "Sunny": (5, 15), "Rainy": (5, 60)}
+WEATHER_DEBUFFS = {"Windy": ("Beater", -1), "Foggy": ("Seeker", -2)}
+
+class FactorBatch:
+    def __init__(self, n, roles1, roles2):
+        self.n = n
+        self.roles = list(roles1) + list(roles2)
+        self.split = len(roles1)
+        self.weather = []   # index into WEATHER_OPTIONS
+        self.breaks = []    # (per_attacks, length) of the weather timeout, or None
+        self.crowd = []     # (team1 supported, team2 supported)
+        self.bias = []      # 0 = no bias, 1 = team1 favoured, 2 = team2 favoured
+        self.brooms = []    # slots with faulty brooms
+        self.injuries = []  # (slot, severity) pairs
+        self.calm = []      # bludger calmness
+        self.coach = []     # per team: 0 = nothing, +k = own players +k, -k = opponents -k
+        self.deltas = []    # summed skill delta per slot
+
+    def time_step_range(self, i):
+        return (1, 3) if self.calm[i] else (1, 5)
+
+    def weather_type(self, i):
+        return WEATHER_OPTIONS[self.weather[i]]["type"]
+
+    # Same format as apply_weather_timeouts()['timeouts']
+    def timeouts(self, i):
+        if self.breaks[i] is None:
+            return []
+        per_attacks, length = self.breaks[i]
+        return [{'per_attacks': per_attacks, 'length': length, 'condition': self.weather_type(i)}]
+
+    # Small integer codes for match i, for compact storage:
+    # (weather, crowd bits, bias, calm, coach team1, coach team2, injuries, faulty brooms)
+    def codes(self, i):
+        crowd = int(self.crowd[i][0]) | (int(self.crowd[i][1]) << 1)
+        return (self.weather[i], crowd, self.bias[i], int(self.calm[i]), self.coach[i][0], self.coach[i][1], len(self.injuries[i]), len(self.brooms[i]))
+
+    def ref_bias(self, i, team1, team2):
+        return (None, team1.name, team2.name)[self.bias[i]]
+
+    # Same descriptions as apply_all_factors() for match i
+    def describe(self, i, team1, team2):
+        players = team1.players + team2.players
+        def who(slot):
+            p = players[slot]
+            return f"{p.name} ({team1.name if slot < self.split else team2.name}, {p.role})"
+
+        weather = WEATHER_OPTIONS[self.weather[i]]
+        descs = [f"Weather: {weather['type']} (all players skill {'+' if weather['delta'] >= 0 else ''}{weather['delta']})"]
+        if self.breaks[i] is not None:
+            per_attacks, t_len = self.breaks[i]
+            descs.append({
+                "Cloudy": f"Fan interference timeout: {t_len} minutes every {per_attacks} attacks (Cloudy)",
+                "Sunny": f"Water break: {t_len} minutes after every {per_attacks} attacks (Sunny)",
+                "Rainy": f"Lightning risk timeout: {t_len} minutes every {per_attacks} attacks (Rainy)",
+            }[weather["type"]])
+        elif weather["type"] == "Windy":
+            descs.append("All Beaters suffer -1 skill for the whole match (Windy)")
+        elif weather["type"] == "Foggy":
+            descs.append("Both Seekers suffer -2 skill for the whole match (Foggy)")
+
+        for team, supported in zip((team1, team2), self.crowd[i]):
+            if supported:
+                descs.append(f"{team.name} received massive crowd support (+1 to all players)")
+            else:
+                descs.append(f"{team.name} did not receive extra crowd support")
+
+        favored = self.ref_bias(i, team1, team2)
+        if favored:
+            descs.append(f"Referee bias: {favored} has a 20% chance to steal the attack each time step.")
+        else:
+            descs.append("No referee bias in this match.")
+
+        brooms = self.brooms[i]
+        if brooms:
+            descs.append(f"{len(brooms)} player(s) received faulty brooms (skill -2): " + ", ".join(who(s) for s in brooms))
+        else:
+            descs.append("No players received faulty brooms.")
+
+        injuries = self.injuries[i]
+        if injuries:
+            descs.append(f"{len(injuries)} player(s) injured: " + ", ".join(f"{who(s)} injured: {sev}" for s, sev in injuries))
+        else:
+            descs.append("No injuries occurred this match.")
+
+        if self.calm[i]:
+            descs.append("Bludger Calmness: The bludgers are calmer than usual! Time steps reduced to 1-3 minutes.")
+        else:
+            descs.append("No Bludger Calmness: Normal match pace.")
+
+        coach_descs = []
+        for team, code in zip((team1, team2), self.coach[i]):
+            if code > 0:
+                coach_descs.append(f"{team.name} coach's offensive strategy: All non-Seeker players gain +{code}")
+            elif code < 0:
+                coach_descs.append(f"{team.name} coach's defensive strategy: Opponent's non-Seeker players suffer {code}")
+            else:
+                coach_descs.append(f"{team.name} coach's strategy: No special effect")
+        descs.append("; ".join(coach_descs))
+        return descs
+
+def draw_factor_batch(n, roles1 = ROLE_SLOTS, roles2 = ROLE_SLOTS, rng = random):
+    batch = FactorBatch(n, roles1, roles2)
+    roles = batch.roles
+    split = batch.split
+    slots = range(len(roles))
+    team_slots = (range(split), range(split, len(roles)))
+    non_seekers = [[s for s in team if roles[s] != "Seeker"] for team in team_slots]
+    injury_weights = [INJURY_ROLE_WEIGHTS[r] for r in roles]
+
+    batch.weather = WEATHER_INDEX_TABLE.draw_many(n, rng)
+    for i in range(n):
+        weather = WEATHER_OPTIONS[batch.weather[i]]
+        deltas = [weather["delta"]] * len(roles)
+
+        # Weather-linked timeouts or debuffs
+        per_attacks = rng.randint(10, 100)
+        lengths = WEATHER_TIMEOUT_LENGTHS.get(weather["type"])
+        batch.breaks.append((per_attacks, rng.randint(*lengths)) if lengths else None)
+        debuff = WEATHER_DEBUFFS.get(weather["type"])
+        if debuff:
+            role, delta = debuff
+            for s in slots:
+                if roles[s] == role:
+                    deltas[s] += delta
+
+        # Crowd support
+        crowd = (rng.random() < 0.25, rng.random() < 0.25)
+        for team, supported in zip(team_slots, crowd):
+            if supported:
+                for s in team:
+                    deltas[s] += 1
+        batch.crowd.append(crowd)
+
+        # Referee bias
+        batch.bias.append(rng.choice((1, 2)) if rng.random() < 0.10 else 0)
+
+        # Faulty brooms
+        brooms = tuple(rng.sample(slots, min(BROOM_COUNT_TABLE.draw(rng), len(roles))))
+        for s in brooms:
+            deltas[s] -= 2
+        batch.brooms.append(brooms)
+
+        # Injuries (weighted by role, without replacement)
+        injured = weighted_sample(slots, injury_weights, INJURY_COUNT_TABLE.draw(rng), rng)
+        injuries = tuple((s, SEVERITY_TABLE.draw(rng)) for s in injured)
+        for s, severity in injuries:
+            deltas[s] += severity
+        batch.injuries.append(injuries)
+
+        # Bludger calmness
+        batch.calm.append(rng.random() < 0.10)
+
+        # Coach game-plan
+        coach = []
+        for k in (0, 1):
+            code = 0
+            if rng.random() < 0.25:
+                if rng.choice(['own', 'opp']) == 'own':
+                    code = rng.choices([1, 2], weights=[0.7, 0.3], k=1)[0]
+                    targets = non_seekers[k]
+                else:
+                    code = rng.choices([-1, -2], weights=[0.7, 0.3], k=1)[0]
+                    targets = non_seekers[1 - k]
+                for s in targets:
+                    deltas[s] += code
+            coach.append(code)
+        batch.coach.append(tuple(coach))
+
+        batch.deltas.append(deltas)
+    return batch
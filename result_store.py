@@ -0,0 +1,214 @@
+import mmap
+import os
+import struct
+from collections import namedtuple
+from montecarlo import HeadToHead
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional; only StoreReader.array() needs it
+    np = None
+
+# Append-only file of fixed-width match records. Layout: a HEADER_SIZE-byte header (magic,
+# schema version, record size), then one little-endian RECORD_FIELDS record per match.
+# Team names live next to it in <path>.teams, one per line; a team's id is its line number.
+MAGIC = b"QMATCHES"
+SCHEMA_VERSION = 1
+HEADER = struct.Struct("<8sHHI")
+HEADER_SIZE = 32
+TEAMS_SUFFIX = ".teams"
+
+RECORD_FIELDS = [
+    ("team1", "I"), ("team2", "I"),
+    ("team1_score", "i"), ("team2_score", "i"),
+    ("time", "I"),
+    ("team1_attacks", "I"), ("team2_attacks", "I"),
+    ("team1_goals", "H"), ("team2_goals", "H"),
+    ("team1_penalties", "H"), ("team2_penalties", "H"),
+    ("team1_penalties_scored", "H"), ("team2_penalties_scored", "H"),
+    ("snitch", "B"),  # 0 = not caught, 1 = team1, 2 = team2
+    # Factor codes, see FactorBatch.codes
+    ("weather", "B"), ("crowd", "B"), ("bias", "B"), ("calm", "B"),
+    ("coach1", "b"), ("coach2", "b"), ("injuries", "B"), ("brooms", "B"),
+]
+RECORD = struct.Struct("<" + "".join(code for _, code in RECORD_FIELDS) + "7x")  # padded to 56 bytes
+StoredMatch = namedtuple("StoredMatch", [name for name, _ in RECORD_FIELDS])
+
+NO_FACTORS = (0, 0, 0, 0, 0, 0, 0, 0)
+
+def record_dtype():
+    if np is None:
+        raise ImportError("Array access to the result store requires numpy (pip install numpy).")
+    numpy_codes = {"I": "<u4", "i": "<i4", "H": "<u2", "B": "u1", "b": "i1"}
+    names, formats, offsets = [], [], []
+    offset = 0
+    for name, code in RECORD_FIELDS:
+        names.append(name)
+        formats.append(numpy_codes[code])
+        offsets.append(offset)
+        offset += struct.calcsize(code)
+    return np.dtype({"names": names, "formats": formats, "offsets": offsets, "itemsize": RECORD.size})
+
+def _read_header(f):
+    data = f.read(HEADER_SIZE)
+    if len(data) < HEADER_SIZE:
+        raise ValueError("Not a match result store (file too short).")
+    magic, version, record_size, _ = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError("Not a match result store.")
+    if version != SCHEMA_VERSION or record_size != RECORD.size:
+        raise ValueError(f"Unsupported result store schema (version {version}, record size {record_size}).")
+
+def _read_team_names(path):
+    try:
+        with open(path + TEAMS_SUFFIX, encoding="utf-8") as f:
+            return [line.rstrip("\n") for line in f]
+    except FileNotFoundError:
+        return []
+
+class StoreWriter:
+    # Records are buffered and written in blocks of `buffer_records`
+    def __init__(self, path, buffer_records = 4096):
+        self.path = path
+        self.buffer_records = buffer_records
+        self.teams = _read_team_names(path)
+        self.team_ids = {name: i for i, name in enumerate(self.teams)}
+
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            with open(path, "rb") as f:
+                _read_header(f)
+            # Drop a half-written record left behind by a crash
+            size = os.path.getsize(path)
+            complete = HEADER_SIZE + (size - HEADER_SIZE) // RECORD.size * RECORD.size
+            if complete != size:
+                os.truncate(path, complete)
+            self._file = open(path, "ab")
+        else:
+            self._file = open(path, "wb")
+            self._file.write(HEADER.pack(MAGIC, SCHEMA_VERSION, RECORD.size, 0).ljust(HEADER_SIZE, b"\0"))
+        self._teams_file = open(path + TEAMS_SUFFIX, "a", encoding="utf-8")
+        self._buffer = bytearray()
+        self._pending = 0
+
+    def team_id(self, name):
+        tid = self.team_ids.get(name)
+        if tid is None:
+            if "\n" in name:
+                raise ValueError("Team names cannot contain line breaks.")
+            tid = len(self.teams)
+            self.teams.append(name)
+            self.team_ids[name] = tid
+            self._teams_file.write(name + "\n")
+        return tid
+
+    def _add(self, values):
+        self._buffer += RECORD.pack(*values)
+        self._pending += 1
+        if self._pending >= self.buffer_records:
+            self.flush()
+
+    # A MatchResult from simulate_match
+    def append(self, result):
+        t1, t2 = result.team1_name, result.team2_name
+        snitch = 1 if result.snitch_catcher == t1 else 2 if result.snitch_catcher == t2 else 0
+        penalties = result.penalty_stats
+        self._add((
+            self.team_id(t1), self.team_id(t2),
+            result.team1_score, result.team2_score, result.time,
+            result.team1_attacks, result.team2_attacks,
+            result.team1_goals, result.team2_goals,
+            penalties[t1]["awarded"], penalties[t2]["awarded"],
+            penalties[t1]["scored"], penalties[t2]["scored"],
+            snitch,
+        ) + (result.factor_codes() or NO_FACTORS))
+
+    # A BatchResult from batch_engine.simulate_batch
+    def append_batch(self, batch):
+        t1, t2 = self.team_id(batch.team1_name), self.team_id(batch.team2_name)
+        columns = zip(
+            batch.team1_score.tolist(), batch.team2_score.tolist(), batch.time.tolist(),
+            batch.team1_attacks.tolist(), batch.team2_attacks.tolist(),
+            batch.team1_goals.tolist(), batch.team2_goals.tolist(),
+            batch.team1_penalties.tolist(), batch.team2_penalties.tolist(),
+            batch.team1_penalties_scored.tolist(), batch.team2_penalties_scored.tolist(),
+            batch.snitch.tolist(),
+        )
+        for i, row in enumerate(columns):
+            codes = batch.factors.codes(i) if batch.factors is not None else NO_FACTORS
+            self._add((t1, t2) + row + codes)
+
+    def flush(self):
+        self._teams_file.flush()
+        if self._buffer:
+            self._file.write(self._buffer)
+            self._buffer = bytearray()
+            self._pending = 0
+        self._file.flush()
+
+    def close(self):
+        self.flush()
+        self._file.close()
+        self._teams_file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class StoreReader:
+    # Memory-maps the file; records are decoded on the fly, so memory use does not grow with the store
+    def __init__(self, path):
+        self.path = path
+        self.teams = _read_team_names(path)
+        self._file = open(path, "rb")
+        _read_header(self._file)
+        size = os.fstat(self._file.fileno()).st_size
+        self.count = (size - HEADER_SIZE) // RECORD.size
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += self.count
+        if not 0 <= i < self.count:
+            raise IndexError("record index out of range")
+        return StoredMatch._make(RECORD.unpack_from(self._mmap, HEADER_SIZE + i * RECORD.size))
+
+    def __iter__(self):
+        view = memoryview(self._mmap)[HEADER_SIZE:HEADER_SIZE + self.count * RECORD.size]
+        try:
+            for values in RECORD.iter_unpack(view):
+                yield StoredMatch._make(values)
+        finally:
+            view.release()
+
+    # Zero-copy numpy view of all records (read-only structured array)
+    def array(self):
+        return np.frombuffer(self._mmap, dtype=record_dtype(), count=self.count, offset=HEADER_SIZE)
+
+    # One HeadToHead per (team1, team2) pairing, optionally only the pairings involving `team`
+    def aggregate(self, team = None):
+        tid = None if team is None else self.teams.index(team)
+        summaries = {}
+        for m in self:
+            if tid is not None and tid not in (m.team1, m.team2):
+                continue
+            key = (self.teams[m.team1], self.teams[m.team2])
+            summary = summaries.get(key)
+            if summary is None:
+                summary = summaries[key] = HeadToHead(*key)
+            summary.add(m.team1_score, m.team2_score, (None, key[0], key[1])[m.snitch], m.time)
+        return summaries
+
+    def close(self):
+        self._mmap.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,56 @@
+import heapq
+import random
+
+# Weighted sampling helpers shared by the random factors. Every helper takes the random
+# source as its last argument (a random.Random, or the random module itself by default).
+
+class AliasTable:
+    # Vose's alias method: O(n) setup, then every draw costs one random number
+    def __init__(self, outcomes, weights):
+        if len(outcomes) != len(weights) or not outcomes:
+            raise ValueError("Need one weight per outcome and at least one outcome.")
+        total = sum(weights)
+        if total <= 0:
+            raise ValueError("Weights must add up to a positive number.")
+        n = len(outcomes)
+        self.outcomes = list(outcomes)
+        self.n = n
+        self.prob = [0.0] * n
+        self.alias = list(range(n))
+
+        scaled = [w * n / total for w in weights]
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            s = small.pop()
+            l = large.pop()
+            self.prob[s] = scaled[s]
+            self.alias[s] = l
+            scaled[l] -= 1.0 - scaled[s]
+            (small if scaled[l] < 1.0 else large).append(l)
+        # Whatever is left is 1.0 up to rounding
+        for i in small + large:
+            self.prob[i] = 1.0
+
+    def draw(self, rng = random):
+        u = rng.random() * self.n
+        i = int(u)
+        return self.outcomes[i] if u - i < self.prob[i] else self.outcomes[self.alias[i]]
+
+    def draw_many(self, k, rng = random):
+        return [self.draw(rng) for _ in range(k)]
+
+# Weighted sampling without replacement (Efraimidis-Spirakis keys). The order of the result
+# has the same distribution as drawing one item at a time in proportion to the weights of
+# those still left, but costs O(n log k) instead of rebuilding a pool for every draw.
+def weighted_sample(population, weights, k, rng = random):
+    if k <= 0:
+        return []
+    keyed = ((rng.random() ** (1.0 / w), i) for i, w in enumerate(weights) if w > 0)
+    top = heapq.nlargest(k, keyed)
+    return [population[i] for _, i in top]
+
+# Distribution of "keep adding one while random() < chance, up to cap" as an alias table
+def streak_table(chance, cap):
+    probs = [(chance ** k) * (1 - chance) for k in range(cap)] + [chance ** cap]
+    return AliasTable(list(range(cap + 1)), probs)
@@ -0,0 +1,13 @@
+import hashlib
+import random
+
+# Independent random streams derived from one root seed. Each match or tournament gets its own
+# stream, keyed by where it sits (stage, group, match number, ...), so a root seed gives the
+# same results no matter how the work is split between processes.
+
+def derive_seed(root, *keys):
+    digest = hashlib.blake2b(repr((root,) + keys).encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big")
+
+def make_rng(root, *keys):
+    return random.Random(derive_seed(root, *keys))
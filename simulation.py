@@ -1,5 +1,72 @@
-import random, copy
-from random_factors import apply_all_factors
+import random, copy, math
+from bisect import bisect_right
+from itertools import accumulate
+from random_factors import draw_factor_batch
+from presenter import print_match_report
+from strength import TeamStrength
+from instrumentation import STATS, now
+from events import GOAL, SAVE, PENALTY, WEATHER_BREAK, STRATEGIC_TIMEOUT, REFEREE_STEAL, SNITCH, FULL_TIME, FullTime, expand, render, wanted
+
+class MatchResult:
+    def __init__(self, team1_name, team2_name):
+        self.team1_name = team1_name
+        self.team2_name = team2_name
+        self.team1_score = 0
+        self.team2_score = 0
+        self.snitch_catcher = None
+        self.time = 0
+        self.team1_attacks = 0
+        self.team2_attacks = 0
+        self.team1_goals = 0
+        self.team2_goals = 0
+        self.team1_saves = 0
+        self.team2_saves = 0
+        self.penalty_stats = {}
+        self.event_log = None  # compact event records (see events.py), or None if not recorded
+        self._applied_factors = None
+        self._factor_source = None
+
+    # Highlight lines for the recorded events, rendered on demand at the given verbosity
+    def highlights(self, verbosity = "full"):
+        if self.event_log is None:
+            return None
+        return render(self.event_log, (self.team1_name, self.team2_name), verbosity)
+
+    @property
+    def events(self):
+        return self.highlights()
+
+    # Factor descriptions are only rendered when someone reads them
+    @property
+    def applied_factors(self):
+        if self._applied_factors is None:
+            if self._factor_source is None:
+                return []
+            batch, i, team1, team2 = self._factor_source
+            self._applied_factors = batch.describe(i, team1, team2)
+        return self._applied_factors
+
+    @applied_factors.setter
+    def applied_factors(self, descriptions):
+        self._applied_factors = descriptions
+
+    def set_factors(self, batch, i, team1, team2):
+        self._applied_factors = None
+        self._factor_source = (batch, i, team1, team2)
+
+    # Integer factor codes (see FactorBatch.codes), or None if the factors are unknown
+    def factor_codes(self):
+        if self._factor_source is None:
+            return None
+        batch, i, _, _ = self._factor_source
+        return batch.codes(i)
+
+    # Unpacks like the old (team1_score, team2_score, snitch_catcher, time) tuple
+    def __iter__(self):
+        return iter((self.team1_score, self.team2_score, self.snitch_catcher, self.time))
+
+    def __repr__(self):
+        return f"MatchResult({self.team1_name} {self.team1_score} - {self.team2_score} {self.team2_name}, {self.time}')"
 
 def get_attack_value(team, boost = 0):
     chaser_skill = sum(min(10, p.skill + boost) for p in team.players if p.role == "Chaser") * 0.75
@@ -16,43 +83,103 @@ def get_defense_value(team, boost = 0):
 def get_seeker_skill(team):
     return next(p.skill for p in team.players if p.role == "Seeker")
 
-def simulate_match(team1, team2, time_limit = None):
-
-    # Deep copy for temp modification
-    team1_sim = copy.deepcopy(team1)
-    team2_sim = copy.deepcopy(team2)
-
-    # Track original skills for normalization
-    player_base_skills = {id(p): p.skill for p in team1_sim.players + team2_sim.players}
-
-    # Apply all factors, get per-player deltas and descriptions
-    player_deltas, applied_factors, ref_bias, time_step_range, timeouts = apply_all_factors(team1_sim, team2_sim)
+# Applies the random factors and builds each side's strength tables from the effective
+# skills. The teams themselves are never copied or modified.
+def _prepare_match(team1, team2, rng = random):
+    stats = STATS if STATS.enabled else None
+    if team2 is team1:
+        # A team playing itself still needs two distinct sides
+        start = now() if stats else None
+        team2 = copy.deepcopy(team1)
+        if stats:
+            stats.add_time("deepcopy", now() - start)
+
+    # Draw all factors: summed deltas per player slot plus compact codes
+    start = now() if stats else None
+    roles1 = [p.role for p in team1.players]
+    roles2 = [p.role for p in team2.players]
+    factors = draw_factor_batch(1, roles1, roles2, rng)
+    deltas = factors.deltas[0]
+    if stats:
+        stats.count("factor_draws")
+        stats.add_time("factors", now() - start)
+
+    # Normalize: add deltas for each player, clamp to [1, 10]
+    players = team1.players + team2.players
+    skills = [max(1, min(10, p.skill + d)) for p, d in zip(players, deltas)]
+    split = len(roles1)
+    strengths = [TeamStrength(roles1, skills[:split]), TeamStrength(roles2, skills[split:])]
+
+    return team1, team2, strengths, factors, factors.ref_bias(0, team1, team2), factors.time_step_range(0), factors.timeouts(0)
+
+ENGINES = ("scalar", "skip")
+
+# quiet=True skips all printing; record_events=False also skips recording events.
+# verbosity ("none", "key" or "full") picks which highlights the printed report shows.
+# engine="skip" samples the snitch catch up front and plays attacks in aggregated runs (no highlights).
+# rng is the random source for the whole match (a random.Random; the random module by default).
+def simulate_match(team1, team2, time_limit = None, quiet = False, record_events = True, engine = "scalar", rng = random, verbosity = "full"):
+    if engine == "skip":
+        result = _simulate_match_skip(team1, team2, time_limit, rng)
+        if not quiet:
+            print_match_report(result, verbosity)
+        return result
+    if engine != "scalar":
+        raise ValueError(f"Unknown engine '{engine}'. Choose one of: {', '.join(ENGINES)}.")
+
+    log = list(_scalar_events(team1, team2, time_limit, rng, record_events))
+    result = log.pop()[2]
+    if record_events:
+        result.event_log = log
+
+    if not quiet:
+        print_match_report(result, verbosity)
+    return result
+
+# Plays a match step by step and yields typed events (see events.py) as they happen, so they
+# can be streamed without keeping the whole match in memory. The last event is always FullTime,
+# which carries the MatchResult; stop iterating to abandon the match early.
+# verbosity="key" only yields goals, penalties and the Snitch catch (plus FullTime).
+def iter_match_events(team1, team2, time_limit = None, rng = random, verbosity = "full"):
+    names = (team1.name, team2.name)
+    wanted(FULL_TIME, verbosity)  # reject a bad verbosity before play starts
+    for record in _scalar_events(team1, team2, time_limit, rng, True):
+        if record[1] == FULL_TIME:
+            yield FullTime(record[0], record[2])
+        elif wanted(record[1], verbosity):
+            yield expand(record, names)
+
+# The scalar engine, yielding compact event records (see events.py). The last record is always
+# (time, FULL_TIME, result); with record_events=False it is the only one.
+# With instrumentation on, "main_loop" also includes time the consumer spends between events.
+def _scalar_events(team1, team2, time_limit, rng, record_events):
+    team1, team2, (strength1, strength2), factors, ref_bias, time_step_range, timeouts = _prepare_match(team1, team2, rng)
     min_step, max_step = time_step_range
+    loop_start = now() if STATS.enabled else None
 
-    # Normalize: sum deltas for each player, clamp to [1, 10]
-    for p in team1_sim.players + team2_sim.players:
-        eff_skill = player_base_skills[id(p)] + sum(player_deltas[id(p)])
-        p.skill = max(1, min(10, eff_skill))
-
-    next_penalty_attack = random.randint(1, 10)
+    next_penalty_attack = rng.randint(1, 10)
     penalty_stats = {
-        team1_sim.name: {"awarded": 0, "scored": 0},
-        team2_sim.name: {"awarded": 0, "scored": 0}
+        team1.name: {"awarded": 0, "scored": 0},
+        team2.name: {"awarded": 0, "scored": 0}
     }
 
     time = 0
     team1_score = 0
     team2_score = 0
-    highlights = []
     snitch_caught = False
     snitch_catcher = None
 
     # Strategic timeout mechanics
-    next_strategic_timeout_attack = random.randint(10, 20)
+    next_strategic_timeout_attack = rng.randint(10, 20)
     timeout_count = 0
     active_boosts = []  # Each item: dict(team, boost, start, end)
     attack_counter = 0  # Total number of attacks performed
 
+    # Checks on the rare branches, for instrumentation (everything else is derived at the end)
+    timeout_checks = 0
+    penalty_checks = 0
+    penalty_boost_scans = 0
+
     # Stats
     team1_attacks = 0
     team2_attacks = 0
@@ -61,8 +188,10 @@ def simulate_match(team1, team2, time_limit = None):
     team1_saves = 0
     team2_saves = 0
 
-    team1_seeker_skill = get_seeker_skill(team1_sim)
-    team2_seeker_skill = get_seeker_skill(team2_sim)
+    strengths = {team1: strength1, team2: strength2}
+
+    team1_seeker_skill = strengths[team1].seeker_skill
+    team2_seeker_skill = strengths[team2].seeker_skill
     total_seeker_skill = team1_seeker_skill + team2_seeker_skill
 
     next_timeout_break = None
@@ -76,72 +205,56 @@ def simulate_match(team1, team2, time_limit = None):
     while not snitch_caught:
         
         # Advance time randomly
-        step = random.randint(min_step, max_step)
+        step = rng.randint(min_step, max_step)
         time += step
 
         if time_limit:
             if time > time_limit:
                 time = time_limit
-                # Print factors in the result section:
-                print("\n--- Random Factors Applied ---")
-                for f in applied_factors:
-                    print(f)
-
-                # Output results
-                print("\n--- Match Result ---")
-                print(f"{team1_sim.name}: {team1_score} - {team2_sim.name}: {team2_score}")
-                print("Snitch was not caught (time ran out).")
-                print(f"Total match time: {time} minutes")
-
-                print("\n--- Match Statistics ---")
-                print(f"{team1_sim.name}: {team1_attacks} attacks, {team1_goals} goals, {team2_saves} misses")
-                print(f"{team2_sim.name}: {team2_attacks} attacks, {team2_goals} goals, {team1_saves} misses")
-
-                print("\n--- Penalty Statistics ---")
-                print(f"{team1_sim.name}: {penalty_stats[team1_sim.name]['awarded']} awarded, {penalty_stats[team1_sim.name]['scored']} scored")
-                print(f"{team2_sim.name}: {penalty_stats[team2_sim.name]['awarded']} awarded, {penalty_stats[team2_sim.name]['scored']} scored")
-
-                print("\n--- Match Highlights ---")
-                for h in highlights:
-                    print(h)
-                return (team1_score, team2_score, None, time)
+                break
 
         # Snitch logic 
         if total_seeker_skill > 0:
             snitch_threshold = total_seeker_skill * 0.001
-            if random.random() < snitch_threshold:
+            if rng.random() < snitch_threshold:
                 snitch_caught = True
                 # Determine who caught it
-                winner = random.randint(1, total_seeker_skill)
+                winner = rng.randint(1, total_seeker_skill)
                 if winner <= team1_seeker_skill:
                     team1_score += 150
-                    snitch_catcher = team1_sim.name
-                    highlights.append(f"{time}': {team1_sim.name}'s Seeker catches the Snitch! (+150 points)")
+                    snitch_catcher = team1.name
+                    if record_events:
+                        yield (time, SNITCH, 0, team1_score, team2_score)
                     continue
                 else:
                     team2_score += 150
-                    snitch_catcher = team2_sim.name
-                    highlights.append(f"{time}': {team2_sim.name}'s Seeker catches the Snitch! (+150 points)")
+                    snitch_catcher = team2.name
+                    if record_events:
+                        yield (time, SNITCH, 1, team1_score, team2_score)
                     continue
 
         # -- Timeout break logic (only for Cloudy, Sunny, Rainy) --
         if next_timeout_break and attack_counter > 0 and attack_counter % next_timeout_break == 0 and (time_limit is None or time + timeout_break_length < time_limit):
+            timeout_checks += 1
             if condition == "Cloudy":
-                if random.random() < 0.05:
+                if rng.random() < 0.05:
                     time += timeout_break_length
-                    highlights.append(f"{time}': Fan interference timeout for {timeout_break_length} min (Cloudy).")
+                    if record_events:
+                        yield (time, WEATHER_BREAK, None, team1_score, team2_score, condition, timeout_break_length)
             elif condition == "Sunny":
-                if random.random() < 0.20:
+                if rng.random() < 0.20:
                     time += timeout_break_length
-                    highlights.append(f"{time}': Water break for {timeout_break_length} min (Sunny).")
+                    if record_events:
+                        yield (time, WEATHER_BREAK, None, team1_score, team2_score, condition, timeout_break_length)
             elif condition == "Rainy":
-                if random.random() < 0.10:
+                if rng.random() < 0.10:
                     time += timeout_break_length
-                    highlights.append(f"{time}': Lightning risk timeout for {timeout_break_length} min (Rainy).")
+                    if record_events:
+                        yield (time, WEATHER_BREAK, None, team1_score, team2_score, condition, timeout_break_length)
 
         # Randomly select attacking team
-        attacking, defending = (team1_sim, team2_sim) if random.choice([True, False]) else (team2_sim, team1_sim)
-        if attacking == team1_sim:
+        attacking, defending = (team1, team2) if rng.choice([True, False]) else (team2, team1)
+        if attacking == team1:
             team1_attacks += 1
         else:
             team2_attacks += 1
@@ -149,63 +262,67 @@ def simulate_match(team1, team2, time_limit = None):
 
         # Referee bias: attempt to steal attack if not already chosen
         if ref_bias:
-            biased_team = team1_sim if team1_sim.name == ref_bias else team2_sim
-            if attacking != biased_team and random.random() < 0.20:
-                if biased_team == team2_sim:
-                    attacking, defending = biased_team, team1_sim  
+            biased_team = team1 if team1.name == ref_bias else team2
+            if attacking != biased_team and rng.random() < 0.20:
+                if biased_team == team2:
+                    attacking, defending = biased_team, team1  
                     team1_attacks -= 1
                     team2_attacks += 1
                 else:
-                    attacking, defending = biased_team, team2_sim
+                    attacking, defending = biased_team, team2
                     team2_attacks -= 1
                     team1_attacks += 1
-                highlights.append(f"{time}': Referee bias! {biased_team.name} steals the attack.")
+                if record_events:
+                    yield (time, REFEREE_STEAL, 0 if biased_team is team1 else 1, team1_score, team2_score)
 
         # Find current attack number
         current_attack = attack_counter
-        boost_map = {team1_sim: 0, team2_sim: 0}
+        boost_map = {team1: 0, team2: 0}
         for boost in active_boosts:
             if boost['start_attack'] <= current_attack <= boost['end_attack']:
                 boost_map[boost['team']] += boost['boost']
 
         attacking_boost = boost_map[attacking]
         defending_boost = boost_map[defending]
-        attack_val = get_attack_value(attacking, attacking_boost)
-        defense_val = get_defense_value(defending, defending_boost)
+        attack_val = strengths[attacking].attack_value(attacking_boost)
+        defense_val = strengths[defending].defense_value(defending_boost)
         diff = attack_val - defense_val
-        random_threshold = random.randint(-25, 35)
+        random_threshold = rng.randint(-25, 35)
 
         if diff > random_threshold:
             # Goal scored
-            if attacking == team1_sim:
+            if attacking == team1:
                 team1_score += 10
                 team1_goals += 1
             else:
                 team2_score += 10
                 team2_goals += 1
-            highlights.append(f"{time}': {attacking.name} scores a goal! ({team1_score}-{team2_score})")
+            if record_events:
+                yield (time, GOAL, 0 if attacking is team1 else 1, team1_score, team2_score)
         else:
-            if defending == team1_sim:
+            if defending == team1:
                 team1_saves += 1
             else:
                 team2_saves += 1
-            highlights.append(f"{time}': {defending.name} makes a big save!")
+            if record_events:
+                yield (time, SAVE, 0 if defending is team1 else 1, team1_score, team2_score)
 
         # Check for strategic timeout
         if not time_limit and attack_counter == next_strategic_timeout_attack:
-            if random.random() < 0.20:  # 20% chance
+            timeout_checks += 1
+            if rng.random() < 0.20:  # 20% chance
                 timeout_count += 1
                 # Who calls it?
-                if team1_score < team2_score and random.random() < 0.75:
-                    calling_team, other_team = team1_sim, team2_sim
+                if team1_score < team2_score and rng.random() < 0.75:
+                    calling_team, other_team = team1, team2
                 elif team2_score == team1_score: # tie
-                    calling_team, other_team = random.choice([(team1_sim, team2_sim), (team2_sim, team1_sim)])
+                    calling_team, other_team = rng.choice([(team1, team2), (team2, team1)])
                 else:  
-                    calling_team, other_team = team2_sim, team1_sim
+                    calling_team, other_team = team2, team1
 
                 # How long for each team's boost (random independently)
-                call_team_duration = random.randint(5, 10)
-                opp_team_duration = random.randint(5, 10)
+                call_team_duration = rng.randint(5, 10)
+                opp_team_duration = rng.randint(5, 10)
 
                 # Apply boost for the next N attacks (track window)
                 active_boosts.append({
@@ -225,88 +342,266 @@ def simulate_match(team1, team2, time_limit = None):
                 max_skip = 15 * (2 ** (timeout_count - 1))
                 if max_skip > 600:
                     max_skip = 600
-                skip_minutes = random.randint(5, max_skip)
+                skip_minutes = rng.randint(5, max_skip)
                 time += skip_minutes
-                highlights.append(
-                    f"{time}': Strategic timeout! {calling_team.name} calls it. "
-                    f"Boosts: {calling_team.name} (+2 for {call_team_duration} attacks), "
-                    f"{other_team.name} (+1 for {opp_team_duration} attacks). "
-                    f"Play resumed after {skip_minutes} min."
-                )
+                if record_events:
+                    yield (time, STRATEGIC_TIMEOUT, 0 if calling_team is team1 else 1, team1_score, team2_score, call_team_duration, opp_team_duration, skip_minutes)
             # Set next strategic timeout
-            next_strategic_timeout_attack += random.randint(10, 20)
+            next_strategic_timeout_attack += rng.randint(10, 20)
 
         # --- Penalty kick logic ---
         if attack_counter == next_penalty_attack:
-            if random.random() < 0.20:  # 20% chance for a penalty event
+            penalty_checks += 1
+            if rng.random() < 0.20:  # 20% chance for a penalty event
                 # Determine which team gets the penalty
                 if ref_bias:
-                    biased_team = team1_sim if team1_sim.name == ref_bias else team2_sim
-                    other_team = team2_sim if biased_team == team1_sim else team1_sim
-                    if random.random() < 0.75:
+                    biased_team = team1 if team1.name == ref_bias else team2
+                    other_team = team2 if biased_team == team1 else team1
+                    if rng.random() < 0.75:
                         penalty_team, defending_team = biased_team, other_team
                     else:
                         penalty_team, defending_team = other_team, biased_team
                 else:
-                    if random.random() < 0.5:
-                        penalty_team, defending_team = team1_sim, team2_sim
+                    if rng.random() < 0.5:
+                        penalty_team, defending_team = team1, team2
                     else:
-                        penalty_team, defending_team = team2_sim, team1_sim
+                        penalty_team, defending_team = team2, team1
 
                 # Apply boosts, if any, for this attack
-                boost_map = {team1_sim: 0, team2_sim: 0}
+                boost_map = {team1: 0, team2: 0}
                 current_attack = attack_counter
+                penalty_boost_scans += len(active_boosts)
                 for boost in active_boosts:
                     if boost['start_attack'] <= current_attack <= boost['end_attack']:
                         boost_map[boost['team']] += boost['boost']
 
                 # Find best chaser and opposing keeper (using current skills + boosts)
-                shooting_chasers = [p for p in penalty_team.players if p.role == "Chaser"]
-                if shooting_chasers:
-                    chaser = max(shooting_chasers, key=lambda p: p.skill + boost_map[penalty_team])
-                    keeper = next(p for p in defending_team.players if p.role == "Keeper")
-                    chaser_skill = min(10, chaser.skill + boost_map[penalty_team])
-                    keeper_skill = min(10, keeper.skill + boost_map[defending_team])
+                shooting = strengths[penalty_team]
+                saving = strengths[defending_team]
+                if shooting.best_chaser is not None:
+                    chaser = penalty_team.players[shooting.best_chaser]
+                    keeper = defending_team.players[saving.keeper]
+                    chaser_skill = shooting.penalty_chaser_skill(boost_map[penalty_team])
+                    keeper_skill = saving.penalty_keeper_skill(boost_map[defending_team])
                     total = chaser_skill + keeper_skill
-                    roll = random.randint(1, int(total))
+                    roll = rng.randint(1, int(total))
                     # Track stats
                     penalty_stats[penalty_team.name]["awarded"] += 1
                     if roll <= chaser_skill:
-                        if penalty_team == team1_sim:
+                        if penalty_team == team1:
                             team1_score += 10
                         else:
                             team2_score += 10
                         penalty_stats[penalty_team.name]["scored"] += 1
-                        highlights.append(f"{time}': Penalty for {penalty_team.name}! {chaser.name} vs {keeper.name}: GOAL! ({team1_score}-{team2_score})")
+                        if record_events:
+                            yield (time, PENALTY, 0 if penalty_team is team1 else 1, team1_score, team2_score, True, chaser.name, keeper.name)
                     else:
-                        highlights.append(f"{time}': Penalty for {penalty_team.name}! {chaser.name} vs {keeper.name}: SAVED by {keeper.name}!")
+                        if record_events:
+                            yield (time, PENALTY, 0 if penalty_team is team1 else 1, team1_score, team2_score, False, chaser.name, keeper.name)
                 else:
                     raise ValueError("No chasers?!")
 
             # Schedule next penalty check
-            next_penalty_attack += random.randint(1, 10)
-
-    # Print factors in the result section:
-    print("\n--- Random Factors Applied ---")
-    for f in applied_factors:
-        print(f)
-
-    # Output results
-    print("\n--- Match Result ---")
-    print(f"{team1_sim.name}: {team1_score} - {team2_sim.name}: {team2_score}")
-    print(f"Snitch caught by: {snitch_catcher}")
-    print(f"Total match time: {time} minutes")
-
-    print("\n--- Match Statistics ---")
-    print(f"{team1_sim.name}: {team1_attacks} attacks, {team1_goals} goals, {team2_saves} misses")
-    print(f"{team2_sim.name}: {team2_attacks} attacks, {team2_goals} goals, {team1_saves} misses")
-
-    print("\n--- Penalty Statistics ---")
-    print(f"{team1_sim.name}: {penalty_stats[team1_sim.name]['awarded']} awarded, {penalty_stats[team1_sim.name]['scored']} scored")
-    print(f"{team2_sim.name}: {penalty_stats[team2_sim.name]['awarded']} awarded, {penalty_stats[team2_sim.name]['scored']} scored")
+            next_penalty_attack += rng.randint(1, 10)
+
+    result = MatchResult(team1.name, team2.name)
+    result.team1_score = team1_score
+    result.team2_score = team2_score
+    result.snitch_catcher = snitch_catcher
+    result.time = time
+    result.team1_attacks = team1_attacks
+    result.team2_attacks = team2_attacks
+    result.team1_goals = team1_goals
+    result.team2_goals = team2_goals
+    result.team1_saves = team1_saves
+    result.team2_saves = team2_saves
+    result.penalty_stats = penalty_stats
+    result.set_factors(factors, 0, team1, team2)
+
+    if loop_start is not None:
+        STATS.add_time("main_loop", now() - loop_start)
+        # Every pass of the loop is an attack except the last (Snitch caught or time up), and
+        # every attack scans all boosts added so far
+        STATS.count("matches")
+        STATS.count("loop_iterations", attack_counter + 1)
+        STATS.count("attacks", attack_counter)
+        STATS.count("boost_window_scans", penalty_boost_scans + sum(attack_counter - b['start_attack'] + 1 for b in active_boosts))
+        STATS.count("penalty_checks", penalty_checks)
+        STATS.count("timeout_checks", timeout_checks)
+    yield (time, FULL_TIME, result)
+
+# Chance that a weather timeout actually happens when it is due
+TIMEOUT_BREAK_CHANCE = {"Cloudy": 0.05, "Sunny": 0.20, "Rainy": 0.10}
+
+# Share of random thresholds (randint(-25, 35)) that an attack/defense difference beats
+def goal_probability(diff):
+    return max(0, min(61, math.ceil(diff) + 25)) / 61
+
+# Event-skipping engine: the snitch roll is independent of everything else, so the step it
+# is caught on is drawn once from the geometric distribution. Between "interesting" attacks
+# (strategic timeouts, boost window edges, weather timeout checks) every attack has the same
+# odds, so a whole run of attacks is drawn in one random.choices call.
+def _simulate_match_skip(team1, team2, time_limit = None, rng = random):
+    team1, team2, strengths, factors, ref_bias, time_step_range, timeouts = _prepare_match(team1, team2, rng)
+    min_step, max_step = time_step_range
+    step_values = range(min_step, max_step + 1)
+    loop_start = now() if STATS.enabled else None
 
-    print("\n--- Match Highlights ---")
-    for h in highlights:
-        print(h)
+    result = MatchResult(team1.name, team2.name)
+    result.set_factors(factors, 0, team1, team2)
+    penalty_stats = {
+        team1.name: {"awarded": 0, "scored": 0},
+        team2.name: {"awarded": 0, "scored": 0}
+    }
+    result.penalty_stats = penalty_stats
+
+    team1_seeker_skill = strengths[0].seeker_skill
+    total_seeker_skill = team1_seeker_skill + strengths[1].seeker_skill
+    snitch_threshold = total_seeker_skill * 0.001
+    # Number of attacks played before the iteration in which the snitch is caught
+    snitch_attack = int(math.log(1.0 - rng.random()) / math.log(1.0 - snitch_threshold))
+
+    # Referee bias turns 20% of the other side's attacks into the favoured team's
+    biased = None
+    team1_attack_share = 0.5
+    if ref_bias:
+        biased = 0 if team1.name == ref_bias else 1
+        team1_attack_share = 0.6 if biased == 0 else 0.4
+
+    break_every = break_length = None
+    breaks = [t for t in timeouts if 'per_attacks' in t]
+    if breaks:
+        break_every = breaks[0]['per_attacks']
+        break_length = breaks[0]['length']
+        break_chance = TIMEOUT_BREAK_CHANCE[breaks[0]['condition']]
 
-    return (team1_score, team2_score, snitch_catcher, time)
\ No newline at end of file
+    time = 0
+    scores = [0, 0]
+    attacks = [0, 0]
+    goals = [0, 0]
+    attack_counter = 0
+    next_penalty_attack = rng.randint(1, 10)
+    next_strategic_timeout_attack = rng.randint(10, 20)
+    timeout_count = 0
+    boost = [0, 0]
+    boost_end = [0, 0]  # Last attack each team's current boost applies to
+    finished = False
+
+    while attack_counter < snitch_attack:
+        start = attack_counter + 1
+        end = snitch_attack
+        if not time_limit:
+            end = min(end, next_strategic_timeout_attack)
+        for k in (0, 1):
+            if boost[k] and start <= boost_end[k]:
+                end = min(end, boost_end[k])
+        weather_check = break_every and attack_counter > 0 and attack_counter % break_every == 0
+        if break_every:
+            # The next weather check happens before attack (m * break_every + 1)
+            end = min(end, (attack_counter // break_every + 1) * break_every)
+
+        # Time for every step in the run, with the weather timeout (if due) after the first step
+        n = end - attack_counter
+        steps = rng.choices(step_values, k=n)
+        played = n
+        if time_limit:
+            marks = list(accumulate(steps, initial=time))[1:]
+            if weather_check and marks[0] <= time_limit and marks[0] + break_length < time_limit and rng.random() < break_chance:
+                marks = marks[:1] + [m + break_length for m in marks[1:]]
+            played = bisect_right(marks, time_limit)
+            if played < n:
+                finished = True
+                time = time_limit
+            else:
+                time = marks[-1]
+        else:
+            time += sum(steps)
+            if weather_check and rng.random() < break_chance:
+                time += break_length
+
+        if played:
+            b1 = boost[0] if start <= boost_end[0] else 0
+            b2 = boost[1] if start <= boost_end[1] else 0
+            g1 = goal_probability(strengths[0].attack_value(b1) - strengths[1].defense_value(b2))
+            g2 = goal_probability(strengths[1].attack_value(b2) - strengths[0].defense_value(b1))
+            a1 = team1_attack_share
+            outcomes = rng.choices((0, 1, 2, 3), cum_weights=(a1 * g1, a1, a1 + (1 - a1) * g2, 1.0), k=played)
+            team1_goals = outcomes.count(0)
+            team1_attacks = team1_goals + outcomes.count(1)
+            team2_goals = outcomes.count(2)
+            attacks[0] += team1_attacks
+            attacks[1] += played - team1_attacks
+            goals[0] += team1_goals
+            goals[1] += team2_goals
+            scores[0] += 10 * team1_goals
+            scores[1] += 10 * team2_goals
+            last = attack_counter + played
+            attack_counter = last
+
+            strategic = not time_limit and last == next_strategic_timeout_attack
+            # Penalty checks inside the run (the one on a strategic timeout attack comes after the timeout)
+            while next_penalty_attack < last or (next_penalty_attack == last and not strategic):
+                _skip_penalty(scores, penalty_stats, (team1.name, team2.name), biased, (b1, b2), strengths, rng)
+                next_penalty_attack += rng.randint(1, 10)
+
+            if strategic:
+                if rng.random() < 0.20:  # 20% chance
+                    timeout_count += 1
+                    if scores[0] < scores[1] and rng.random() < 0.75:
+                        calling = 0
+                    elif scores[0] == scores[1]:
+                        calling = rng.choice([0, 1])
+                    else:
+                        calling = 1
+                    call_team_duration = rng.randint(5, 10)
+                    opp_team_duration = rng.randint(5, 10)
+                    boost[calling], boost_end[calling] = 2, last + call_team_duration
+                    boost[1 - calling], boost_end[1 - calling] = 1, last + opp_team_duration
+                    max_skip = min(600, 15 * (2 ** (timeout_count - 1)))
+                    time += rng.randint(5, max_skip)
+                next_strategic_timeout_attack += rng.randint(10, 20)
+                if next_penalty_attack == last:
+                    _skip_penalty(scores, penalty_stats, (team1.name, team2.name), biased, (b1, b2), strengths, rng)
+                    next_penalty_attack += rng.randint(1, 10)
+
+        if finished:
+            break
+
+    # The iteration in which the snitch is caught still advances the clock
+    if not finished:
+        time += rng.randint(min_step, max_step)
+        if time_limit and time > time_limit:
+            time = time_limit
+        else:
+            if rng.randint(1, total_seeker_skill) <= team1_seeker_skill:
+                scores[0] += 150
+                result.snitch_catcher = team1.name
+            else:
+                scores[1] += 150
+                result.snitch_catcher = team2.name
+
+    result.time = time
+    result.team1_score, result.team2_score = scores
+    result.team1_attacks, result.team2_attacks = attacks
+    result.team1_goals, result.team2_goals = goals
+    result.team1_saves = attacks[1] - goals[1]
+    result.team2_saves = attacks[0] - goals[0]
+    if loop_start is not None:
+        STATS.add_time("skip_loop", now() - loop_start)
+        STATS.count("matches")
+        STATS.count("attacks", attacks[0] + attacks[1])
+    return result
+
+def _skip_penalty(scores, penalty_stats, names, biased, boosts, strengths, rng = random):
+    if rng.random() >= 0.20:  # 20% chance for a penalty event
+        return
+    if biased is not None:
+        shooter = biased if rng.random() < 0.75 else 1 - biased
+    else:
+        shooter = 0 if rng.random() < 0.5 else 1
+    chaser_skill = strengths[shooter].penalty_chaser_skill(boosts[shooter])
+    keeper_skill = strengths[1 - shooter].penalty_keeper_skill(boosts[1 - shooter])
+    penalty_stats[names[shooter]]["awarded"] += 1
+    if rng.randint(1, chaser_skill + keeper_skill) <= chaser_skill:
+        scores[shooter] += 10
+        penalty_stats[names[shooter]]["scored"] += 1
@@ -0,0 +1,50 @@
+# Precomputed team strength for one match: effective skills are fixed once the random
+# factors are applied, and boosts only take a few integer values, so every attack/defense
+# value a match can need is computed up front.
+
+# Skills are capped at 10, so a boost above +9 changes nothing
+MAX_BOOST = 9
+
+ATTACK_WEIGHTS = {"Chaser": 0.75, "Beater": 0.5, "Keeper": 0.25}
+DEFENSE_WEIGHTS = {"Chaser": 0.25, "Beater": 0.5, "Keeper": 0.75}
+
+def _weighted_value(role_skills, weights, boost):
+    return sum(sum(min(10, s + boost) for s in role_skills[role]) * weight for role, weight in weights.items())
+
+class TeamStrength:
+    def __init__(self, roles, skills):
+        role_skills = {"Chaser": [], "Beater": [], "Keeper": []}
+        for role, skill in zip(roles, skills):
+            if role in role_skills:
+                role_skills[role].append(skill)
+        if not role_skills["Keeper"]:
+            raise ValueError("Team has no Keeper.")
+        role_skills["Keeper"] = role_skills["Keeper"][:1]
+
+        # attack[b] / defense[b] hold the value with every player boosted by +b
+        self.attack = [_weighted_value(role_skills, ATTACK_WEIGHTS, b) for b in range(MAX_BOOST + 1)]
+        self.defense = [_weighted_value(role_skills, DEFENSE_WEIGHTS, b) for b in range(MAX_BOOST + 1)]
+
+        # Player indices and skills used for penalties and the snitch
+        chasers = [i for i, role in enumerate(roles) if role == "Chaser"]
+        self.best_chaser = max(chasers, key=lambda i: skills[i]) if chasers else None
+        self.chaser_skill = skills[self.best_chaser] if chasers else None
+        self.keeper = roles.index("Keeper")
+        self.keeper_skill = skills[self.keeper]
+        self.seeker_skill = next((s for role, s in zip(roles, skills) if role == "Seeker"), 0)
+
+    @classmethod
+    def of(cls, team):
+        return cls([p.role for p in team.players], [p.skill for p in team.players])
+
+    def attack_value(self, boost = 0):
+        return self.attack[min(boost, MAX_BOOST)]
+
+    def defense_value(self, boost = 0):
+        return self.defense[min(boost, MAX_BOOST)]
+
+    def penalty_chaser_skill(self, boost = 0):
+        return min(10, self.chaser_skill + boost)
+
+    def penalty_keeper_skill(self, boost = 0):
+        return min(10, self.keeper_skill + boost)
@@ -0,0 +1,117 @@
+import json
+from models import ROLE_LIMITS, Team, Player
+
+# Line-delimited team files (.ndjson / .jsonl): one team per line, in the same shape as the
+# entries of the CLI's JSON files, {"name": ..., "players": [{"name", "role", "skill"}, ...]}.
+# Teams are read and written one line at a time, so file size doesn't affect memory use.
+
+TEAM_SIZE = sum(ROLE_LIMITS.values())
+
+class RosterError(ValueError):
+    def __init__(self, message, line = None, filename = None):
+        self.message = message
+        self.line = line
+        self.filename = filename
+        where = ":".join(str(x) for x in (filename, line) if x is not None)
+        super().__init__(f"{where}: {message}" if where else message)
+
+# Builds a Team from a decoded record, checking roles, skills and role counts without printing.
+# require_complete also demands a full 7-player roster (needed to play matches).
+def team_from_record(data, require_complete = True):
+    if not isinstance(data, dict):
+        raise RosterError("expected a JSON object")
+    name = data.get("name")
+    if not isinstance(name, str) or not name:
+        raise RosterError("team needs a non-empty \"name\"")
+    players = data.get("players")
+    if not isinstance(players, list):
+        raise RosterError(f"team '{name}' needs a \"players\" list")
+
+    team = Team(name)
+    counts = dict.fromkeys(ROLE_LIMITS, 0)
+    for i, p in enumerate(players, 1):
+        if not isinstance(p, dict):
+            raise RosterError(f"team '{name}', player {i}: expected a JSON object")
+        role, skill = p.get("role"), p.get("skill")
+        if role not in ROLE_LIMITS:
+            raise RosterError(f"team '{name}', player {i}: unknown role {role!r}")
+        if not isinstance(skill, int) or isinstance(skill, bool) or not 1 <= skill <= 10:
+            raise RosterError(f"team '{name}', player {i}: skill must be a whole number from 1 to 10")
+        counts[role] += 1
+        if counts[role] > ROLE_LIMITS[role]:
+            raise RosterError(f"team '{name}': too many {role}s (limit {ROLE_LIMITS[role]})")
+        team.players.append(Player(str(p.get("name", f"{role} {counts[role]}")), role, skill))
+
+    if require_complete and len(team.players) != TEAM_SIZE:
+        missing = ", ".join(f"{ROLE_LIMITS[r] - c} {r}" for r, c in counts.items() if c < ROLE_LIMITS[r])
+        raise RosterError(f"team '{name}' is incomplete (missing {missing})")
+    return team
+
+class TeamReader:
+    # errors="raise" stops at the first bad line; errors="skip" skips it and notes
+    # (line number, message) in self.errors. Blank lines are ignored.
+    def __init__(self, filename, require_complete = True, errors = "raise"):
+        if errors not in ("raise", "skip"):
+            raise ValueError("errors must be 'raise' or 'skip'.")
+        self.filename = filename
+        self.require_complete = require_complete
+        self.on_error = errors
+        self.errors = []
+
+    def __iter__(self):
+        with open(self.filename, "r", encoding="utf-8") as f:
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    try:
+                        data = json.loads(line)
+                    except json.JSONDecodeError as e:
+                        raise RosterError(f"invalid JSON ({e.msg}, column {e.colno})")
+                    team = team_from_record(data, self.require_complete)
+                except RosterError as e:
+                    if self.on_error == "raise":
+                        raise RosterError(e.message, line_number, self.filename) from None
+                    self.errors.append((line_number, e.message))
+                    continue
+                yield team
+
+def read_teams(filename, require_complete = True, errors = "raise"):
+    return iter(TeamReader(filename, require_complete, errors))
+
+# Teams by name, e.g. for TournamentRunner.run(teams_dict=...); limit stops after that many teams
+def read_teams_dict(filename, limit = None, require_complete = True):
+    teams = {}
+    for team in read_teams(filename, require_complete):
+        if limit is not None and len(teams) >= limit:
+            break
+        teams[team.name] = team
+    return teams
+
+class TeamWriter:
+    def __init__(self, filename, append = False):
+        self.file = open(filename, "a" if append else "w", encoding="utf-8")
+        self.count = 0
+
+    def write(self, team):
+        self.file.write(json.dumps(team.to_dict(), separators=(",", ":"), ensure_ascii=False))
+        self.file.write("\n")
+        self.count += 1
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def write_teams(filename, teams, append = False):
+    with TeamWriter(filename, append) as writer:
+        for team in teams:
+            writer.write(team)
+    return writer.count
+
+def is_team_stream(filename):
+    return filename.endswith((".ndjson", ".jsonl"))
@@ -0,0 +1,180 @@
+import json
+import sqlite3
+from collections.abc import Mapping
+from itertools import chain, groupby
+from models import Team, Player
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS teams (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS players (
+    team_id INTEGER NOT NULL REFERENCES teams(id) ON DELETE CASCADE,
+    slot INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    role TEXT NOT NULL,
+    skill INTEGER NOT NULL,
+    PRIMARY KEY (team_id, slot)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS players_role_skill ON players (role, skill);
+"""
+
+def _team_from_rows(name, rows):
+    # Rows were validated when they were saved, so skip add_player (and its prints)
+    team = Team(name)
+    team.players = [Player(p_name, role, skill) for p_name, role, skill in rows]
+    return team
+
+# SQLite-backed collection of teams. Works like a read-only dict of name -> Team where each
+# team is only loaded when it is accessed; save/save_many/delete change the database.
+class TeamStore(Mapping):
+    def __init__(self, path = "teams.db"):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.executescript(SCHEMA)
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM teams").fetchone()[0]
+
+    def __iter__(self):
+        for (name,) in self.conn.execute("SELECT name FROM teams ORDER BY id"):
+            yield name
+
+    def __contains__(self, name):
+        return self.conn.execute("SELECT 1 FROM teams WHERE name = ?", (name,)).fetchone() is not None
+
+    def __getitem__(self, name):
+        team = self.get(name)
+        if team is None:
+            raise KeyError(name)
+        return team
+
+    def get(self, name, default = None):
+        rows = self.conn.execute(
+            "SELECT p.name, p.role, p.skill FROM players p JOIN teams t ON t.id = p.team_id "
+            "WHERE t.name = ? ORDER BY p.slot", (name,)
+        ).fetchall()
+        if not rows and name not in self:
+            return default
+        return _team_from_rows(name, rows)
+
+    # Every team, loaded one at a time from a single query
+    def all_teams(self):
+        rows = self.conn.execute(
+            "SELECT t.name, p.name, p.role, p.skill FROM teams t LEFT JOIN players p ON p.team_id = t.id "
+            "ORDER BY t.id, p.slot"
+        )
+        for name, group in groupby(rows, key=lambda row: row[0]):
+            yield _team_from_rows(name, [row[1:] for row in group if row[1] is not None])
+
+    # Names of teams with a player in `role` whose skill lies in [min_skill, max_skill]
+    def find_by_role(self, role, min_skill = 1, max_skill = 10):
+        rows = self.conn.execute(
+            "SELECT DISTINCT t.name FROM players p JOIN teams t ON t.id = p.team_id "
+            "WHERE p.role = ? AND p.skill BETWEEN ? AND ? ORDER BY t.id", (role, min_skill, max_skill)
+        )
+        return [name for (name,) in rows]
+
+    def _write(self, team):
+        cur = self.conn.execute("SELECT id FROM teams WHERE name = ?", (team.name,))
+        row = cur.fetchone()
+        if row is None:
+            team_id = self.conn.execute("INSERT INTO teams (name) VALUES (?)", (team.name,)).lastrowid
+        else:
+            team_id = row[0]
+            self.conn.execute("DELETE FROM players WHERE team_id = ?", (team_id,))
+        self.conn.executemany(
+            "INSERT INTO players (team_id, slot, name, role, skill) VALUES (?, ?, ?, ?, ?)",
+            [(team_id, slot, p.name, p.role, p.skill) for slot, p in enumerate(team.players)]
+        )
+
+    # Adds the team, or replaces the stored roster of a team with the same name
+    def save(self, team):
+        with self.conn:
+            self._write(team)
+
+    # Saves many teams in one transaction (much faster than one save() per team)
+    def save_many(self, teams):
+        count = 0
+        with self.conn:
+            for team in teams:
+                self._write(team)
+                count += 1
+        return count
+
+    def delete(self, name):
+        with self.conn:
+            return self.conn.execute("DELETE FROM teams WHERE name = ?", (name,)).rowcount > 0
+
+    # Reads a JSON file in the format written by the CLI (a list of team dicts)
+    def import_json(self, filename):
+        with open(filename, "r") as f:
+            data = json.load(f)
+        return self.save_many(Team.from_dict(team_data) for team_data in data)
+
+    def export_json(self, filename, names = None):
+        teams = self.all_teams() if names is None else (self[name] for name in names)
+        data = [team.to_dict() for team in teams]
+        with open(filename, "w") as f:
+            json.dump(data, f, indent=2)
+        return len(data)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+# The CLI's teams: the ones made or loaded from files this session, layered over any stores that
+# were opened. A stored team is only read from its database when it is first accessed, and then
+# kept in memory so edits to it stick. Adding a store replaces same-named teams already loaded.
+class TeamOverlay(Mapping):
+    def __init__(self, teams = None):
+        self.teams = dict(teams or {})
+        self.stores = []
+        self._loaded = {}  # teams read from a store so far
+
+    def add_store(self, store):
+        for names in (self.teams, self._loaded):
+            for name in [name for name in names if name in store]:
+                del names[name]
+        self.stores.insert(0, store)
+
+    def __setitem__(self, name, team):
+        self._loaded.pop(name, None)
+        self.teams[name] = team
+
+    def __getitem__(self, name):
+        if name in self.teams:
+            return self.teams[name]
+        team = self._loaded.get(name)
+        if team is None:
+            team = next((t for t in (store.get(name) for store in self.stores) if t is not None), None)
+            if team is None:
+                raise KeyError(name)
+            self._loaded[name] = team
+        return team
+
+    def __contains__(self, name):
+        return name in self.teams or any(name in store for store in self.stores)
+
+    def __iter__(self):
+        seen = set()
+        for name in chain(self.teams, *self.stores):
+            if name not in seen:
+                seen.add(name)
+                yield name
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def close(self):
+        for store in self.stores:
+            store.close()
+        self.stores = []
+        self._loaded = {}
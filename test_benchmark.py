@@ -0,0 +1,34 @@
+import pytest
+import benchmark
+
+def test_only_the_events_case_records_events(monkeypatch):
+    calls = {}
+    def fake(team1, team2, time_limit = None, quiet = False, record_events = True, engine = "scalar"):
+        calls[(time_limit, engine)] = record_events
+    monkeypatch.setattr(benchmark, "simulate_match", fake)
+    cases = benchmark.build_cases()
+    for name in ("simulate_match", "simulate_match_240", "simulate_match_skip"):
+        calls.clear()
+        cases[name][0]()()
+        assert list(calls.values()) == [False], name
+    calls.clear()
+    cases["simulate_match_events"][0]()()
+    assert list(calls.values()) == [True]
+
+def test_baseline_round_trip_and_regressions(tmp_path, capsys):
+    path = str(tmp_path / "baseline.json")
+    results = benchmark.run_benchmarks(["simulate_match", "create_random_team"], scale=0.005)
+    assert set(results) == {"simulate_match", "create_random_team"}
+    assert results["simulate_match"]["matches_per_sec"] > 0
+    benchmark.save_baseline(results, path)
+    baseline = benchmark.load_baseline(path)
+    assert baseline == results
+
+    baseline["simulate_match"]["p50_ms"] = results["simulate_match"]["p50_ms"] / 2
+    regressions = benchmark.print_results(results, baseline)
+    assert [name for name, _ in regressions] == ["simulate_match"]
+    assert "simulate_match" in capsys.readouterr().out
+
+def test_unknown_case_is_an_error():
+    with pytest.raises(SystemExit):
+        benchmark.main(["no_such_case"])
@@ -0,0 +1,134 @@
+import asyncio
+import json
+import random
+import pytest
+import broadcast
+from broadcast import BAD_REQUEST, MAX_BODY, BroadcastServer, TooManyMatches, read_request
+from models import create_random_team
+
+def reader_for(data, limit = 2 ** 16):
+    reader = asyncio.StreamReader(limit=limit)
+    reader.feed_data(data)
+    reader.feed_eof()
+    return reader
+
+def read(data, limit = 2 ** 16):
+    async def go():
+        return await read_request(reader_for(data, limit))
+    return asyncio.run(go())
+
+def testread_request_parses_head_and_body():
+    body = b'{"time_limit": 240}'
+    raw = b"post /matches HTTP/1.1\r\nHost: x\r\nCONTENT-LENGTH: %d\r\n\r\n" % len(body) + body
+    assert read(raw) == ("POST", "/matches", body)
+    assert read(b"GET /matches/1/events?verbosity=key HTTP/1.1\r\n\r\n") == ("GET", "/matches/1/events?verbosity=key", b"")
+
+@pytest.mark.parametrize("raw", [
+    b"GET / HTTP/1.1\r\nContent-Length: -1\r\n\r\n",
+    b"GET / HTTP/1.1\r\nContent-Length: %d\r\n\r\n" % (MAX_BODY + 1),
+    b"GET / HTTP/1.1\r\nContent-Length: ten\r\n\r\n",
+    b"POST / HTTP/1.1\r\nContent-Length: 10\r\n\r\nabc",
+    b"GET / HTTP/1.1\r\nHost: x\r\n",
+    b"garbage\r\n\r\n",
+])
+def testread_request_rejects_bad_requests(raw):
+    with pytest.raises(BAD_REQUEST):
+        read(raw)
+
+def testread_request_rejects_oversized_head():
+    with pytest.raises(BAD_REQUEST):
+        read(b"GET / HTTP/1.1\r\nX-Long: " + b"x" * 200 + b"\r\n\r\n", limit=64)
+
+async def collect(sub):
+    payloads = []
+    while True:
+        payload = await sub.queue.get()
+        if payload is None:
+            return payloads
+        payloads.append(payload)
+
+def test_seeded_server_draws_the_same_teams():
+    async def go(seed):
+        server = BroadcastServer(pace=0, seed=seed)
+        home = create_random_team("Home", random.Random(0))
+        channels = [server.start_match(), server.start_match(team1=home)]
+        subs = [c.subscribe(1024) for c in channels]
+        streams = [await collect(sub) for sub in subs]
+        await server.close()
+        assert channels[1].team1 is home
+        return [(c.team1.to_dict(), c.team2.to_dict()) for c in channels], streams
+    first, second = asyncio.run(go(5)), asyncio.run(go(5))
+    assert first == second
+    teams, _ = asyncio.run(go(6))
+    assert teams[0] != first[0][0]
+
+def test_stream_ends_with_full_time():
+    async def go():
+        server = BroadcastServer(pace=0, seed=1)
+        channel = server.start_match()
+        full, key = channel.subscribe(1024), channel.subscribe(1024, "key")
+        streams = await collect(full), await collect(key)
+        await server.close()
+        return channel, streams
+    channel, (full, key) = asyncio.run(go())
+    assert channel.status == "finished"
+    events = [json.loads(p[len(b"data: "):]) for p in full]
+    assert events[-1]["kind"] == "full_time"
+    assert {e["kind"] for e in events[:-1]} <= {"goal", "save", "penalty", "weather_break", "strategic_timeout", "referee_steal", "snitch"}
+    assert [json.loads(p[len(b"data: "):])["kind"] for p in key][-1] == "full_time"
+    assert len(key) < len(full)
+
+def test_failed_simulation_sends_an_error(monkeypatch):
+    def broken(*args):
+        raise RuntimeError("engine failure")
+    monkeypatch.setattr(broadcast, "simulate_match", broken)
+    async def go():
+        server = BroadcastServer(pace=0)
+        channel = server.start_match()
+        payloads = await collect(channel.subscribe(16))
+        await server.close()
+        return channel, payloads
+    channel, payloads = asyncio.run(go())
+    assert channel.status == "failed"
+    assert payloads == [b"event: error\n" + broadcast.sse_bytes({"error": "RuntimeError: engine failure"})]
+
+def test_too_many_matches():
+    async def go():
+        server = BroadcastServer(pace=0, max_simulating=1)
+        channel = server.start_match()
+        with pytest.raises(TooManyMatches):
+            server.start_match()
+        await collect(channel.subscribe(1024))
+        server.start_match()
+        await server.close()
+    asyncio.run(go())
+
+async def request(port, raw):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(raw)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    status = int(response.split(b" ", 2)[1])
+    return status, response.split(b"\r\n\r\n", 1)[1]
+
+def test_http_endpoints():
+    def post(body):
+        return b"POST /matches HTTP/1.1\r\nContent-Length: %d\r\n\r\n" % len(body) + body
+    async def go():
+        server = BroadcastServer(pace=0, seed=3)
+        port = (await server.start(port=0)).sockets[0].getsockname()[1]
+        results = [
+            await request(port, post(b'{"time_limit": 240}')),
+            await request(port, post(b'{"time_limit": true}')),
+            await request(port, post(b"[1, 2]")),
+            await request(port, b"GET /matches/99/events HTTP/1.1\r\n\r\n"),
+            await request(port, b"GET / HTTP/1.1\r\nContent-Length: -5\r\n\r\n"),
+            await request(port, b"DELETE /matches HTTP/1.1\r\n\r\n"),
+        ]
+        await server.close()
+        return results
+    results = asyncio.run(go())
+    assert [status for status, _ in results] == [201, 400, 400, 404, 400, 404]
+    created = json.loads(results[0][1])
+    assert (created["id"], created["team1"], created["team2"]) == (1, "Home", "Away")
@@ -0,0 +1,66 @@
+import json
+import os
+import random
+import shutil
+import pytest
+import countries
+from countries import CountryIndex, build_snapshot, load_country_index, snapshot_path
+from tournaments import pick_random_teams_by_continent
+
+CSV = os.path.join(os.path.dirname(os.path.abspath(__file__)), "world_population.csv")
+
+@pytest.fixture
+def csv_copy(tmp_path):
+    path = str(tmp_path / "world_population.csv")
+    shutil.copy(CSV, path)
+    return path
+
+def touch_later(path, seconds = 10):
+    mtime = os.path.getmtime(path) + seconds
+    os.utime(path, (mtime, mtime))
+
+def test_index_is_cached_until_the_csv_changes(csv_copy):
+    index = load_country_index(csv_copy)
+    assert load_country_index(csv_copy) is index
+    touch_later(csv_copy)
+    assert load_country_index(csv_copy) is not index
+
+def test_fresh_snapshot_is_used(csv_copy):
+    build_snapshot(csv_copy)
+    with open(snapshot_path(csv_copy), encoding="utf-8") as f:
+        data = json.load(f)
+    data["countries"]["Europe"].append("Atlantis")
+    data["populations"]["Europe"].append(1)
+    with open(snapshot_path(csv_copy), "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    touch_later(snapshot_path(csv_copy))
+    assert "Atlantis" in load_country_index(csv_copy).countries["Europe"]
+
+@pytest.mark.parametrize("contents", [b"\x80\x04garbage", b"[1, 2, 3]", b'{"version": 0}', b"\xff\xfe"])
+def test_bad_snapshot_falls_back_to_csv(csv_copy, contents):
+    with open(snapshot_path(csv_copy), "wb") as f:
+        f.write(contents)
+    touch_later(snapshot_path(csv_copy))
+    index = load_country_index(csv_copy)
+    assert index.countries == CountryIndex(*countries.load_countries_by_continent(csv_copy)).countries
+
+def test_stale_snapshot_is_ignored(csv_copy):
+    build_snapshot(csv_copy)
+    with open(snapshot_path(csv_copy), "w", encoding="utf-8") as f:
+        json.dump({"version": countries.SNAPSHOT_VERSION, "countries": {}, "populations": {}}, f)
+    touch_later(csv_copy)
+    assert load_country_index(csv_copy).countries
+
+def test_sample_is_distinct_and_capped():
+    random.seed(1)
+    index = CountryIndex({"X": ["a", "b", "c"]}, {"X": [1, 10, 100]})
+    picks = index.sample("X", 2)
+    assert len(set(picks)) == 2
+    assert sorted(index.sample("X", 10)) == ["a", "b", "c"]
+    assert index.sample("Nowhere", 3) == []
+
+@pytest.mark.parametrize("n", [16, 32, 64])
+def test_pick_random_teams_are_distinct(n):
+    random.seed(n)
+    teams = pick_random_teams_by_continent(n, CSV)
+    assert len(teams) == len(set(teams)) == n
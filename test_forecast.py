@@ -0,0 +1,33 @@
+import random
+import pytest
+from forecast import draw_teams, forecast_tournament
+
+def test_forecast_probabilities_add_up():
+    random.seed(1)
+    teams = draw_teams(16)
+    forecast = forecast_tournament(teams, runs=60, workers=1, chunk_size=20)
+    assert forecast.runs == 60
+    assert sum(forecast.win_prob(t) for t in teams) == pytest.approx(1)
+    assert sum(forecast.group_win_prob(t) for t in teams) == pytest.approx(4)
+    assert forecast.round_order == ["Quarterfinals", "Semifinals", "Finals"]
+    for team in teams:
+        reach = [forecast.reach_prob(team, r) for r in forecast.round_order]
+        assert reach == sorted(reach, reverse=True)
+        assert forecast.win_prob(team) <= reach[-1]
+
+def test_forecast_in_worker_processes():
+    random.seed(2)
+    teams = draw_teams(16)
+    forecast = forecast_tournament(teams, fifa_style=False, runs=40, workers=2, chunk_size=10)
+    assert forecast.runs == 40
+    assert sum(forecast.win_prob(t) for t in teams) == pytest.approx(1)
+
+def test_forecast_needs_teams_and_runs():
+    with pytest.raises(ValueError):
+        forecast_tournament(runs=10)
+    with pytest.raises(ValueError):
+        forecast_tournament(num_teams=16, runs=0)
+
+def test_seeded_forecast_ignores_workers():
+    forecasts = [forecast_tournament(num_teams=16, runs=30, workers=w, chunk_size=10, seed=7) for w in (1, 2)]
+    assert forecasts[0].table() == forecasts[1].table()
@@ -0,0 +1,56 @@
+import json
+import random
+import pytest
+import instrumentation
+from instrumentation import STATS
+from models import create_random_team
+from simulation import simulate_match
+
+@pytest.fixture
+def stats():
+    was_enabled = STATS.enabled
+    instrumentation.enable()
+    yield STATS
+    STATS.enabled = was_enabled
+    STATS.reset()
+
+def make_teams():
+    rng = random.Random(17)
+    return create_random_team("Lions", rng), create_random_team("Eagles", rng)
+
+@pytest.mark.parametrize("engine", ["scalar", "skip"])
+def test_counter_totals(stats, engine):
+    team1, team2 = make_teams()
+    rng = random.Random(18)
+    results = [simulate_match(team1, team2, quiet=True, engine=engine, rng=rng) for _ in range(20)]
+    counters = stats.counters
+    assert counters["matches"] == 20
+    assert counters["factor_draws"] == 20
+    assert counters["attacks"] == sum(r.team1_attacks + r.team2_attacks for r in results)
+    loop = "main_loop" if engine == "scalar" else "skip_loop"
+    assert stats.phase_calls[loop] == 20
+    if engine == "scalar":
+        assert counters["loop_iterations"] == counters["attacks"] + 20
+        # Highlights are only formatted when read
+        assert counters["events_formatted"] == 0
+        lines = sum(len(r.events) for r in results)
+        assert counters["events_formatted"] == lines
+
+def test_snapshot_and_dump(stats, tmp_path):
+    team1, team2 = make_teams()
+    rng = random.Random(19)
+    for _ in range(4):
+        simulate_match(team1, team2, quiet=True, record_events=False, rng=rng)
+    snapshot = stats.snapshot()
+    assert snapshot["counters"]["matches"] == 4
+    assert snapshot["per_match"]["attacks"] == pytest.approx(stats.counters["attacks"] / 4)
+    assert snapshot["phases"]["main_loop"]["calls"] == 4
+    path = str(tmp_path / "stats.json")
+    stats.dump(path)
+    with open(path) as f:
+        assert json.load(f)["counters"] == snapshot["counters"]
+
+def test_disabled_counts_nothing(stats):
+    instrumentation.disable()
+    simulate_match(*make_teams(), quiet=True, rng=random.Random(20))
+    assert not stats.counters and not stats.phase_calls
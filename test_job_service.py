@@ -0,0 +1,97 @@
+import asyncio
+import json
+import random
+import pytest
+from job_service import JOB_PARAMS, JobError, JobService, run_job, validate_job
+from models import create_random_team
+
+def team(name, seed = 0):
+    return create_random_team(name, random.Random(seed)).to_dict()
+
+MATCH = {"kind": "match", "team1": team("Lions", 1), "team2": team("Eagles", 2)}
+
+def test_validate_job_fills_defaults():
+    kind, params, timeout = validate_job(dict(MATCH, seed=3, timeout=2.5))
+    assert (kind, timeout) == ("match", 2.5)
+    assert params == dict(JOB_PARAMS["match"], team1=MATCH["team1"], team2=MATCH["team2"], seed=3)
+    kind, params, timeout = validate_job({"kind": "tournament", "num_teams": 8})
+    assert (kind, params["group_size"], timeout) == ("tournament", 4, None)
+    assert validate_job(dict(MATCH, kind="head_to_head", engine="batch"))[1]["runs"] == 1000
+
+@pytest.mark.parametrize("data", [
+    [MATCH],
+    {"kind": "replay"},
+    dict(MATCH, colour="red"),
+    {"kind": "match", "team1": MATCH["team1"]},
+    dict(MATCH, team2={"name": "Half", "players": []}),
+    dict(MATCH, time_limit=True),
+    dict(MATCH, time_limit=0),
+    dict(MATCH, engine="batch"),
+    dict(MATCH, verbosity="loud"),
+    dict(MATCH, seed=-1),
+    dict(MATCH, timeout=0),
+    dict(MATCH, timeout="soon"),
+    dict(MATCH, kind="head_to_head", runs=0),
+    {"kind": "tournament"},
+    {"kind": "tournament", "num_teams": 1},
+    {"kind": "tournament", "teams": {"a": 1}},
+    {"kind": "tournament", "teams": [team("Same"), team("Same", 1)]},
+    {"kind": "tournament", "num_teams": 8, "group_size": 1},
+])
+def test_validate_job_rejects(data):
+    with pytest.raises(JobError):
+        validate_job(data)
+
+def test_run_job_kinds():
+    _, params, _ = validate_job(dict(MATCH, seed=4, verbosity="key"))
+    first, second = run_job("match", params, None), run_job("match", params, None)
+    assert first == second
+    assert first["team1"] == "Lions" and first["highlights"]
+
+    progress = []
+    _, params, _ = validate_job(dict(MATCH, kind="head_to_head", runs=300, seed=5))
+    result = run_job("head_to_head", params, progress.append)
+    assert result["matches"] == 300 and progress[-1]["matches"] == 300
+
+    progress = []
+    _, params, _ = validate_job({"kind": "tournament", "num_teams": 8, "seed": 6})
+    result = run_job("tournament", params, progress.append)
+    assert progress[-1]["champion"] == result["champion"]
+    assert [r["title"] for r in result["rounds"]] == ["Semifinals", "Finals"]
+
+async def request(port, raw):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(raw)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    return int(response.split(b" ", 2)[1]), response.split(b"\r\n\r\n", 1)[1]
+
+def post(body):
+    return b"POST /jobs HTTP/1.1\r\nContent-Length: %d\r\n\r\n" % len(body) + body
+
+def test_http_endpoints():
+    async def go():
+        service = JobService(workers=1, queue_size=4)
+        port = (await service.start(port=0)).sockets[0].getsockname()[1]
+        try:
+            rejected = [
+                await request(port, post(b"{not json")),
+                await request(port, post(b'{"kind": "match"}')),
+                await request(port, b"POST /jobs HTTP/1.1\r\nContent-Length: -1\r\n\r\n"),
+                await request(port, b"GET /jobs/99 HTTP/1.1\r\n\r\n"),
+            ]
+            created = await request(port, post(json.dumps(dict(MATCH, seed=7)).encode()))
+            job_id = json.loads(created[1])["id"]
+            _, stream = await request(port, b"GET /jobs/%d/events HTTP/1.1\r\n\r\n" % job_id)
+            status, job = await request(port, b"GET /jobs/%d HTTP/1.1\r\n\r\n" % job_id)
+            cancel = await request(port, b"DELETE /jobs/%d HTTP/1.1\r\n\r\n" % job_id)
+        finally:
+            await service.close()
+        return rejected, created, stream, (status, json.loads(job)), cancel
+    rejected, created, stream, job, cancel = asyncio.run(go())
+    assert [status for status, _ in rejected] == [400, 400, 400, 404]
+    assert created[0] == 202
+    assert stream.startswith(b"event: status\n") and b'"status":"done"' in stream
+    assert job[0] == 200 and job[1]["status"] == "done" and job[1]["result"]["team1"] == "Lions"
+    assert cancel[0] == 409
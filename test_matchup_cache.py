@@ -0,0 +1,73 @@
+import random
+from models import Player, create_random_team
+from matchup_cache import MatchupCache, matchup_key
+from seeding import make_rng
+from tournaments import TournamentRunner
+
+def make_teams(n, seed = 16):
+    rng = make_rng(seed, "test cache")
+    return [create_random_team(f"Team {i}", rng) for i in range(n)]
+
+def test_fingerprint_ignores_names_and_order():
+    team = make_teams(1)[0]
+    twin = create_random_team("Twin", random.Random(1))
+    twin.players = [Player(f"P{i}", p.role, p.skill) for i, p in enumerate(reversed(team.players))]
+    assert twin.fingerprint() == team.fingerprint()
+    twin.players[0].skill = 2 if twin.players[0].skill == 1 else 1
+    assert twin.fingerprint() != team.fingerprint()
+
+def test_cache_plays_then_draws():
+    team1, team2 = make_teams(2)
+    cache = MatchupCache(samples=5)
+    rng = random.Random(3)
+    results = [cache.play(team1, team2, rng=rng) for _ in range(20)]
+    assert (cache.misses, cache.hits) == (5, 15)
+    outcomes = cache.distribution(team1, team2)
+    assert len(outcomes) == 5
+    for result in results[5:]:
+        assert MatchupCache._outcome(result) in outcomes
+        assert (result.team1_name, result.team2_name) == (team1.name, team2.name)
+    # The other side, another time limit or engine are separate matchups
+    assert cache.distribution(team2, team1) is None
+    assert cache.distribution(team1, team2, 240) is None
+
+def test_cache_evicts_least_recently_used():
+    teams = make_teams(4)
+    cache = MatchupCache(max_entries=2, samples=1)
+    rng = random.Random(4)
+    cache.play(teams[0], teams[1], rng=rng)
+    cache.play(teams[0], teams[2], rng=rng)
+    cache.play(teams[0], teams[1], rng=rng)  # now the most recently used
+    cache.play(teams[0], teams[3], rng=rng)
+    assert len(cache) == 2
+    assert list(cache.entries) == [matchup_key(teams[0], teams[1]), matchup_key(teams[0], teams[3])]
+
+def test_cache_save_and_load(tmp_path):
+    path = str(tmp_path / "cache.json")
+    teams = make_teams(3)
+    cache = MatchupCache(samples=3)
+    rng = random.Random(5)
+    for _ in range(3):
+        cache.play(teams[0], teams[1], rng=rng)
+        cache.play(teams[1], teams[2], 240, rng=rng)
+    cache.save(path)
+
+    loaded = MatchupCache.load(path, samples=3)
+    assert loaded.entries == cache.entries
+    loaded.play(teams[0], teams[1], rng=rng)
+    assert (loaded.hits, loaded.misses) == (1, 0)
+    assert len(MatchupCache.load(path, max_entries=1, samples=3)) == 1
+    # Another sample size, a missing file or a bad file just start empty
+    assert len(MatchupCache.load(path, samples=4)) == 0
+    assert len(MatchupCache.load(str(tmp_path / "missing.json"), samples=3)) == 0
+    for contents in (b"\x80\x04garbage", b"[1, 2]", b'{"version": 0}'):
+        with open(path, "wb") as f:
+            f.write(contents)
+        assert len(MatchupCache.load(path, samples=3)) == 0
+
+def test_runner_uses_the_cache():
+    cache = MatchupCache(samples=1)
+    teams = {t.name: t for t in make_teams(8)}
+    for _ in range(3):
+        TournamentRunner(seed=6, cache=cache).run(teams_dict=teams, fifa_style=False)
+    assert cache.hits > 0
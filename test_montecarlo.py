@@ -0,0 +1,86 @@
+import random
+import pytest
+from models import create_random_team
+from montecarlo import HeadToHead, simulate_many
+
+def make_teams(rng = random):
+    return create_random_team("Lions", rng), create_random_team("Eagles", rng)
+
+def assert_same_distribution(a, b):
+    # about four standard errors of the difference for a few thousand matches each
+    assert abs(a.team1_win_prob - b.team1_win_prob) < 0.05
+    assert abs(a.draw_prob - b.draw_prob) < 0.03
+    assert abs(a.snitch_share(a.team1_name) - b.snitch_share(b.team1_name)) < 0.05
+    assert abs(a.mean_time() - b.mean_time()) < 0.1 * a.mean_time()
+
+def test_head_to_head_add_and_merge():
+    a, b = HeadToHead("Lions", "Eagles"), HeadToHead("Lions", "Eagles")
+    a.add(160, 20, "Lions", 40)
+    a.add(10, 30, None, 240)
+    b.add(50, 50, "Eagles", 12)
+    a.merge(b)
+    assert a.matches == 3
+    assert (a.team1_wins, a.team2_wins, a.draws) == (1, 1, 1)
+    assert a.snitch_share("Lions") == pytest.approx(1 / 3)
+    assert a.mean_time() == pytest.approx((40 + 240 + 12) / 3)
+    assert a.mean_score("Eagles") == pytest.approx((20 + 30 + 50) / 3)
+
+def test_simulate_many_counts_every_match():
+    random.seed(1)
+    summary = simulate_many(*make_teams(), 1234, workers=1, chunk_size=100)
+    assert summary.matches == 1234
+    assert summary.team1_win_prob + summary.team2_win_prob + summary.draw_prob == pytest.approx(1)
+
+def test_simulate_many_parallel_matches_serial():
+    random.seed(2)
+    team1, team2 = make_teams()
+    serial = simulate_many(team1, team2, 3000, workers=1)
+    parallel = simulate_many(team1, team2, 3000, workers=2, chunk_size=250)
+    assert parallel.matches == 3000
+    assert_same_distribution(serial, parallel)
+
+def test_simulate_many_rejects_no_matches():
+    with pytest.raises(ValueError):
+        simulate_many(*make_teams(), 0)
+
+@pytest.mark.parametrize("time_limit", [None, 240])
+def test_skip_engine_matches_scalar(time_limit):
+    random.seed(5)
+    team1, team2 = make_teams()
+    scalar = simulate_many(team1, team2, 3000, workers=1, time_limit=time_limit)
+    skip = simulate_many(team1, team2, 3000, workers=1, time_limit=time_limit, engine="skip")
+    assert_same_distribution(scalar, skip)
+
+def weak_seeker_teams(rng = random):
+    team1, team2 = make_teams(rng)
+    for team in (team1, team2):
+        for p in team.players:
+            if p.role == "Seeker":
+                p.skill = 1
+    return team1, team2
+
+def test_batch_engine_matches_scalar():
+    pytest.importorskip("numpy")
+    random.seed(3)
+    team1, team2 = make_teams()
+    scalar = simulate_many(team1, team2, 3000, workers=1)
+    batch = simulate_many(team1, team2, 3000, workers=1, engine="batch")
+    assert_same_distribution(scalar, batch)
+
+def test_batch_engine_long_matches():
+    # Weak seekers make for many strategic timeouts; the doubling time skip must stay capped
+    # (seed 2 reaches 61 timeouts, where an uncapped 15 * 2 ** 60 overflows)
+    pytest.importorskip("numpy")
+    from batch_engine import simulate_batch
+    rng = random.Random(2)
+    batch = simulate_batch(*weak_seeker_teams(rng), 5000, seed=2, rng=rng)
+    assert (batch.snitch > 0).all()
+    assert (batch.time > 0).all()
+
+@pytest.mark.parametrize("engine", ["scalar", "skip"])
+def test_seeded_simulate_many_ignores_workers(engine):
+    team1, team2 = make_teams(random.Random(6))
+    runs = [simulate_many(team1, team2, 600, workers=w, chunk_size=200, engine=engine, seed=6) for w in (1, 2)]
+    random.random()
+    runs.append(simulate_many(team1, team2, 600, workers=1, chunk_size=200, engine=engine, seed=6))
+    assert len({(r.team1_wins, r.team2_wins, r.draws, tuple(sorted(r.times.items()))) for r in runs}) == 1
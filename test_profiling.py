@@ -0,0 +1,36 @@
+import argparse
+import os
+import pytest
+from profiling import add_profile_arguments, matches_workload, profile_call, profile_from_args
+
+def read_collapsed(path):
+    stacks = {}
+    with open(path) as f:
+        for line in f:
+            stack, count = line.rsplit(" ", 1)
+            stacks[stack] = int(count)
+    return stacks
+
+def test_cprofile_writes_stats_and_stacks(tmp_path, capsys):
+    prefix = str(tmp_path / "run")
+    assert profile_call(lambda: matches_workload(30, seed=1)() or "done", "cprofile", prefix) == "done"
+    assert os.path.exists(prefix + ".prof")
+    stacks = read_collapsed(prefix + ".collapsed")
+    assert any("simulation.py:simulate_match" in stack for stack in stacks)
+    assert all(count > 0 for count in stacks.values())
+    assert "simulation.py" in capsys.readouterr().out
+
+def test_sampling_profiler_from_arguments(tmp_path, capsys):
+    parser = argparse.ArgumentParser()
+    add_profile_arguments(parser)
+    prefix = str(tmp_path / "sample")
+    args = parser.parse_args(["--profile", "sample", "--workload", "tournament", "--teams", "16",
+                              "--seed", "2", "--profile-output", prefix, "--profile-interval", "0.001"])
+    profile_from_args(args)
+    stacks = read_collapsed(prefix + ".collapsed")
+    assert sum(stacks.values()) > 0
+    assert "samples" in capsys.readouterr().out
+
+def test_unknown_mode_raises():
+    with pytest.raises(ValueError):
+        profile_call(lambda: None, "perf")
@@ -0,0 +1,79 @@
+import random
+import re
+from collections import Counter
+import pytest
+from models import create_random_team
+from random_factors import apply_all_factors, draw_factor_batch
+
+# Every description line either generator may produce, by the factor it describes
+LINE_FORMATS = [
+    ("weather", r"Weather: (Cloudy \(all players skill \+1\)|Sunny \(all players skill \+0\)|Windy \(all players skill -1\)"
+                r"|Rainy \(all players skill -2\)|Foggy \(all players skill -1\))"),
+    ("weather effect", r"Fan interference timeout: \d+ minutes every \d+ attacks \(Cloudy\)"),
+    ("weather effect", r"Water break: \d+ minutes after every \d+ attacks \(Sunny\)"),
+    ("weather effect", r"Lightning risk timeout: \d+ minutes every \d+ attacks \(Rainy\)"),
+    ("weather effect", r"All Beaters suffer -1 skill for the whole match \(Windy\)"),
+    ("weather effect", r"Both Seekers suffer -2 skill for the whole match \(Foggy\)"),
+    ("crowd", r"(Lions|Eagles) (received massive crowd support \(\+1 to all players\)|did not receive extra crowd support)"),
+    ("referee", r"Referee bias: (Lions|Eagles) has a 20% chance to steal the attack each time step\.|No referee bias in this match\."),
+    ("brooms", r"\d+ player\(s\) received faulty brooms \(skill -2\): \S.*\((Lions|Eagles), \w+\)|No players received faulty brooms\."),
+    ("injuries", r"\d+ player\(s\) injured: \S.*\((Lions|Eagles), \w+\) injured: -[123]|No injuries occurred this match\."),
+    ("calm", r"Bludger Calmness: The bludgers are calmer than usual! Time steps reduced to 1-3 minutes\."
+             r"|No Bludger Calmness: Normal match pace\."),
+    ("coach", r"Lions coach's .+; Eagles coach's .+"),
+]
+LINE_ORDER = ["weather", "weather effect", "crowd", "crowd", "referee", "brooms", "injuries", "calm", "coach"]
+
+def kind(line):
+    for name, pattern in LINE_FORMATS:
+        if re.fullmatch(pattern, line):
+            return name
+    raise AssertionError(f"unexpected description: {line}")
+
+def make_teams():
+    return create_random_team("Lions"), create_random_team("Eagles")
+
+def summarize(descriptions, deltas):
+    # Share of matches with each description (up to its first colon) and mean delta per slot
+    lines = Counter()
+    for descs in descriptions:
+        for line in descs:
+            for part in line.split("; "):
+                lines[part if part.startswith("Weather") else part.split(":")[0]] += 1
+    slots = [sum(d[s] for d in deltas) / len(deltas) for s in range(len(deltas[0]))]
+    return {line: count / len(descriptions) for line, count in lines.items()}, slots
+
+def test_describe_matches_apply_all_factors():
+    random.seed(1)
+    team1, team2 = make_teams()
+    players = team1.players + team2.players
+    n = 4000
+
+    single_descs, single_deltas = [], []
+    for _ in range(n):
+        player_deltas, descs, _, _, _ = apply_all_factors(team1, team2)
+        single_descs.append(descs)
+        single_deltas.append([sum(player_deltas[id(p)]) for p in players])
+    batch = draw_factor_batch(n)
+    batch_descs = [batch.describe(i, team1, team2) for i in range(n)]
+
+    for descs in single_descs + batch_descs:
+        assert [kind(line) for line in descs] == LINE_ORDER
+
+    single_lines, single_slots = summarize(single_descs, single_deltas)
+    batch_lines, batch_slots = summarize(batch_descs, batch.deltas)
+    for line in set(single_lines) | set(batch_lines):
+        assert single_lines.get(line, 0) == pytest.approx(batch_lines.get(line, 0), abs=0.03), line
+    assert single_slots == pytest.approx(batch_slots, abs=0.15)
+
+def test_batch_accessors_follow_the_draw():
+    random.seed(2)
+    team1, team2 = make_teams()
+    batch = draw_factor_batch(500)
+    for i in range(500):
+        weather = batch.weather_type(i)
+        timeouts = batch.timeouts(i)
+        assert (weather in ("Cloudy", "Sunny", "Rainy")) == bool(timeouts)
+        assert all(t["condition"] == weather for t in timeouts)
+        assert batch.time_step_range(i) == ((1, 3) if batch.calm[i] else (1, 5))
+        assert batch.ref_bias(i, team1, team2) in (None, "Lions", "Eagles")
@@ -0,0 +1,70 @@
+import pytest
+from models import create_random_team
+from montecarlo import HeadToHead
+from result_store import RECORD, StoreReader, StoreWriter
+from seeding import make_rng
+from simulation import simulate_match
+
+def play(n, seed = 11):
+    rng = make_rng(seed, "test store")
+    team1, team2 = create_random_team("Lions", rng), create_random_team("Eagles", rng)
+    return [simulate_match(team1, team2, quiet=True, record_events=False, rng=rng) for _ in range(n)]
+
+def test_store_round_trip(tmp_path):
+    path = str(tmp_path / "matches.bin")
+    results = play(50)
+    with StoreWriter(path, buffer_records=16) as writer:
+        for result in results:
+            writer.append(result)
+
+    expected = HeadToHead("Lions", "Eagles")
+    for result in results:
+        expected.add(*result)
+    with StoreReader(path) as reader:
+        assert len(reader) == len(results)
+        assert reader.teams == ["Lions", "Eagles"]
+        for stored, result in zip(reader, results):
+            assert (stored.team1_score, stored.team2_score, stored.time) == (result.team1_score, result.team2_score, result.time)
+            assert (stored.team1_goals, stored.team2_attacks) == (result.team1_goals, result.team2_attacks)
+            assert stored.snitch == (0, 1, 2)[(None, "Lions", "Eagles").index(result.snitch_catcher)]
+        assert reader[-1] == list(reader)[-1]
+        with pytest.raises(IndexError):
+            reader[len(results)]
+        assert vars(reader.aggregate()[("Lions", "Eagles")]) == vars(expected)
+        assert reader.aggregate("Lions").keys() == {("Lions", "Eagles")}
+
+def test_store_append_and_array(tmp_path):
+    np = pytest.importorskip("numpy")
+    path = str(tmp_path / "matches.bin")
+    results = play(20)
+    with StoreWriter(path) as writer:
+        for result in results[:10]:
+            writer.append(result)
+    # A crash mid-record leaves a partial record, which the next writer drops
+    with open(path, "ab") as f:
+        f.write(b"\1" * (RECORD.size // 2))
+    with StoreWriter(path) as writer:
+        for result in results[10:]:
+            writer.append(result)
+
+    with StoreReader(path) as reader:
+        assert len(reader) == 20
+        array = reader.array()
+        assert np.array_equal(array["team1_score"], [r.team1_score for r in results])
+        assert np.array_equal(array["time"], [r.time for r in results])
+        del array
+
+def test_store_batches(tmp_path):
+    pytest.importorskip("numpy")
+    from batch_engine import simulate_batch
+    path = str(tmp_path / "matches.bin")
+    rng = make_rng(12, "test store")
+    team1, team2 = create_random_team("Lions", rng), create_random_team("Eagles", rng)
+    batch = simulate_batch(team1, team2, 300, rng=rng)
+    with StoreWriter(path, buffer_records=64) as writer:
+        writer.append_batch(batch)
+    with StoreReader(path) as reader:
+        assert len(reader) == 300
+        summary = reader.aggregate()[("Lions", "Eagles")]
+        assert summary.team1_wins == int((batch.team1_score > batch.team2_score).sum())
+        assert summary.draws == int((batch.team1_score == batch.team2_score).sum())
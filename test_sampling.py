@@ -0,0 +1,57 @@
+import random
+from collections import Counter
+import pytest
+from sampling import AliasTable, streak_table, weighted_sample
+
+def shares(draws):
+    counts = Counter(draws)
+    return {k: c / len(draws) for k, c in counts.items()}
+
+def test_alias_table_follows_weights():
+    random.seed(1)
+    weights = [0.4, 0.3, 0.1, 0.1, 0.1]
+    table = AliasTable("abcde", weights)
+    got = shares(table.draw_many(50000))
+    for outcome, weight in zip("abcde", weights):
+        assert got[outcome] == pytest.approx(weight, abs=0.01)
+
+def test_alias_table_zero_weight_never_drawn():
+    random.seed(2)
+    table = AliasTable([1, 2, 3], [0, 5, 5])
+    assert 1 not in table.draw_many(5000)
+
+@pytest.mark.parametrize("outcomes, weights", [([], []), ([1, 2], [1]), ([1, 2], [0, 0])])
+def test_alias_table_rejects_bad_weights(outcomes, weights):
+    with pytest.raises(ValueError):
+        AliasTable(outcomes, weights)
+
+def test_weighted_sample_matches_sequential_draws():
+    # Efraimidis-Spirakis keys give the same ordered-pair distribution as drawing one item at
+    # a time in proportion to the weights of those still left
+    random.seed(3)
+    population, weights = "abcd", [4, 3, 2, 1]
+    n = 40000
+    got = shares([tuple(weighted_sample(population, weights, 2)) for _ in range(n)])
+    for a in range(4):
+        for b in range(4):
+            if a != b:
+                expected = weights[a] / 10 * weights[b] / (10 - weights[a])
+                assert got.get((population[a], population[b]), 0) == pytest.approx(expected, abs=0.01)
+
+def test_weighted_sample_sizes():
+    random.seed(4)
+    assert weighted_sample("abc", [1, 1, 1], 0) == []
+    assert sorted(weighted_sample("abc", [1, 1, 1], 10)) == ["a", "b", "c"]
+    assert weighted_sample("abc", [0, 1, 0], 3) == ["b"]
+
+def test_streak_table_matches_streaks():
+    random.seed(5)
+    def streak():
+        count = 0
+        while count < 14 and random.random() < 0.75:
+            count += 1
+        return count
+    table = streak_table(0.75, 14)
+    drawn, looped = shares(table.draw_many(40000)), shares([streak() for _ in range(40000)])
+    for k in range(15):
+        assert drawn.get(k, 0) == pytest.approx(looped.get(k, 0), abs=0.01)
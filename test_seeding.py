@@ -0,0 +1,7 @@
+from seeding import derive_seed, make_rng
+
+def test_streams_depend_only_on_root_and_keys():
+    assert derive_seed(1, "match", 3) == derive_seed(1, "match", 3)
+    assert len({derive_seed(1, "match", 3), derive_seed(1, "match", 4), derive_seed(2, "match", 3), derive_seed(1, "teams")}) == 4
+    a, b = make_rng(5, "group", 1), make_rng(5, "group", 1)
+    assert [a.random() for _ in range(5)] == [b.random() for _ in range(5)]
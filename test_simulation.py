@@ -0,0 +1,118 @@
+import random
+import pytest
+from models import create_random_team
+from events import FullTime, Goal, Penalty, SnitchCaught
+from simulation import MatchResult, iter_match_events, simulate_match
+
+def make_teams():
+    return create_random_team("Lions"), create_random_team("Eagles")
+
+def test_quiet_match_returns_result_without_printing(capsys):
+    random.seed(1)
+    team1, team2 = make_teams()
+    capsys.readouterr()
+    result = simulate_match(team1, team2, quiet=True)
+    assert capsys.readouterr().out == ""
+    assert isinstance(result, MatchResult)
+    assert tuple(result) == (result.team1_score, result.team2_score, result.snitch_catcher, result.time)
+    assert result.snitch_catcher in ("Lions", "Eagles")
+    assert result.applied_factors
+    assert result.events
+
+def test_record_events_off():
+    random.seed(2)
+    result = simulate_match(*make_teams(), quiet=True, record_events=False)
+    assert result.events is None
+
+def test_time_limit():
+    random.seed(3)
+    for _ in range(20):
+        result = simulate_match(*make_teams(), time_limit=240, quiet=True, record_events=False)
+        assert result.time <= 240
+        assert result.team1_score % 10 == 0 and result.team2_score % 10 == 0
+
+def test_loud_match_prints_report(capsys):
+    random.seed(4)
+    simulate_match(*make_teams())
+    out = capsys.readouterr().out
+    assert "--- Match Result ---" in out
+    assert "--- Match Highlights ---" in out
+
+def test_skip_engine_time_limit():
+    random.seed(5)
+    for _ in range(20):
+        result = simulate_match(*make_teams(), time_limit=240, quiet=True, engine="skip")
+        assert result.time <= 240
+        assert result.events is None
+        assert result.team1_score % 10 == 0 and result.team2_score % 10 == 0
+
+def test_unknown_engine():
+    with pytest.raises(ValueError):
+        simulate_match(*make_teams(), quiet=True, engine="turbo")
+
+@pytest.mark.parametrize("engine", ["scalar", "skip"])
+def test_match_leaves_teams_untouched(engine):
+    random.seed(6)
+    team1, team2 = make_teams()
+    before = (team1.to_dict(), team2.to_dict())
+    for _ in range(10):
+        simulate_match(team1, team2, quiet=True, engine=engine)
+    assert (team1.to_dict(), team2.to_dict()) == before
+
+@pytest.mark.parametrize("engine", ["scalar", "skip"])
+def test_same_rng_seed_gives_same_match(engine):
+    team1, team2 = make_teams()
+    results = []
+    for _ in range(2):
+        result = simulate_match(team1, team2, quiet=True, engine=engine, rng=random.Random(8))
+        results.append((tuple(result), result.events))
+        random.random()
+    assert results[0] == results[1]
+
+@pytest.mark.parametrize("seed", range(5))
+def test_iter_match_events_ends_with_full_time(seed):
+    team1, team2 = make_teams()
+    events = list(iter_match_events(team1, team2, rng=random.Random(seed)))
+    assert isinstance(events[-1], FullTime)
+    assert not any(isinstance(e, FullTime) for e in events[:-1])
+    result = events[-1].result
+    # Same stream, same match: simulate_match's highlights are the events' descriptions
+    expected = simulate_match(team1, team2, quiet=True, rng=random.Random(seed))
+    assert tuple(result) == tuple(expected)
+    assert [e.describe() for e in events[:-1]] == expected.events
+    assert [e.time for e in events] == sorted(e.time for e in events)
+    goals = [e for e in events if isinstance(e, Goal)]
+    if goals:
+        assert (goals[-1].score1, goals[-1].score2) != (0, 0)
+    catches = [e for e in events if isinstance(e, SnitchCaught)]
+    assert [e.team for e in catches] == ([result.snitch_catcher] if result.snitch_catcher else [])
+
+def test_iter_match_events_can_stop_early():
+    team1, team2 = make_teams()
+    events = iter_match_events(team1, team2, rng=random.Random(1))
+    first = next(events)
+    events.close()
+    assert not isinstance(first, FullTime)
+
+def test_verbosity_filters_events_and_highlights():
+    team1, team2 = make_teams()
+    full = list(iter_match_events(team1, team2, rng=random.Random(3)))
+    key = list(iter_match_events(team1, team2, rng=random.Random(3), verbosity="key"))
+    none = list(iter_match_events(team1, team2, rng=random.Random(3), verbosity="none"))
+    # MatchResult has no equality, so the final events are compared by their results
+    assert key[:-1] == [e for e in full if isinstance(e, (Goal, Penalty, SnitchCaught))]
+    assert len(key) < len(full)
+    assert len(none) == 1
+    assert tuple(key[-1].result) == tuple(none[-1].result) == tuple(full[-1].result)
+
+    result = simulate_match(team1, team2, quiet=True, rng=random.Random(3))
+    assert result.events == result.highlights("full") == [e.describe() for e in full[:-1]]
+    assert result.highlights("key") == [e.describe() for e in key[:-1]]
+    assert result.highlights("none") == []
+
+def test_bad_verbosity_raises():
+    team1, team2 = make_teams()
+    with pytest.raises(ValueError):
+        next(iter_match_events(team1, team2, verbosity="loud"))
+    with pytest.raises(ValueError):
+        simulate_match(team1, team2, quiet=True, rng=random.Random(1)).highlights("loud")
@@ -0,0 +1,29 @@
+import random
+import pytest
+from models import create_random_team
+from simulation import get_attack_value, get_defense_value
+from strength import TeamStrength
+
+def test_tables_match_per_player_sums():
+    random.seed(1)
+    for i in range(20):
+        team = create_random_team(f"Team {i}")
+        strength = TeamStrength.of(team)
+        for boost in range(12):
+            assert strength.attack_value(boost) == pytest.approx(get_attack_value(team, boost))
+            assert strength.defense_value(boost) == pytest.approx(get_defense_value(team, boost))
+
+def test_penalty_and_seeker_skills():
+    team = create_random_team("Lions")
+    skills = {p.role: [] for p in team.players}
+    for p in team.players:
+        skills[p.role].append(p.skill)
+    strength = TeamStrength.of(team)
+    assert strength.chaser_skill == max(skills["Chaser"])
+    assert strength.keeper_skill == skills["Keeper"][0]
+    assert strength.seeker_skill == skills["Seeker"][0]
+    assert strength.penalty_chaser_skill(20) == 10
+
+def test_team_without_keeper():
+    with pytest.raises(ValueError):
+        TeamStrength(["Chaser", "Seeker"], [5, 5])
@@ -0,0 +1,49 @@
+import json
+import pytest
+from models import create_random_team
+from seeding import make_rng
+from team_io import RosterError, TeamReader, read_teams_dict, team_from_record, write_teams
+
+def make_teams(n, seed = 13):
+    rng = make_rng(seed, "test teams")
+    return [create_random_team(f"Team {i}", rng) for i in range(n)]
+
+def test_teams_round_trip(tmp_path):
+    filename = str(tmp_path / "teams.jsonl")
+    teams = make_teams(5)
+    assert write_teams(filename, teams[:3]) == 3
+    assert write_teams(filename, teams[3:], append=True) == 2
+
+    read = list(TeamReader(filename))
+    assert [t.to_dict() for t in read] == [t.to_dict() for t in teams]
+    assert list(read_teams_dict(filename, limit=3)) == ["Team 0", "Team 1", "Team 2"]
+
+def test_team_reader_errors(tmp_path):
+    filename = str(tmp_path / "teams.jsonl")
+    write_teams(filename, make_teams(1))
+    with open(filename, "a", encoding="utf-8") as f:
+        f.write("{not json\n\n")
+        f.write(json.dumps({"name": "Half", "players": [{"role": "Seeker", "skill": 5}]}) + "\n")
+    with pytest.raises(RosterError) as e:
+        list(TeamReader(filename))
+    assert (e.value.line, e.value.filename) == (2, filename)
+    reader = TeamReader(filename, errors="skip")
+    assert [t.name for t in reader] == ["Team 0"]
+    assert [line for line, _ in reader.errors] == [2, 4]
+    partial = TeamReader(filename, require_complete=False, errors="skip")
+    assert [t.name for t in partial] == ["Team 0", "Half"]
+    with pytest.raises(ValueError):
+        TeamReader(filename, errors="ignore")
+
+@pytest.mark.parametrize("record", [
+    [],
+    {"players": []},
+    {"name": "X", "players": "none"},
+    {"name": "X", "players": [{"role": "Coach", "skill": 5}]},
+    {"name": "X", "players": [{"role": "Seeker", "skill": 11}]},
+    {"name": "X", "players": [{"role": "Seeker", "skill": True}]},
+    {"name": "X", "players": [{"role": "Seeker", "skill": 5}, {"role": "Seeker", "skill": 6}]},
+])
+def test_bad_records_raise(record):
+    with pytest.raises(RosterError):
+        team_from_record(record, require_complete=False)
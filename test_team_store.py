@@ -0,0 +1,96 @@
+import json
+import pytest
+import main
+from models import Player, Team, create_random_team
+from seeding import make_rng
+from team_store import TeamOverlay, TeamStore
+
+def make_teams(n, seed = 14):
+    rng = make_rng(seed, "test team store")
+    return [create_random_team(f"Team {i}", rng) for i in range(n)]
+
+@pytest.fixture
+def store(tmp_path):
+    with TeamStore(str(tmp_path / "teams.db")) as store:
+        yield store
+
+def test_store_round_trip(store):
+    teams = make_teams(6)
+    assert store.save_many(teams) == 6
+    assert len(store) == 6
+    assert list(store) == [t.name for t in teams]
+    assert [t.to_dict() for t in store.all_teams()] == [t.to_dict() for t in teams]
+    assert store["Team 3"].to_dict() == teams[3].to_dict()
+    assert store.get("Nobody") is None
+    with pytest.raises(KeyError):
+        store["Nobody"]
+
+def test_store_save_replaces_roster(store):
+    team = make_teams(1)[0]
+    store.save(team)
+    smaller = Team(team.name)
+    smaller.players.append(Player("Solo", "Seeker", 9))
+    store.save(smaller)
+    assert len(store) == 1
+    assert store[team.name].to_dict() == smaller.to_dict()
+    empty = Team("Empty")
+    store.save(empty)
+    assert "Empty" in store and store["Empty"].players == []
+    assert store.delete("Empty") and not store.delete("Empty")
+
+def test_find_by_role(store):
+    teams = make_teams(8)
+    store.save_many(teams)
+    for role, low, high in [("Seeker", 7, 10), ("Keeper", 1, 4), ("Chaser", 5, 5)]:
+        expected = [t.name for t in teams if any(p.role == role and low <= p.skill <= high for p in t.players)]
+        assert store.find_by_role(role, low, high) == expected
+    assert store.find_by_role("Referee") == []
+
+def test_json_import_export(store, tmp_path):
+    teams = make_teams(4)
+    path = str(tmp_path / "teams.json")
+    with open(path, "w") as f:
+        json.dump([t.to_dict() for t in teams], f)
+    assert store.import_json(path) == 4
+    out = str(tmp_path / "out.json")
+    assert store.export_json(out, ["Team 2", "Team 0"]) == 2
+    with open(out) as f:
+        assert [d["name"] for d in json.load(f)] == ["Team 2", "Team 0"]
+
+def test_overlay_reads_stores_lazily(store, monkeypatch):
+    stored = make_teams(3)
+    store.save_many(stored)
+    mine = create_random_team("Mine", make_rng(1, "test"))
+    clash = create_random_team("Team 1", make_rng(2, "test"))
+    teams = TeamOverlay({"Mine": mine, "Team 1": clash})
+    reads = []
+    get = store.get
+    monkeypatch.setattr(store, "get", lambda name, default = None: reads.append(name) or get(name, default))
+
+    teams.add_store(store)
+    assert list(teams) == ["Mine", "Team 0", "Team 1", "Team 2"]
+    assert len(teams) == 4 and "Team 2" in teams and reads == []
+    # The store's team replaces the one loaded earlier, and is read once
+    team = teams["Team 1"]
+    assert team.to_dict() == stored[1].to_dict()
+    assert teams["Team 1"] is team and reads == ["Team 1"]
+    teams["Team 0"] = mine
+    assert teams["Team 0"] is mine and teams["Mine"] is mine
+    with pytest.raises(KeyError):
+        teams["Nobody"]
+
+def test_cli_load_merges_into_current_teams(tmp_path, monkeypatch, capsys):
+    db = str(tmp_path / "teams.db")
+    with TeamStore(db) as store:
+        store.save_many(make_teams(2))
+    path = str(tmp_path / "more.json")
+    with open(path, "w") as f:
+        json.dump([t.to_dict() for t in make_teams(3, seed=15)[2:]], f)
+
+    teams = TeamOverlay({"Mine": create_random_team("Mine", make_rng(1, "test"))})
+    for filename in (db, path):
+        monkeypatch.setattr("builtins.input", lambda prompt = "": filename)
+        main.load_teams(teams)
+    assert list(teams) == ["Mine", "Team 2", "Team 0", "Team 1"]
+    assert "Loaded 2 teams" in capsys.readouterr().out
+    teams.close()
@@ -0,0 +1,156 @@
+import random
+import pytest
+import tournaments
+from itertools import combinations
+from tournaments import (ConsoleObserver, TournamentObserver, TournamentRunner, TournamentSizeError, build_seeded_pairs,
+                         make_groups, round_robin_schedule, run_tournament, schedule_matchdays)
+
+class Recorder(TournamentObserver):
+    def __init__(self, wants_events = False):
+        self.wants_events = wants_events
+        self.calls = []
+        self.records = []
+
+    def on_house_schedule(self, schedule, teams):
+        self.calls.append("schedule")
+
+    def on_match_end(self, stage, record):
+        self.records.append(record)
+
+    def on_round_start(self, knockout_round):
+        self.calls.append(knockout_round.title)
+
+    def on_champion(self, champion):
+        self.calls.append(("champion", champion))
+
+@pytest.mark.parametrize("fifa_style", [True, False])
+def test_runner_plays_groups_and_knockouts(fifa_style):
+    random.seed(1)
+    recorder = Recorder()
+    result = TournamentRunner([recorder]).run(16, fifa_style)
+    assert len(result.groups) == 4
+    assert all(len(g.matches) == 6 and len(g.ranking) == 4 for g in result.groups)
+    assert [r.title for r in result.rounds] == (["Quarterfinals", "Semifinals", "Finals"] if fifa_style else ["Semifinals", "Finals"])
+    assert result.champion in result.teams
+    assert result.rounds[-1].matches[0].winner == result.champion
+    assert recorder.calls[-1] == ("champion", result.champion)
+    assert len(recorder.records) == sum(len(g.matches) for g in result.groups) + sum(len(r.matches) for r in result.rounds)
+    assert all(r.result.events is None for r in recorder.records)
+
+def test_house_cup_and_events():
+    random.seed(2)
+    recorder = Recorder(wants_events=True)
+    result = TournamentRunner([recorder]).run_house_cup()
+    assert recorder.calls[0] == "schedule"
+    assert len(result.groups[0].matches) == 6
+    assert result.champion == result.groups[0].ranking[0]
+    assert all(r.result.events for r in recorder.records)
+
+def test_console_observer_without_pauses(capsys):
+    random.seed(3)
+    result = TournamentRunner([ConsoleObserver(pause=False)]).run(16)
+    out = capsys.readouterr().out
+    assert "===== GROUP 1 =====" in out
+    assert result.champion in out
+
+def test_run_tournament_reports_bad_sizes(monkeypatch, capsys):
+    random.seed(4)
+    monkeypatch.setattr("builtins.input", lambda prompt = "": "")
+    assert run_tournament(16, group_size=1) is None
+    assert "Groups need at least 2 teams." in capsys.readouterr().out
+    with pytest.raises(TournamentSizeError):
+        TournamentRunner().run(3, fifa_style=False)
+
+def test_run_tournament_lets_other_errors_through(monkeypatch):
+    def broken(*args, **kwargs):
+        raise ValueError("engine failure")
+    monkeypatch.setattr("builtins.input", lambda prompt = "": "")
+    monkeypatch.setattr(tournaments.TournamentRunner, "play_match", broken)
+    with pytest.raises(ValueError, match="engine failure"):
+        run_tournament(16)
+
+@pytest.mark.parametrize("n", range(2, 10))
+def test_round_robin_schedule_plays_every_pair_once(n):
+    matchdays = round_robin_schedule(n)
+    assert len(matchdays) == (n if n % 2 else n - 1)
+    pairs = [frozenset(f) for day in matchdays for f in day]
+    assert sorted(map(sorted, pairs)) == sorted(map(sorted, combinations(range(n), 2)))
+    for day in matchdays:
+        playing = [t for f in day for t in f]
+        assert len(playing) == len(set(playing))
+        # With an odd number of teams exactly one of them rests each matchday
+        assert len(playing) == n - n % 2
+
+def test_schedule_matchdays_lines_up_groups():
+    groups = make_groups([f"T{i}" for i in range(11)], 4)
+    assert [len(g) for g in groups] == [4, 4, 3]
+    matchdays = schedule_matchdays(groups)
+    assert len(matchdays) == 3
+    assert sum(len(day) for day in matchdays) == 6 + 6 + 3
+    for day in matchdays:
+        playing = [t for _, a, b in day for t in (a, b)]
+        assert len(playing) == len(set(playing))
+
+@pytest.mark.parametrize("n, group_size, sizes", [(16, 4, [4] * 4), (10, 4, [4, 3, 3]), (7, 5, [4, 3]), (3, 4, [3])])
+def test_make_groups_sizes(n, group_size, sizes):
+    names = [f"T{i}" for i in range(n)]
+    groups = make_groups(names, group_size)
+    assert [len(g) for g in groups] == sizes
+    assert [t for g in groups for t in g] == names
+
+@pytest.mark.parametrize("n", range(2, 18))
+def test_seeded_pairs_give_byes_to_top_seeds(n):
+    pairs = build_seeded_pairs(list(range(n)))
+    size = 2 * len(pairs)
+    assert size >= n and size & (size - 1) == 0 and size < 2 * n
+    assert sorted(t for p in pairs for t in p if t is not None) == list(range(n))
+    byes = sorted(a for a, b in pairs if b is None)
+    assert byes == list(range(size - n))
+    assert all(a is not None for a, _ in pairs)
+
+@pytest.mark.parametrize("num_teams, fifa_style, titles", [
+    (24, True, ["Round of 16", "Quarterfinals", "Semifinals", "Finals"]),
+    (12, False, ["Semifinals", "Finals"]),
+    (10, True, ["Quarterfinals", "Semifinals", "Finals"]),
+])
+def test_runner_handles_any_field_with_byes(num_teams, fifa_style, titles):
+    random.seed(num_teams)
+    result = TournamentRunner().run(num_teams, fifa_style)
+    assert [r.title for r in result.rounds] == titles
+    qualifiers = len(result.groups) * (2 if fifa_style else 1)
+    first = result.rounds[0]
+    assert len(first.matches) == qualifiers - len(first.pairs)
+    assert result.champion == result.rounds[-1].winners[0]
+
+def summary(result):
+    # Everything a seeded tournament fixes: the draw, every match and the champion
+    groups = [(g.ranking, [(m.team1, m.team2, tuple(m.result)) for m in g.matches]) for g in result.groups]
+    rounds = [(r.title, [(m.team1, m.team2, tuple(m.result)) for m in r.matches]) for r in result.rounds]
+    return list(result.teams), groups, rounds, result.champion
+
+@pytest.mark.parametrize("engine", ["scalar", "skip"])
+def test_same_seed_gives_same_tournament(engine):
+    first = TournamentRunner(engine=engine, seed=9).run(16)
+    random.random()
+    second = TournamentRunner(engine=engine, seed=9).run(16)
+    assert summary(first) == summary(second)
+    assert summary(TournamentRunner(engine=engine, seed=10).run(16)) != summary(first)
+
+def tournament_matches(result):
+    records = [m for g in result.groups for m in g.matches] + [m for r in result.rounds for m in r.matches]
+    return [(m.stage, m.team1, m.team2, tuple(m.result), m.winner) for m in records]
+
+@pytest.mark.parametrize("num_teams, fifa_style", [(16, True), (16, False), (24, True)])
+def test_tournament_same_with_workers(num_teams, fifa_style):
+    serial_calls, parallel_calls = Recorder(), Recorder()
+    serial = TournamentRunner([serial_calls], seed=5).run(num_teams, fifa_style)
+    parallel = TournamentRunner([parallel_calls], seed=5, workers=2).run(num_teams, fifa_style)
+    assert tournament_matches(serial) == tournament_matches(parallel)
+    assert serial.champion == parallel.champion
+    assert serial_calls.calls == parallel_calls.calls
+    assert [tuple(r.result) for r in serial_calls.records] == [tuple(r.result) for r in parallel_calls.records]
+
+def test_workers_reject_a_cache():
+    from matchup_cache import MatchupCache
+    with pytest.raises(ValueError):
+        TournamentRunner(cache=MatchupCache(), workers=2)
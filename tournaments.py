@@ -1,8 +1,10 @@
-import csv
 import random
-from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from countries import load_countries_by_continent, load_country_index
 from models import create_random_team
+from seeding import make_rng
 from simulation import simulate_match
+from presenter import print_match_report
 
 TEAM_NAMES = ["Gryffindor", "Slytherin", "Hufflepuff", "Ravenclaw"]
 
@@ -16,10 +18,61 @@ SCHEDULE_INDICES = [
     (0, 3),
 ]
 
-def create_default_teams():
+# Raised when the teams cannot be split into groups and a knockout bracket
+class TournamentSizeError(ValueError):
+    pass
+
+# --- SCHEDULING ---
+# Round-robin fixtures for n teams by the circle method, one list of (index, index) pairs per
+# matchday: team 0 stays put while the others rotate one place each matchday. With an odd n
+# the team paired with the empty slot rests that day. Four-team groups keep SCHEDULE_INDICES.
+def round_robin_schedule(n):
+    if n == 4:
+        return [SCHEDULE_INDICES[i:i+2] for i in range(0, len(SCHEDULE_INDICES), 2)]
+    slots = list(range(n)) + ([None] if n % 2 else [])
+    m = len(slots)
+    matchdays = []
+    for day in range(m - 1):
+        fixtures = []
+        for i in range(m // 2):
+            a, b = slots[i], slots[m - 1 - i]
+            if a is None or b is None:
+                continue
+            # Swap sides for the fixed team every other day
+            fixtures.append((b, a) if i == 0 and day % 2 else (a, b))
+        matchdays.append(fixtures)
+        slots = [slots[0], slots[-1]] + slots[1:-1]
+    return matchdays
+
+# Lines up the fixtures of all groups: matchday k holds round k of every group, so nobody plays
+# twice on one day. Each fixture is (group number, team name, team name).
+def schedule_matchdays(groups):
+    matchdays = []
+    for g, names in enumerate(groups, 1):
+        for day, fixtures in enumerate(round_robin_schedule(len(names))):
+            if day == len(matchdays):
+                matchdays.append([])
+            matchdays[day].extend((g, names[a], names[b]) for a, b in fixtures)
+    return matchdays
+
+# Splits teams into consecutive groups of nearly equal size, none bigger than group_size
+def make_groups(team_names, group_size = 4):
+    if group_size < 2:
+        raise TournamentSizeError("Groups need at least 2 teams.")
+    num_groups = max(1, -(-len(team_names) // group_size))
+    base, extra = divmod(len(team_names), num_groups)
+    groups = []
+    start = 0
+    for g in range(num_groups):
+        size = base + (1 if g < extra else 0)
+        groups.append(list(team_names[start:start+size]))
+        start += size
+    return groups
+
+def create_default_teams(rng = random):
     teams = {}
     for name in TEAM_NAMES:
-        teams[name] = create_random_team(name)
+        teams[name] = create_random_team(name, rng)
     return teams
 
 def init_results_table():
@@ -35,70 +88,10 @@ def print_schedule(schedule, teams):
 
 def print_results_table(results):
     print("{:<12} {:<6} {:<8} {:<8} {:<8}".format("Team", "Points", "Scored", "Conceded", "Diff"))
-    sorted_teams = sorted(results.items(), key=lambda x: (-x[1]["points"], -x[1]["diff"], -x[1]["scored"]))
+    sorted_teams = sort_standings(results)
     for name, stats in sorted_teams:
         print("{:<12} {:<6} {:<8} {:<8} {:<8}".format(name, stats["points"], stats["scored"], stats["conceded"], stats["diff"]))
 
-def tournament_4_teams():
-    print("Starting a 4-team Quidditch tournament!")
-    teams = create_default_teams()
-    results = init_results_table()
-    schedule = [(TEAM_NAMES[a], TEAM_NAMES[b]) for (a, b) in SCHEDULE_INDICES]
-    print_schedule(schedule, teams)
-    print("\n--- Let the matches begin! ---")
-    for match_num, (a, b) in enumerate(schedule, 1):
-        input(f"\nPress Enter to simulate Match {match_num}: {a} vs {b}...")
-        team1, team2 = teams[a], teams[b]
-        print(f"\nPlayer skills for {team1.name}:")
-        for p in team1.players:
-            print(f"{p.name}: {p.skill}")
-        print(f"\nPlayer skills for {team2.name}:")
-        for p in team2.players:
-            print(f"{p.name}: {p.skill}")
-        # Simulate the match 
-        print(f"\nSimulating: {a} vs {b}")
-        # Capture scores 
-        team1_score, team2_score, snitch_catcher, _ = simulate_match(team1, team2)
-        print(f"  Result: {team1.name} {team1_score} - {team2.name} {team2_score}  (Snitch caught by: {snitch_catcher})")
-        # Decide points
-        if team1_score > team2_score:
-            results[a]["points"] += 1
-        elif team2_score > team1_score:
-            results[b]["points"] += 1
-        else:
-            results[a]["points"] += 0.5
-            results[b]["points"] += 0.5
-        # Goals for/against
-        results[a]["scored"] += team1_score
-        results[a]["conceded"] += team2_score
-        results[b]["scored"] += team2_score
-        results[b]["conceded"] += team1_score
-        results[a]["diff"] = results[a]["scored"] - results[a]["conceded"]
-        results[b]["diff"] = results[b]["scored"] - results[b]["conceded"]
-
-        if match_num == len(schedule):
-            print("\nFinal tournament standings:")
-        else:
-            print("\nCurrent tournament standings:")
-        print_results_table(results)
-
-# Load countries by continent
-def load_countries_by_continent(filename):
-    countries_by_continent = defaultdict(list)
-    populations_by_continent = defaultdict(list)
-    with open(filename, encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            country = row['Country/Territory']
-            continent = row['Continent']
-            try:
-                pop = int(row['2022 Population'].replace(',', ''))
-            except:
-                continue
-            countries_by_continent[continent].append(country)
-            populations_by_continent[continent].append(pop)
-    return countries_by_continent, populations_by_continent
-
 # Calculate how many to pick from each continent
 def get_team_allocation(n_teams):
     allocation = {
@@ -113,143 +106,82 @@ def get_team_allocation(n_teams):
     allocation["Europe"] = n_teams - total_allocated
     return allocation
 
-# Sample countries per continent
-def pick_random_teams_by_continent(n_teams, filename="world_population.csv"):
-    countries_by_continent, populations_by_continent = load_countries_by_continent(filename)
+# Sample countries per continent (population weighted, no duplicates)
+def pick_random_teams_by_continent(n_teams, filename="world_population.csv", rng = random):
+    index = load_country_index(filename)
     allocation = get_team_allocation(n_teams)
     chosen_countries = []
     for continent, count in allocation.items():
-        countries = countries_by_continent[continent]
-        pops = populations_by_continent[continent]
-        if count > len(countries):
-            count = len(countries) 
-        # Use random.choices for population weighting, but avoid duplicates
-        selected = set()
-        while len(selected) < count and len(selected) < len(countries):
-            pick = random.choices(countries, weights=pops, k=1)[0]
-            selected.add(pick)
-        chosen_countries.extend(selected)
+        chosen_countries.extend(index.sample(continent, count, rng))
     return chosen_countries
 
-# --- GROUP STAGE LOGIC ---
-def round_robin_group(group_names, teams_dict):
-    results = {name: {"points": 0, "scored": 0, "conceded": 0, "diff": 0} for name in group_names}
-    schedule = [
-        (0, 1), (2, 3), (3, 1), (0, 2), (2, 1), (0, 3)
-    ]
-    team_indices = {i: name for i, name in enumerate(group_names)}
-    print(f"\n-- Group: {', '.join(group_names)} --")
-    for a, b in schedule:
-        name_a = team_indices[a]
-        name_b = team_indices[b]
-        print(f"\nPress Enter to simulate match: {name_a} vs {name_b}...")
-        t1, t2 = teams_dict[name_a], teams_dict[name_b]
-        
-        print("\n--- Initial Skills ---")
-        print(f"\n{t1.name}:")
-        for p in t1.players:
-            print(f"{p.name}: {p.skill}")
-        print(f"\n{t2.name}:")
-        for p in t2.players:
-            print(f"{p.name}: {p.skill}")
-        input()
-
-        s1, s2, snitch_catcher, _ = simulate_match(t1, t2)
-        print(f"  Result: {name_a} {s1} - {s2} {name_b}  (Snitch caught by: {snitch_catcher})")
-        # Points
-        if s1 > s2:
-            results[name_a]["points"] += 1
-        elif s2 > s1:
-            results[name_b]["points"] += 1
-        else:
-            results[name_a]["points"] += 0.5
-            results[name_b]["points"] += 0.5
-        # Goals for/against
-        results[name_a]["scored"] += s1
-        results[name_a]["conceded"] += s2
-        results[name_a]["diff"] = results[name_a]["scored"] - results[name_a]["conceded"]
-        results[name_b]["scored"] += s2
-        results[name_b]["conceded"] += s1
-        results[name_b]["diff"] = results[name_b]["scored"] - results[name_b]["conceded"]
-        if a == 0 and b == 3:
-            print("\nFinal group standings:")
-        else:
-            print("\nCurrent standings:")
-        for i, (name, stats) in enumerate(sorted(results.items(), key=lambda x: (-x[1]['points'], -x[1]['diff'], -x[1]['scored'])), 1):
-            print(f" {i}. {name} ({stats['points']} pts, {stats['diff']} diff, {stats['scored']} for, {stats['conceded']} conceded)")
-    # Sort teams: points, diff, scored
-    sorted_teams = sorted(results.items(), key=lambda x: (-x[1]["points"], -x[1]["diff"], -x[1]["scored"]))
-    # Return first and second place
-    return [sorted_teams[0][0], sorted_teams[1][0]] #, matches, results
-
-def cannon_group(group_names, teams_dict):
-    results = {name: {"points": 0, "scored": 0, "conceded": 0, "diff": 0, "snitches caught": 0, "total snitch catching time": 0} for name in group_names}
-    schedule = [
-        (0, 1), (2, 3), (3, 1), (0, 2), (2, 1), (0, 3)
-    ]
-    team_indices = {i: name for i, name in enumerate(group_names)}
-    print(f"\n-- Group: {', '.join(group_names)} --")
-    for a, b in schedule:
-        name_a = team_indices[a]
-        name_b = team_indices[b]
-        print(f"\nPress Enter to simulate match: {name_a} vs {name_b}...")
-        t1, t2 = teams_dict[name_a], teams_dict[name_b]
-        
-        print("\n--- Initial Skills ---")
-        print(f"\n{t1.name}:")
-        for p in t1.players:
-            print(f"{p.name}: {p.skill}")
-        print(f"\n{t2.name}:")
-        for p in t2.players:
-            print(f"{p.name}: {p.skill}")
-        input()
-
-        s1, s2, snitch_catcher, match_time = simulate_match(t1, t2, 240)
+# There are only about 230 countries, so bigger fields are topped up with numbered federations
+def pick_team_names(n_teams, filename="world_population.csv", rng = random):
+    names = pick_random_teams_by_continent(n_teams, filename, rng)
+    taken = set(names)
+    k = 0
+    while len(names) < n_teams:
+        k += 1
+        name = f"Federation {k}"
+        if name not in taken:
+            names.append(name)
+    return names
+
+# --- STANDINGS ---
+def init_standings(names, cannon = False):
+    if cannon:
+        return {name: {"points": 0, "scored": 0, "conceded": 0, "diff": 0, "snitches caught": 0, "total snitch catching time": 0} for name in names}
+    return {name: {"points": 0, "scored": 0, "conceded": 0, "diff": 0} for name in names}
+
+def record_result(results, name_a, name_b, s1, s2, snitch_catcher = None, match_time = 0, cannon = False):
+    if cannon:
         if snitch_catcher:
-            print(f"  Result: {name_a} {s1} - {s2} {name_b}  (Snitch caught by: {snitch_catcher})")
             results[snitch_catcher]["snitches caught"] += 1
             results[snitch_catcher]["total snitch catching time"] += match_time
-        else:
-            print(f"  {name_a} {s1} - {s2} {name_b}  (Match is concluded with no snitch caught)")
-        # Points
+        # Points: 2 for a win plus a bonus for the margin, 1 each for a draw
         if s1 > s2:
-            results[name_a]["points"] += 2
-            if s1 - s2 > 150:
-                results[name_a]["points"] += 5
-            elif s1 - s2 > 100:
-                results[name_a]["points"] += 3
-            elif s1 - s2 > 50:
-                results[name_a]["points"] += 1
+            results[name_a]["points"] += 2 + cannon_margin_bonus(s1 - s2)
         elif s2 > s1:
-            results[name_b]["points"] += 2
-            if s2 - s1 > 150:
-                results[name_b]["points"] += 5
-            elif s2 - s1 > 100:
-                results[name_b]["points"] += 3
-            elif s2 - s1 > 50:
-                results[name_b]["points"] += 1
+            results[name_b]["points"] += 2 + cannon_margin_bonus(s2 - s1)
         else:
             results[name_a]["points"] += 1
             results[name_b]["points"] += 1
-
-        #Goals for/against
-        results[name_a]["scored"] += s1
-        results[name_a]["conceded"] += s2
-        results[name_a]["diff"] = results[name_a]["scored"] - results[name_a]["conceded"]
-        results[name_b]["scored"] += s2
-        results[name_b]["conceded"] += s1
-        results[name_b]["diff"] = results[name_b]["scored"] - results[name_b]["conceded"]
-
-        if a == 0 and b == 3:
-            print("\nFinal group standings:")
+    else:
+        if s1 > s2:
+            results[name_a]["points"] += 1
+        elif s2 > s1:
+            results[name_b]["points"] += 1
         else:
-            print("\nCurrent standings:")
-        for i, (name, stats) in enumerate(sorted(results.items(), key=lambda x: (-x[1]['points'], -x[1]['snitches caught'], x[1]['total snitch catching time'], -x[1]['diff'], -x[1]['scored'])), 1):
-            print(f" {i}. {name} ({stats['points']} pts, {stats['snitches caught']} snitches caught in the total of {stats['total snitch catching time']} minutes, {stats['diff']} diff, {stats['scored']} for, {stats['conceded']} conceded)")
-    # Sort teams: points, diff, scored
-    sorted_teams = sorted(results.items(), key=lambda x: (-x[1]["points"], -x[1]['snitches caught'], x[1]['total snitch catching time'], -x[1]["diff"], -x[1]["scored"]))
-    # Return first place and points
-    return (sorted_teams[0][0], results[sorted_teams[0][0]])
+            results[name_a]["points"] += 0.5
+            results[name_b]["points"] += 0.5
+    # Goals for/against
+    results[name_a]["scored"] += s1
+    results[name_a]["conceded"] += s2
+    results[name_a]["diff"] = results[name_a]["scored"] - results[name_a]["conceded"]
+    results[name_b]["scored"] += s2
+    results[name_b]["conceded"] += s1
+    results[name_b]["diff"] = results[name_b]["scored"] - results[name_b]["conceded"]
+
+def cannon_margin_bonus(margin):
+    if margin > 150:
+        return 5
+    if margin > 100:
+        return 3
+    if margin > 50:
+        return 1
+    return 0
+
+# Sort teams: points, diff, scored (Cannon style: points, snitches, snitch time, diff, scored)
+def fifa_sort_key(item):
+    stats = item[1]
+    return (-stats["points"], -stats["diff"], -stats["scored"])
+
+def cannon_sort_key(item):
+    stats = item[1]
+    return (-stats["points"], -stats['snitches caught'], stats['total snitch catching time'], -stats["diff"], -stats["scored"])
+
+def sort_standings(results, cannon = False):
+    return sorted(results.items(), key=cannon_sort_key if cannon else fifa_sort_key)
 
 # --- TOURNAMENT DRIVER ---
 def display_teams(teams_dict):
@@ -268,7 +200,10 @@ def display_groups(groups):
 def display_bracket(pairs, round_title):
     print(f"\n=== {round_title.upper()} ===")
     for idx, (a, b) in enumerate(pairs, 1):
-        print(f"  Match {idx}: {a} vs {b}")
+        if b is None:
+            print(f"  Match {idx}: {a} (bye)")
+        else:
+            print(f"  Match {idx}: {a} vs {b}")
 
 def build_split_bracket_pairs(group_winners, group_runners_up):
     n = len(group_winners)
@@ -289,99 +224,440 @@ def get_bracket_order(n):
         order.append(n - 1 - x)
     return order
 
+# Seeded bracket for any number of teams (best seed first). The field is padded to the next
+# power of two with byes (None), which go to the top seeds: their pairs are (team, None).
+def build_seeded_pairs(seeds):
+    size = 2
+    while size < len(seeds):
+        size *= 2
+    slots = list(seeds) + [None] * (size - len(seeds))
+    temp_pairs = [(slots[i], slots[size - 1 - i]) for i in range(size // 2)]
+    order = get_bracket_order(len(temp_pairs)) if len(temp_pairs) > 1 else [0]
+    return [temp_pairs[i] for i in order]
+
 def build_ranked_pairs(group_winners_points):
-    sorted_winners = sorted(group_winners_points.items(), key=lambda x: (-x[1]["points"], -x[1]['snitches caught'], x[1]['total snitch catching time'], -x[1]["diff"], -x[1]["scored"]))
-    n = len(sorted_winners)
-    temp_pairs = [(sorted_winners[i][0], sorted_winners[n - 1 - i][0]) for i in range(n // 2)]
-    order = get_bracket_order(len(temp_pairs))
-    result = [temp_pairs[i] for i in order]
-    return result
-
-def run_tournament(num_teams, fifa_style = True):
-    print(f"\n=== QUIDDITCH WORLD CUP: {num_teams} TEAMS ===")
-    team_names = pick_random_teams_by_continent(num_teams)
-    random.shuffle(team_names)
-    teams_dict = {name: create_random_team(name) for name in team_names}
-    num_groups = num_teams // 4
-    groups = [team_names[i*4:(i+1)*4] for i in range(num_groups)]
-
-    # Show teams and groups
-    display_teams(teams_dict)
-    input("\nPress Enter to continue to group draw...")
-    display_groups(groups)
-    input("\nPress Enter to begin group simulations...")
-
-    # GROUP STAGE
-    group_winners = []
-    group_runners_up = []
-    group_winners_points = {}
-    for idx, group in enumerate(groups, 1):
-        input(f"\nPress Enter to simulate all matches in GROUP {idx} ({', '.join(group)}):")
-        print(f"\n===== GROUP {idx} =====")
+    sorted_winners = sort_standings(group_winners_points, cannon=True)
+    return build_seeded_pairs([name for name, _ in sorted_winners])
+
+# Winners seeded by their group record, then runners-up, for fields the split bracket can't take
+def build_fifa_seeded_pairs(group_winners_stats, group_runners_up_stats):
+    seeds = [name for name, _ in sort_standings(group_winners_stats)]
+    seeds += [name for name, _ in sort_standings(group_runners_up_stats)]
+    return build_seeded_pairs(seeds)
+
+def round_title(teams_left):
+    return {2: "Finals", 4: "Semifinals", 8: "Quarterfinals"}.get(teams_left, f"Round of {teams_left}")
+
+# --- TOURNAMENT RESULTS ---
+class MatchRecord:
+    def __init__(self, stage, team1, team2, result, winner = None, matchday = None):
+        self.stage = stage
+        self.matchday = matchday
+        self.team1 = team1
+        self.team2 = team2
+        self.result = result
+        self.team1_score, self.team2_score, self.snitch_catcher, self.time = result
+        self.winner = winner
+
+class GroupResult:
+    def __init__(self, index, teams, style):
+        self.index = index
+        self.teams = list(teams)
+        self.style = style  # "fifa", "cannon" or "house"
+        self.matches = []
+        self.standings = init_standings(teams, style == "cannon")
+
+    @property
+    def table(self):
+        return sort_standings(self.standings, self.style == "cannon")
+
+    @property
+    def ranking(self):
+        return [name for name, _ in self.table]
+
+class KnockoutRound:
+    def __init__(self, title, pairs):
+        self.title = title
+        self.pairs = list(pairs)
+        self.matches = []
+        self.winners = []  # in bracket order, including teams that had a bye
+
+class TournamentResult:
+    def __init__(self, teams, groups, fifa_style):
+        self.teams = teams
+        self.fifa_style = fifa_style
+        self.groups = [] if groups is None else groups
+        self.rounds = []
+        self.champion = None
+        self.matchdays = []
+
+# --- OBSERVERS ---
+class TournamentObserver:
+    # Base class: every hook is optional. Set wants_events to get match highlights.
+    wants_events = False
+
+    def on_teams(self, teams_dict): pass
+    def on_groups(self, groups): pass
+    def on_group_start(self, group): pass
+    def on_house_schedule(self, schedule, teams): pass
+    def on_match_start(self, stage, team1, team2, match_num): pass
+    def on_match_end(self, stage, record): pass
+    def on_standings(self, group, final): pass
+    def on_group_stage_end(self): pass
+    def on_round_start(self, knockout_round): pass
+    def on_champion(self, champion): pass
+
+# Prints everything the interactive CLI used to print; pause=True waits for Enter where it used to.
+# verbosity ("none", "key" or "full") picks which match highlights are shown.
+class ConsoleObserver(TournamentObserver):
+    def __init__(self, pause = True, verbosity = "full"):
+        self.pause = pause
+        self.verbosity = verbosity
+        self.wants_events = verbosity != "none"
+
+    def _wait(self, prompt = ""):
+        if self.pause:
+            input(prompt)
+        elif prompt:
+            print(prompt)
+
+    def _print_skills(self, team):
+        for p in team.players:
+            print(f"{p.name}: {p.skill}")
 
-        if fifa_style:
-            top2 = round_robin_group(group, teams_dict)
-            group_winners.append(top2[0])
-            group_runners_up.append(top2[1])
+    def on_teams(self, teams_dict):
+        display_teams(teams_dict)
+        self._wait("\nPress Enter to continue to group draw...")
+
+    def on_groups(self, groups):
+        display_groups(groups)
+        self._wait("\nPress Enter to begin group simulations...")
+
+    def on_group_start(self, group):
+        if group.style == "house":
+            print("Starting a 4-team Quidditch tournament!")
+            return
+        if group.index is not None:
+            self._wait(f"\nPress Enter to simulate all matches in GROUP {group.index} ({', '.join(group.teams)}):")
+            print(f"\n===== GROUP {group.index} =====")
+        print(f"\n-- Group: {', '.join(group.teams)} --")
+
+    def on_house_schedule(self, schedule, teams):
+        print_schedule(schedule, teams)
+        print("\n--- Let the matches begin! ---")
+
+    def on_match_start(self, stage, team1, team2, match_num):
+        if stage == "house":
+            self._wait(f"\nPress Enter to simulate Match {match_num}: {team1.name} vs {team2.name}...")
+            print(f"\nPlayer skills for {team1.name}:")
+            self._print_skills(team1)
+            print(f"\nPlayer skills for {team2.name}:")
+            self._print_skills(team2)
+            print(f"\nSimulating: {team1.name} vs {team2.name}")
+            return
+        if stage == "group":
+            print(f"\nPress Enter to simulate match: {team1.name} vs {team2.name}...")
         else:
-            top1, results = cannon_group(group, teams_dict)
-            group_winners_points[top1] = results
-
-    # PLAYOFFS
-    input("\nAll group stages complete! Press Enter to advance to the playoffs...")
-    if fifa_style:
-        pairs = build_split_bracket_pairs(group_winners, group_runners_up)
-    else:
-        pairs = build_ranked_pairs(group_winners_points)
-
-    round_names = []
-    if len(pairs) == 16:
-        round_names = ["Round of 32", "Round of 16", "Quarterfinals", "Semifinals", "Finals"]
-    elif len(pairs) == 8:
-        round_names = ["Round of 16", "Quarterfinals", "Semifinals", "Finals"]
-    elif len(pairs) == 4:
-        round_names = ["Quarterfinals", "Semifinals", "Finals"]
-    elif len(pairs) == 2:
-        round_names = ["Semifinals", "Finals"]
-    else:
-        print("Invalid number of teams in playoffs.")
-        return
-
-    round_idx = 0
-    while True:
-        round_title = round_names[round_idx] if round_idx < len(round_names) else f"Round {round_idx+1}"
-        display_bracket(pairs, round_title)
-        input(f"\nPress Enter to simulate {round_title} matches...")
-        next_round = []
-        for idx, (t1, t2) in enumerate(pairs, 1):
-            print(f"Press Enter to simulate {round_title} Match {idx}: {t1} vs {t2}...")
-
-            print("\n--- Initial Skills ---")
-            print(f"\n{t1}:")
-            for p in teams_dict[t1].players:
-                print(f"{p.name}: {p.skill}")
-            print(f"\n{t2}:")
-            for p in teams_dict[t2].players:
-                print(f"{p.name}: {p.skill}")
-            input()
-
-            s1, s2, snitch_catcher, _ = simulate_match(teams_dict[t1], teams_dict[t2])
-            print(f"  Result: {t1} {s1} - {s2} {t2}  (Snitch caught by: {snitch_catcher})")
-            if s1 > s2:
-                winner = t1
-            elif s2 > s1:
-                winner = t2
-            else:
-                winner = snitch_catcher
-                print(f"    Tie! {snitch_catcher} wins as Seeker caught the Snitch.")
-            print(f"    Winner: {winner}\n")
-            next_round.append(winner)
-        if len(next_round) == 1:
-            champion = next_round[0]
-            break
+            print(f"Press Enter to simulate {stage} Match {match_num}: {team1.name} vs {team2.name}...")
+        print("\n--- Initial Skills ---")
+        print(f"\n{team1.name}:")
+        self._print_skills(team1)
+        print(f"\n{team2.name}:")
+        self._print_skills(team2)
+        self._wait()
+
+    def on_match_end(self, stage, record):
+        print_match_report(record.result, self.verbosity)
+        a, b = record.team1, record.team2
+        s1, s2 = record.team1_score, record.team2_score
+        if stage == "house":
+            print(f"  Result: {a} {s1} - {b} {s2}  (Snitch caught by: {record.snitch_catcher})")
+        elif record.snitch_catcher or stage != "group":
+            print(f"  Result: {a} {s1} - {s2} {b}  (Snitch caught by: {record.snitch_catcher})")
         else:
+            print(f"  {a} {s1} - {s2} {b}  (Match is concluded with no snitch caught)")
+        if record.winner is not None:
+            if s1 == s2:
+                print(f"    Tie! {record.snitch_catcher} wins as Seeker caught the Snitch.")
+            print(f"    Winner: {record.winner}\n")
+
+    def on_standings(self, group, final):
+        if group.style == "house":
+            print("\nFinal tournament standings:" if final else "\nCurrent tournament standings:")
+            print_results_table(group.standings)
+            return
+        print("\nFinal group standings:" if final else "\nCurrent standings:")
+        for i, (name, stats) in enumerate(group.table, 1):
+            if group.style == "cannon":
+                print(f" {i}. {name} ({stats['points']} pts, {stats['snitches caught']} snitches caught in the total of {stats['total snitch catching time']} minutes, {stats['diff']} diff, {stats['scored']} for, {stats['conceded']} conceded)")
+            else:
+                print(f" {i}. {name} ({stats['points']} pts, {stats['diff']} diff, {stats['scored']} for, {stats['conceded']} conceded)")
+
+    def on_group_stage_end(self):
+        self._wait("\nAll group stages complete! Press Enter to advance to the playoffs...")
+
+    def on_round_start(self, knockout_round):
+        display_bracket(knockout_round.pairs, knockout_round.title)
+        self._wait(f"\nPress Enter to simulate {knockout_round.title} matches...")
+
+    def on_champion(self, champion):
+        print(f"\n=== CHAMPION: {champion} ===\n")
+        print(f"🏆 {champion} WINS THE QUIDDITCH WORLD CUP! 🏆")
+
+# --- TOURNAMENT RUNNER ---
+
+# Runs whole tournaments without any prompts; observers decide what (if anything) is shown
+class TournamentRunner:
+    # engine is passed on to simulate_match ("scalar" or "skip").
+    # Without a seed everything draws from rng in turn. With a seed the team draw and every
+    # match get their own stream keyed by stage and position, so a tournament is reproducible
+    # and any match can be replayed (or run elsewhere) on its own.
+    # A MatchupCache (see matchup_cache.py) replaces repeated matchups by draws from cached
+    # outcome distributions; it is not used when an observer wants match highlights.
+    # workers > 1 makes run() play all groups, then each knockout round, in a process pool. The
+    # results are applied in schedule order, so standings and observer calls are the same as in a
+    # serial run with the same seed (an unseeded runner draws its seed from rng).
+    def __init__(self, observers = (), engine = "scalar", seed = None, rng = random, cache = None, workers = None):
+        self.observers = list(observers)
+        self.engine = engine
+        self.rng = rng
+        self.cache = cache
+        self.record_events = any(o.wants_events for o in self.observers)
+        self.workers = workers or 1
+        if self.workers > 1:
+            if cache is not None:
+                raise ValueError("A matchup cache cannot be shared with worker processes.")
+            if seed is None:
+                seed = rng.getrandbits(64)
+        self.seed = seed
+        self._pool = None
+
+    def stream(self, *key):
+        return self.rng if self.seed is None else make_rng(self.seed, *key)
+
+    def _notify(self, hook, *args):
+        for observer in self.observers:
+            getattr(observer, hook, lambda *a: None)(*args)
+
+    def play_match(self, team1, team2, time_limit = None, key = ()):
+        if self.cache is not None and not self.record_events:
+            return self.cache.play(team1, team2, time_limit, self.engine, self.stream(*key))
+        return simulate_match(team1, team2, time_limit, quiet=True, record_events=self.record_events, engine=self.engine, rng=self.stream(*key))
+
+    # Plays (team1, team2, time_limit, key) matches in the worker pool, in order
+    def play_matches(self, matches):
+        if self._pool is None:
+            return [self.play_match(*m) for m in matches]
+        chunk = -(-len(matches) // self.workers)
+        futures = [
+            self._pool.submit(_play_matches, self.engine, self.seed, self.record_events, matches[i:i + chunk])
+            for i in range(0, len(matches), chunk)
+        ]
+        return [result for future in futures for result in future.result()]
+
+    def group_schedule(self, group_names):
+        return [(day, a, b) for day, fixtures in enumerate(round_robin_schedule(len(group_names)), 1) for a, b in fixtures]
+
+    def group_matches(self, group_names, teams_dict, fifa_style = True, index = None):
+        time_limit = None if fifa_style else 240
+        return [
+            (teams_dict[group_names[a]], teams_dict[group_names[b]], time_limit, ("group", index, match_num))
+            for match_num, (_, a, b) in enumerate(self.group_schedule(group_names), 1)
+        ]
+
+    # results: the group's match results in schedule order, if already played elsewhere
+    def run_group(self, group_names, teams_dict, fifa_style = True, index = None, results = None):
+        group = GroupResult(index, group_names, "fifa" if fifa_style else "cannon")
+        time_limit = None if fifa_style else 240
+        self._notify("on_group_start", group)
+        schedule = self.group_schedule(group_names)
+        for match_num, (day, a, b) in enumerate(schedule, 1):
+            name_a, name_b = group_names[a], group_names[b]
+            t1, t2 = teams_dict[name_a], teams_dict[name_b]
+            self._notify("on_match_start", "group", t1, t2, match_num)
+            if results is not None:
+                result = results[match_num - 1]
+            else:
+                result = self.play_match(t1, t2, time_limit, ("group", index, match_num))
+            record = MatchRecord("group", name_a, name_b, result, matchday=day)
+            group.matches.append(record)
+            record_result(group.standings, name_a, name_b, *result, cannon=not fifa_style)
+            self._notify("on_match_end", "group", record)
+            self._notify("on_standings", group, match_num == len(schedule))
+        return group
+
+    def run_house_cup(self, teams = None):
+        teams = teams or create_default_teams(self.stream("teams"))
+        names = list(teams)
+        group = GroupResult(None, names, "house")
+        result = TournamentResult(teams, [group], True)
+        self._notify("on_group_start", group)
+        schedule = [(names[a], names[b]) for (a, b) in SCHEDULE_INDICES]
+        self._notify("on_house_schedule", schedule, teams)
+        for match_num, (a, b) in enumerate(schedule, 1):
+            team1, team2 = teams[a], teams[b]
+            self._notify("on_match_start", "house", team1, team2, match_num)
+            match = self.play_match(team1, team2, key=("house", match_num))
+            record = MatchRecord("house", a, b, match)
+            group.matches.append(record)
+            record_result(group.standings, a, b, *match)
+            self._notify("on_match_end", "house", record)
+            self._notify("on_standings", group, match_num == len(schedule))
+        result.champion = group.ranking[0]
+        return result
+
+    def run_knockout(self, pairs, teams_dict):
+        rounds = []
+        size = 2 * len(pairs)
+        if size < 2 or size & (size - 1):
+            raise TournamentSizeError("Invalid number of teams in playoffs.")
+        while True:
+            title = round_title(2 * len(pairs))
+            knockout_round = KnockoutRound(title, pairs)
+            rounds.append(knockout_round)
+            played = {}
+            if self._pool is not None:
+                fixtures = [(idx, t1, t2) for idx, (t1, t2) in enumerate(pairs, 1) if t2 is not None]
+                results = self.play_matches([(teams_dict[t1], teams_dict[t2], None, (title, idx)) for idx, t1, t2 in fixtures])
+                played = {idx: result for (idx, _, _), result in zip(fixtures, results)}
+            self._notify("on_round_start", knockout_round)
+            for idx, (t1, t2) in enumerate(pairs, 1):
+                if t2 is None:
+                    # Bye: the seeded team goes through without playing
+                    knockout_round.winners.append(t1)
+                    continue
+                self._notify("on_match_start", title, teams_dict[t1], teams_dict[t2], idx)
+                if idx in played:
+                    result = played[idx]
+                else:
+                    result = self.play_match(teams_dict[t1], teams_dict[t2], key=(title, idx))
+                s1, s2, snitch_catcher, _ = result
+                if s1 > s2:
+                    winner = t1
+                elif s2 > s1:
+                    winner = t2
+                else:
+                    winner = snitch_catcher
+                record = MatchRecord(title, t1, t2, result, winner)
+                knockout_round.matches.append(record)
+                knockout_round.winners.append(winner)
+                self._notify("on_match_end", title, record)
+            next_round = knockout_round.winners
+            if len(next_round) == 1:
+                return rounds, next_round[0]
             pairs = [(next_round[i], next_round[i+1]) for i in range(0, len(next_round), 2)]
-            round_idx += 1
 
-    print(f"\n=== CHAMPION: {champion} ===\n")
-    print(f"🏆 {champion} WINS THE QUIDDITCH WORLD CUP! 🏆")
\ No newline at end of file
+    # Either pass num_teams (countries are drawn at random) or a ready teams_dict.
+    # Groups hold up to group_size teams; FIFA style sends the top two of each to the playoffs,
+    # Cannon style the winners only, and a field that is not a power of two gets byes.
+    def run(self, num_teams = None, fifa_style = True, teams_dict = None, groups = None, group_size = 4):
+        if self.workers > 1 and self._pool is None:
+            with ProcessPoolExecutor(self.workers) as pool:
+                self._pool = pool
+                try:
+                    return self.run(num_teams, fifa_style, teams_dict, groups, group_size)
+                finally:
+                    self._pool = None
+
+        if teams_dict is None:
+            rng = self.stream("teams")
+            team_names = pick_team_names(num_teams, rng=rng)
+            rng.shuffle(team_names)
+            teams_dict = {name: create_random_team(name, rng) for name in team_names}
+        else:
+            team_names = list(teams_dict)
+        if groups is None:
+            groups = make_groups(team_names, group_size)
+        qualifiers = 2 if fifa_style else 1
+        if min(len(g) for g in groups) < qualifiers or len(groups) * qualifiers < 2:
+            raise TournamentSizeError("Not enough teams for a group stage and playoffs.")
+
+        result = TournamentResult(teams_dict, None, fifa_style)
+        result.matchdays = schedule_matchdays(groups)
+        self._notify("on_teams", teams_dict)
+        self._notify("on_groups", groups)
+
+        # GROUP STAGE
+        group_winners = []
+        group_runners_up = []
+        group_winners_points = {}
+        group_runners_up_points = {}
+        group_results = [None] * len(groups)
+        if self._pool is not None:
+            # One task per group; every group's results come back before any is applied
+            futures = [
+                self._pool.submit(_play_matches, self.engine, self.seed, self.record_events,
+                                  self.group_matches(group_names, teams_dict, fifa_style, idx))
+                for idx, group_names in enumerate(groups, 1)
+            ]
+            group_results = [future.result() for future in futures]
+        for idx, group_names in enumerate(groups, 1):
+            group = self.run_group(group_names, teams_dict, fifa_style, idx, group_results[idx - 1])
+            result.groups.append(group)
+            ranking = group.ranking
+            group_winners.append(ranking[0])
+            group_winners_points[ranking[0]] = group.standings[ranking[0]]
+            if fifa_style:
+                group_runners_up.append(ranking[1])
+                group_runners_up_points[ranking[1]] = group.standings[ranking[1]]
+        self._notify("on_group_stage_end")
+
+        # PLAYOFFS
+        num_groups = len(groups)
+        if fifa_style and num_groups >= 2 and num_groups & (num_groups - 1) == 0:
+            pairs = build_split_bracket_pairs(group_winners, group_runners_up)
+        elif fifa_style:
+            pairs = build_fifa_seeded_pairs(group_winners_points, group_runners_up_points)
+        else:
+            pairs = build_ranked_pairs(group_winners_points)
+        result.rounds, result.champion = self.run_knockout(pairs, teams_dict)
+        self._notify("on_champion", result.champion)
+        return result
+
+# Worker-process side of TournamentRunner.play_matches: plays matches on their own seeded streams
+def _play_matches(engine, seed, record_events, matches):
+    runner = TournamentRunner(engine=engine, seed=seed)
+    runner.record_events = record_events
+    return [runner.play_match(*m) for m in matches]
+
+# --- INTERACTIVE ENTRY POINTS ---
+def tournament_4_teams():
+    return TournamentRunner([ConsoleObserver()]).run_house_cup()
+
+def round_robin_group(group_names, teams_dict):
+    group = TournamentRunner([ConsoleObserver()]).run_group(group_names, teams_dict, True)
+    # Return first and second place
+    return group.ranking[:2]
+
+def cannon_group(group_names, teams_dict):
+    group = TournamentRunner([ConsoleObserver()]).run_group(group_names, teams_dict, False)
+    # Return first place and points
+    top1 = group.ranking[0]
+    return (top1, group.standings[top1])
+
+def run_tournament(num_teams, fifa_style = True, group_size = 4, seed = None, workers = None):
+    print(f"\n=== QUIDDITCH WORLD CUP: {num_teams} TEAMS ===")
+    try:
+        return TournamentRunner([ConsoleObserver()], seed=seed, workers=workers).run(num_teams, fifa_style, group_size=group_size)
+    except TournamentSizeError as e:
+        print(e)
+
+if __name__ == "__main__":
+    # python tournaments.py 64 --cannon --seed 7
+    # python tournaments.py 64 --profile cprofile -n 20   (20 silent tournaments under cProfile)
+    import argparse
+    from profiling import add_profile_arguments, profile_from_args, tournament_workload
+
+    parser = argparse.ArgumentParser(description="Run a Quidditch World Cup.")
+    parser.add_argument("num_teams", type=int, nargs="?", default=32)
+    parser.add_argument("--cannon", action="store_true", help="Cannon-style group stage (default: FIFA)")
+    parser.add_argument("--group-size", type=int, default=4)
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--workers", type=int, help="play groups and knockout rounds in this many processes")
+    parser.add_argument("-n", type=int, default=1, help="tournaments to run when profiling (default: 1)")
+    add_profile_arguments(parser, with_workload=False)
+    args = parser.parse_args()
+    if args.profile:
+        profile_from_args(args, tournament_workload(args.num_teams, not args.cannon, args.group_size, args.seed, repeat=args.n, workers=args.workers))
+    else:
+        run_tournament(args.num_teams, not args.cannon, args.group_size, args.seed, args.workers)